@@ -19,5 +19,5 @@ class RegulatoryGuideAdmin(admin.ModelAdmin):
 @admin.register(FundingOpportunity)
 class FundingOpportunityAdmin(admin.ModelAdmin):
     list_display = ['title', 'funding_type', 'provider', 'amount', 'application_deadline', 'pakistan_friendly']
-    list_filter = ['funding_type', 'pakistan_friendly']
+    list_filter = ['funding_type', 'pakistan_friendly', 'is_active']
     search_fields = ['title', 'provider']
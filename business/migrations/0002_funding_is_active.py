@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fundingopportunity',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Cleared by expire_listings once the deadline passes'),
+        ),
+        migrations.AddIndex(
+            model_name='fundingopportunity',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['application_deadline'], name='funding_active_deadline_idx'),
+        ),
+    ]
@@ -161,6 +161,7 @@ class FundingOpportunity(models.Model):
 
     views = models.PositiveIntegerField(default=0)
     applicants_interested = models.ManyToManyField(User, related_name='interested_funding', blank=True)
+    is_active = models.BooleanField(default=True, help_text="Cleared by expire_listings once the deadline passes")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -170,6 +171,7 @@ class FundingOpportunity(models.Model):
         indexes = [
             models.Index(fields=['funding_type']),
             models.Index(fields=['application_deadline']),
+            models.Index(fields=['application_deadline'], name='funding_active_deadline_idx', condition=models.Q(is_active=True)),
         ]
 
     def __str__(self):
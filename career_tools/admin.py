@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Resume, ResumeEducation, ResumeExperience, ResumeSkill, ResumeProject,
-    SalaryData, CareerTransitionStory
+    SalaryData, SalaryCubeCell, CareerTransitionStory, JobMatch, RenderedResume
 )
 
 
@@ -35,8 +35,31 @@ class SalaryDataAdmin(admin.ModelAdmin):
     search_fields = ['position', 'discipline']
 
 
+@admin.register(SalaryCubeCell)
+class SalaryCubeCellAdmin(admin.ModelAdmin):
+    list_display = ['discipline', 'city', 'experience_band', 'company_size', 'count', 'median', 'is_stale', 'computed_at']
+    list_filter = ['is_stale', 'experience_band', 'company_size']
+    search_fields = ['discipline', 'city']
+
+
 @admin.register(CareerTransitionStory)
 class CareerTransitionStoryAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'transition_type', 'from_discipline', 'to_discipline', 'helpful_count']
     list_filter = ['transition_type']
     search_fields = ['title', 'author__username']
+
+
+@admin.register(JobMatch)
+class JobMatchAdmin(admin.ModelAdmin):
+    list_display = ['user', 'job', 'score', 'computed_at']
+    search_fields = ['user__username', 'job__title']
+    raw_id_fields = ['user', 'resume', 'job']
+    readonly_fields = ['computed_at']
+
+
+@admin.register(RenderedResume)
+class RenderedResumeAdmin(admin.ModelAdmin):
+    list_display = ['resume', 'format', 'status', 'rendered_at']
+    list_filter = ['format', 'status']
+    search_fields = ['resume__user__username', 'resume__title']
+    readonly_fields = ['content_hash']
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CareerToolsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "career_tools"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,139 @@
+"""
+Resume keyword gap analysis.
+
+Every active job's requirements are normalized once into a binary job x skill
+matrix over a shared vocabulary (built with the same skills.py rules as the
+nightly matcher). A resume becomes a 0/1 vector over that vocabulary, so one
+sparse matrix-vector product gives the matched-skill count for every job at
+once; matched and missing skill names are only expanded for the jobs shown.
+
+The matrix lives in process memory and is rebuilt when the job table's
+version (jobs.facets.version) changes.
+"""
+import numpy as np
+from scipy import sparse
+
+from jobs import facets
+from .matching import load_job_skills
+from .models import ResumeSkill
+from .skills import SkillVocabulary, job_skills, parse_skills
+
+
+class JobSkillIndex:
+    """Binary job x skill matrix for all active jobs"""
+
+    def __init__(self, documents):
+        self.job_ids = np.fromiter(documents, dtype=np.int64, count=len(documents))
+        self.vocabulary = SkillVocabulary(documents.values())
+        self.skill_names = np.array(self.vocabulary.names(), dtype=object)
+
+        indptr = [0]
+        indices = []
+        for job_id in self.job_ids.tolist():
+            indices.extend(self.vocabulary.columns(documents[job_id]))
+            indptr.append(len(indices))
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(self.job_ids), len(self.vocabulary)),
+        )
+        self.required = np.diff(self.matrix.indptr)
+        # Active jobs asking for each skill
+        self.demand = np.asarray(self.matrix.sum(axis=0)).ravel()
+
+    @classmethod
+    def build(cls):
+        return cls(load_job_skills())
+
+    def vector(self, skills):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        vector[self.vocabulary.columns(skills)] = 1
+        return vector
+
+    def scores(self, skills):
+        """(matched counts, coverage scores) for every job, in one pass"""
+        matched = self.matrix @ self.vector(skills)
+        return matched, matched / np.maximum(self.required, 1)
+
+    def job_skill_columns(self, row):
+        return self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+
+    def gap(self, row, vector):
+        columns = self.job_skill_columns(row)
+        have = vector[columns] > 0
+        return sorted(self.skill_names[columns[have]]), sorted(self.skill_names[columns[~have]])
+
+
+_index = None
+_index_version = None
+
+
+def get_index():
+    """Return this process's job skill index, rebuilding it if any job changed"""
+    global _index, _index_version
+
+    current = facets.version()
+    if _index is None or current != _index_version:
+        _index = JobSkillIndex.build()
+        _index_version = current
+    return _index
+
+
+def resume_skills(resume):
+    """Canonical skills across every skills section of a resume"""
+    skills = set()
+    for text in ResumeSkill.objects.filter(resume=resume).values_list('skills', flat=True):
+        skills |= parse_skills(text)
+    return skills
+
+
+def report(required, skills):
+    matched = sorted(required & skills)
+    return {
+        'matched': matched,
+        'missing': sorted(required - skills),
+        'score': len(matched) / len(required) if required else None,
+    }
+
+
+def gap_report(resume, job):
+    """Matched skills, missing skills and coverage score for one resume/job pair"""
+    return report(job_skills(job.requirements), resume_skills(resume))
+
+
+def gap_reports(resume, limit=20, skills=None):
+    """
+    The `limit` best-covered active jobs for a resume, best first, as
+    [(job_id, report)], plus the total number of jobs with any match.
+    """
+    index = get_index()
+    skills = resume_skills(resume) if skills is None else skills
+    if not len(index.job_ids):
+        return [], 0
+
+    matched, coverage = index.scores(skills)
+    candidates = np.flatnonzero(matched)
+    # Best coverage first, then jobs needing more of the resume's skills
+    order = candidates[np.lexsort((-matched[candidates], -coverage[candidates]))][:limit]
+
+    vector = index.vector(skills)
+    reports = []
+    for row in order.tolist():
+        have, missing = index.gap(row, vector)
+        reports.append((int(index.job_ids[row]), {
+            'matched': have,
+            'missing': missing,
+            'score': float(coverage[row]),
+        }))
+    return reports, len(candidates)
+
+
+def skills_to_learn(resume, limit=10, skills=None):
+    """Skills the resume lacks, ranked by how many active jobs ask for them"""
+    index = get_index()
+    skills = resume_skills(resume) if skills is None else skills
+    if not len(index.job_ids):
+        return []
+
+    demand = index.demand * (1 - index.vector(skills))
+    top = np.argsort(-demand, kind='stable')[:limit]
+    return [(index.skill_names[column], int(demand[column])) for column in top.tolist() if demand[column] > 0]
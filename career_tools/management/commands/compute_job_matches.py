@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from career_tools.matching import refresh_matches
+
+
+class Command(BaseCommand):
+    help = 'Recompute top job matches per user and top candidates per job (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-n', type=int, default=20, help='Matches to keep per user and per job')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Resumes scored per matrix multiply')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stored = refresh_matches(top_n=options['top_n'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {stored} job matches in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from career_tools.salaries import refresh_cube
+
+
+class Command(BaseCommand):
+    help = 'Recompute salary percentiles for cube cells with new or changed submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every cell, not just stale ones')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = refresh_cube(full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {written} salary cube cells'))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from career_tools import rendering
+from career_tools.models import Resume
+
+
+class Command(BaseCommand):
+    help = 'Render resumes whose cached HTML/PDF is missing or stale (e.g. after a template change) across all cores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', action='append', dest='formats', choices=['html', 'pdf'],
+                            help='Repeat for several formats; defaults to every available format')
+        parser.add_argument('--template', help='Only resumes using this template')
+        parser.add_argument('--workers', type=int, help='Worker processes (defaults to the CPU count)')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help='Re-render even if the cached output is current')
+
+    def handle(self, *args, **options):
+        formats = options['formats'] or rendering.available_formats()
+        missing = set(formats) - set(rendering.available_formats())
+        if missing:
+            raise CommandError(f"Cannot render {', '.join(sorted(missing))}: install weasyprint for PDF output")
+
+        resumes = Resume.objects.order_by('pk')
+        if options['template']:
+            resumes = resumes.filter(template=options['template'])
+
+        started = time.monotonic()
+        rendered = 0
+        last_pk = 0
+        with rendering.process_pool(options['workers']) as pool:
+            while True:
+                pks = list(resumes.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['batch_size']])
+                if not pks:
+                    break
+                batch = rendering.resume_queryset().filter(pk__in=pks).order_by('pk')
+                rendered += rendering.render_resumes(batch, formats, pool=pool, force=options['force'])
+                last_pk = pks[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {rendered} documents in {time.monotonic() - started:.1f}s'
+        ))
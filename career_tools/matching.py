@@ -0,0 +1,156 @@
+"""
+Batch job <-> resume matching.
+
+Jobs and resumes are turned into TF-IDF weighted sparse skill vectors over a
+shared vocabulary, then scored with cosine similarity by multiplying chunks
+of the resume matrix against the job matrix. Only the top-N jobs per user and
+the top-N candidates per job are kept and written to JobMatch.
+"""
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+
+from jobs.models import Job
+from .models import Resume, ResumeSkill, JobMatch
+from .skills import SkillVocabulary, parse_skills, job_skills
+
+
+def load_job_skills():
+    """{job_id: skills} for every active job with at least one recognised skill"""
+    documents = {}
+    for pk, requirements in Job.objects.filter(is_active=True).values_list('pk', 'requirements').iterator(chunk_size=2000):
+        skills = job_skills(requirements)
+        if skills:
+            documents[pk] = skills
+    return documents
+
+
+def load_resume_skills():
+    """
+    {user_id: (resume_id, skills)} using each user's default resume,
+    falling back to their most recently updated one.
+    """
+    chosen = {}
+    for pk, user_id in Resume.objects.order_by('user_id', '-is_default', '-updated_at').values_list('pk', 'user_id'):
+        chosen.setdefault(user_id, pk)
+
+    skills_by_resume = {}
+    rows = ResumeSkill.objects.filter(resume_id__in=chosen.values()).values_list('resume_id', 'skills')
+    for resume_id, text in rows.iterator(chunk_size=2000):
+        skills_by_resume.setdefault(resume_id, set()).update(parse_skills(text))
+
+    return {
+        user_id: (resume_id, skills_by_resume[resume_id])
+        for user_id, resume_id in chosen.items()
+        if skills_by_resume.get(resume_id)
+    }
+
+
+def build_matrix(documents, vocabulary, idf):
+    """L2-normalised TF-IDF CSR matrix with one row per document"""
+    indptr = [0]
+    indices = []
+    for skills in documents:
+        indices.extend(vocabulary.columns(skills))
+        indptr.append(len(indices))
+
+    indices = np.asarray(indices, dtype=np.int32)
+    data = idf[indices].astype(np.float32)
+    matrix = sparse.csr_matrix((data, indices, np.asarray(indptr)), shape=(len(documents), len(vocabulary)))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def top_n_per_row(scores, n):
+    """Column indices of the n best non-zero scores in each row, best first"""
+    n = min(n, scores.shape[1])
+    if n == 0:
+        return [np.empty(0, dtype=np.intp) for _ in range(scores.shape[0])]
+    best = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    result = []
+    for row, columns in enumerate(best):
+        columns = columns[scores[row, columns] > 0]
+        result.append(columns[np.argsort(-scores[row, columns], kind='stable')])
+    return result
+
+
+def compute_matches(top_n=20, chunk_size=1000):
+    """Score every resume against every active job; return JobMatch rows to store"""
+    jobs = load_job_skills()
+    resumes = load_resume_skills()
+    if not jobs or not resumes:
+        return []
+
+    job_ids = list(jobs)
+    user_ids = list(resumes)
+    job_documents = [jobs[pk] for pk in job_ids]
+    resume_documents = [resumes[user_id][1] for user_id in user_ids]
+
+    # Only skills that appear on both sides can contribute to a score
+    shared = set().union(*job_documents) & set().union(*resume_documents)
+    vocabulary = SkillVocabulary([shared])
+    if not len(vocabulary):
+        return []
+
+    document_frequency = np.zeros(len(vocabulary), dtype=np.float64)
+    for skills in job_documents + resume_documents:
+        document_frequency[vocabulary.columns(skills)] += 1
+    total = len(job_documents) + len(resume_documents)
+    idf = np.log((1 + total) / (1 + document_frequency)) + 1
+
+    job_matrix_t = build_matrix(job_documents, vocabulary, idf).T.tocsr()
+    resume_matrix = build_matrix(resume_documents, vocabulary, idf)
+
+    pairs = {}
+    # Running top-N candidates per job: (scores, user row indices)
+    job_best_scores = np.zeros((len(job_ids), 0), dtype=np.float32)
+    job_best_users = np.zeros((len(job_ids), 0), dtype=np.intp)
+
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = (resume_matrix[start:start + chunk_size] @ job_matrix_t).toarray()
+
+        # Top jobs per user
+        for offset, columns in enumerate(top_n_per_row(chunk, top_n)):
+            for column in columns:
+                pairs[(start + offset, column)] = float(chunk[offset, column])
+
+        # Merge this chunk's candidates into each job's running top-N
+        merged_scores = np.hstack([job_best_scores, chunk.T])
+        merged_users = np.hstack([
+            job_best_users,
+            np.broadcast_to(np.arange(start, start + chunk.shape[0]), (len(job_ids), chunk.shape[0])),
+        ])
+        keep = min(top_n, merged_scores.shape[1])
+        best = np.argpartition(-merged_scores, keep - 1, axis=1)[:, :keep]
+        job_best_scores = np.take_along_axis(merged_scores, best, axis=1)
+        job_best_users = np.take_along_axis(merged_users, best, axis=1)
+
+    for column in range(len(job_ids)):
+        for score, row in zip(job_best_scores[column], job_best_users[column]):
+            if score > 0:
+                pairs[(int(row), column)] = float(score)
+
+    matches = []
+    for (row, column), score in pairs.items():
+        user_id = user_ids[row]
+        resume_id, skills = resumes[user_id]
+        job_id = job_ids[column]
+        matches.append(JobMatch(
+            user_id=user_id,
+            resume_id=resume_id,
+            job_id=job_id,
+            score=round(score, 4),
+            matched_skills=sorted(skills & jobs[job_id]),
+        ))
+    return matches
+
+
+def refresh_matches(top_n=20, chunk_size=1000, batch_size=2000):
+    """Recompute and atomically replace the stored matches"""
+    matches = compute_matches(top_n=top_n, chunk_size=chunk_size)
+    with transaction.atomic():
+        JobMatch.objects.all().delete()
+        JobMatch.objects.bulk_create(matches, batch_size=batch_size)
+    return len(matches)
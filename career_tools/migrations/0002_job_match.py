@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_tools', '0001_initial'),
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('matched_skills', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidate_matches', to='jobs.job')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to='career_tools.resume')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_matches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'career_tools_job_matches',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['user', '-score'], name='career_tool_user_id_1a197e_idx'), models.Index(fields=['job', '-score'], name='career_tool_job_id_8a8a95_idx')],
+                'unique_together': {('user', 'job')},
+            },
+        ),
+    ]
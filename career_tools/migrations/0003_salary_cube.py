@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_tools', '0002_job_match'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalaryCubeCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('discipline', models.CharField(blank=True, max_length=100)),
+                ('city', models.CharField(blank=True, max_length=100)),
+                ('experience_band', models.CharField(blank=True, max_length=10)),
+                ('company_size', models.CharField(blank=True, max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('p10', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('p25', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('median', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('p75', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('p90', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('is_stale', models.BooleanField(default=True, help_text='A submission in this cell changed since it was computed')),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'career_tools_salary_cube',
+                'indexes': [models.Index(condition=models.Q(('is_stale', True)), fields=['id'], name='salary_cube_stale_idx')],
+                'unique_together': {('discipline', 'city', 'experience_band', 'company_size')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career_tools', '0003_salary_cube'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedResume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('html', 'HTML'), ('pdf', 'PDF')], max_length=10)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('file', models.FileField(blank=True, upload_to='resumes/rendered/')),
+                ('requested_at', models.DateTimeField(auto_now=True)),
+                ('rendered_at', models.DateTimeField(blank=True, null=True)),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renders', to='career_tools.resume')),
+            ],
+            options={
+                'db_table': 'career_tools_rendered_resumes',
+                'indexes': [models.Index(fields=['status'], name='career_tool_status_19affa_idx')],
+                'unique_together': {('resume', 'format')},
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from core.models import LoadedValuesMixin
 
 
 class Resume(models.Model):
@@ -43,6 +44,44 @@ class Resume(models.Model):
         return f"{self.user.username} - {self.title}"
 
 
+class RenderedResume(models.Model):
+    """
+    Cached HTML/PDF output of a resume (see career_tools/rendering.py). Files
+    are named by the content hash of the resume, its sections and template,
+    so any edit or template change produces a new file.
+    """
+    FORMAT_CHOICES = [
+        ('html', 'HTML'),
+        ('pdf', 'PDF'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='renders')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    content_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='resumes/rendered/', blank=True)
+    requested_at = models.DateTimeField(auto_now=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'career_tools_rendered_resumes'
+        unique_together = ['resume', 'format']
+        indexes = [
+            models.Index(fields=['status']),
+        ]
+
+    def __str__(self):
+        return f"{self.resume} ({self.format}, {self.status})"
+
+    def is_current(self, content_hash):
+        return self.status == 'ready' and self.content_hash == content_hash and bool(self.file)
+
+
 class ResumeEducation(models.Model):
     """Education section of resume"""
     resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='education')
@@ -104,8 +143,12 @@ class ResumeProject(models.Model):
         ordering = ['order']
 
 
-class SalaryData(models.Model):
+class SalaryData(LoadedValuesMixin, models.Model):
     """Anonymous salary comparison data"""
+    # The salary cube cells the stored row counts towards, so an edit that
+    # moves it can mark the old cells stale too
+    loaded_values = {'_loaded_cube_fields': ['discipline', 'city', 'years_of_experience', 'company_size']}
+
     submitted_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
     # Job details
@@ -219,3 +262,63 @@ class CareerTransitionStory(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class JobMatch(models.Model):
+    """Precomputed resume-to-job similarity (see career_tools/matching.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='job_matches')
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='job_matches')
+    job = models.ForeignKey('jobs.Job', on_delete=models.CASCADE, related_name='candidate_matches')
+    score = models.FloatField()
+    matched_skills = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'career_tools_job_matches'
+        unique_together = ['user', 'job']
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['user', '-score']),
+            models.Index(fields=['job', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.job} ({self.score:.2f})"
+
+
+class SalaryCubeCell(models.Model):
+    """
+    Salary percentiles for one (discipline, city, experience band, company size)
+    combination, where '' in a dimension means "all". Built from SalaryData by
+    career_tools/salaries.py; salary pages read only this table.
+    """
+    discipline = models.CharField(max_length=100, blank=True)
+    city = models.CharField(max_length=100, blank=True)
+    experience_band = models.CharField(max_length=10, blank=True)
+    company_size = models.CharField(max_length=20, blank=True)
+
+    count = models.PositiveIntegerField(default=0)
+    # Monthly base salary (PKR); left empty below the privacy threshold
+    p10 = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    p25 = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    median = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    p75 = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    p90 = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    is_stale = models.BooleanField(default=True, help_text="A submission in this cell changed since it was computed")
+    computed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'career_tools_salary_cube'
+        unique_together = ['discipline', 'city', 'experience_band', 'company_size']
+        indexes = [
+            models.Index(fields=['id'], name='salary_cube_stale_idx', condition=models.Q(is_stale=True)),
+        ]
+
+    def __str__(self):
+        dimensions = [self.discipline, self.city, self.experience_band, self.company_size]
+        return ' / '.join(value or 'all' for value in dimensions) + f' ({self.count})'
+
+    @property
+    def is_published(self):
+        return self.median is not None
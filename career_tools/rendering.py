@@ -0,0 +1,216 @@
+"""
+Resume rendering to HTML and PDF.
+
+A resume and its sections are flattened into a plain snapshot whose SHA-256
+(together with the source of the chosen template) identifies the output.
+Rendered files are stored under that hash in RenderedResume, so downloads of
+an unchanged resume are served from storage and a template edit invalidates
+every resume using it.
+
+Rendering itself only needs the snapshot, never the database, so it runs in
+a process pool: the render_resumes command fans a whole table out across
+cores, and a PDF missing at download time is handed to a background pool
+instead of being rendered inside the request.
+
+PDF output needs `weasyprint` (in requirements.txt, but it also needs the
+Pango system libraries); without it only HTML is offered.
+"""
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+
+from . import workers
+from .models import Resume, RenderedResume
+
+try:
+    from weasyprint import HTML
+except (ImportError, OSError):  # pragma: no cover - not installed, or Pango missing
+    HTML = None
+
+
+CONTENT_TYPES = {
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+SECTIONS = {
+    'education': ['degree', 'institution', 'location', 'start_date', 'end_date',
+                  'currently_studying', 'gpa', 'achievements'],
+    'experience': ['position', 'company', 'location', 'start_date', 'end_date',
+                   'currently_working', 'responsibilities'],
+    'skills': ['category', 'skills'],
+    'projects': ['title', 'description', 'technologies', 'url'],
+}
+
+RESUME_FIELDS = ['title', 'full_name', 'email', 'phone', 'location', 'linkedin_url',
+                 'github_url', 'portfolio_url', 'summary', 'template']
+
+BACKGROUND_WORKERS = getattr(settings, 'RESUME_RENDER_WORKERS', 2)
+
+
+def available_formats():
+    return ['html', 'pdf'] if HTML is not None else ['html']
+
+
+def resume_queryset():
+    """Resumes with every section prefetched for snapshotting"""
+    return Resume.objects.prefetch_related(*SECTIONS)
+
+
+def snapshot(resume):
+    """Everything that affects the rendered output, as plain picklable data"""
+    data = {field: getattr(resume, field) for field in RESUME_FIELDS}
+    for section, fields in SECTIONS.items():
+        # Section managers are ordered by their Meta.ordering
+        data[section] = [
+            {field: getattr(row, field) for field in fields}
+            for row in getattr(resume, section).all()
+        ]
+    return data
+
+
+def template_name(template):
+    return f'career_tools/resumes/{template}.html'
+
+
+@lru_cache(maxsize=None)
+def template_fingerprint(template):
+    """Hash of the template source, so editing a template invalidates its renders"""
+    source = get_template(template_name(template)).template.source
+    base = get_template('career_tools/resumes/base.html').template.source
+    return hashlib.sha256((base + source).encode()).hexdigest()
+
+
+def content_hash(data):
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256((payload + template_fingerprint(data['template'])).encode()).hexdigest()
+
+
+def render_html(data):
+    return render_to_string(template_name(data['template']), {'resume': data})
+
+
+def render_document(data, file_format):
+    """Rendered bytes for one snapshot; runs in pool workers"""
+    html = render_html(data)
+    if file_format == 'pdf':
+        return HTML(string=html).write_pdf()
+    return html.encode()
+
+
+def save_file(file_format, digest, content):
+    """Write output under its content hash; identical resumes share one file"""
+    name = f'resumes/rendered/{digest}.{file_format}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return name
+
+
+def discard_file(name):
+    """Delete a superseded output file unless another render still points at it"""
+    if name and not RenderedResume.objects.filter(file=name).exists():
+        default_storage.delete(name)
+
+
+def store(resume_id, file_format, digest, content):
+    """Save rendered output and mark it ready, deleting the file it replaces"""
+    existing = RenderedResume.objects.filter(resume_id=resume_id, format=file_format)
+    previous = existing.values_list('file', flat=True).first()
+    rendered, _ = RenderedResume.objects.update_or_create(
+        resume_id=resume_id,
+        format=file_format,
+        defaults={
+            'content_hash': digest,
+            'status': 'ready',
+            'file': save_file(file_format, digest, content),
+            'rendered_at': timezone.now(),
+        },
+    )
+    if previous != rendered.file.name:
+        discard_file(previous)
+    return rendered
+
+
+def process_pool(max_workers=None):
+    """Pool of fresh interpreters; workers never share the parent's DB connections"""
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=workers.init,
+    )
+
+
+def render_resumes(resumes, formats, pool=None, force=False):
+    """
+    Render every resume/format whose stored output is missing or out of date,
+    in `pool` when given; returns the number of documents rendered.
+    """
+    resumes = list(resumes)
+    current = {
+        (rendered.resume_id, rendered.format): rendered
+        for rendered in RenderedResume.objects.filter(resume__in=resumes, format__in=formats)
+    }
+
+    jobs = []
+    for resume in resumes:
+        data = snapshot(resume)
+        digest = content_hash(data)
+        for file_format in formats:
+            rendered = current.get((resume.pk, file_format))
+            if force or rendered is None or not rendered.is_current(digest):
+                jobs.append((resume.pk, file_format, digest, data))
+    if not jobs:
+        return 0
+
+    if pool is None:
+        results = (render_document(data, file_format) for _, file_format, _, data in jobs)
+    else:
+        results = pool.map(workers.render_document, *zip(*[(data, file_format) for _, file_format, _, data in jobs]))
+
+    for (resume_id, file_format, digest, _), content in zip(jobs, results):
+        store(resume_id, file_format, digest, content)
+    return len(jobs)
+
+
+_background_pool = None
+
+
+def request_render(resume, file_format, data, digest):
+    """Queue a render for the background pool and return the pending row"""
+    rendered, _ = RenderedResume.objects.update_or_create(
+        resume=resume,
+        format=file_format,
+        defaults={'content_hash': digest, 'status': 'pending'},
+    )
+
+    def finished(future):
+        # Runs on a pool management thread of this process, which gets its own connection
+        pending = RenderedResume.objects.filter(resume=resume, format=file_format, content_hash=digest)
+        try:
+            previous = pending.values_list('file', flat=True).first()
+            name = save_file(file_format, digest, future.result())
+            # Only fill the row if no newer edit has re-queued it meanwhile
+            if pending.update(status='ready', file=name, rendered_at=timezone.now()) and previous != name:
+                discard_file(previous)
+        except Exception:
+            pending.update(status='failed')
+        finally:
+            connection.close()
+
+    def submit():
+        global _background_pool
+        if _background_pool is None:
+            _background_pool = process_pool(BACKGROUND_WORKERS)
+        _background_pool.submit(workers.render_document, data, file_format).add_done_callback(finished)
+
+    transaction.on_commit(submit)
+    return rendered
@@ -0,0 +1,170 @@
+"""
+Salary statistics cube.
+
+Every SalaryData row counts towards 16 SalaryCubeCell rows: each combination
+of its (discipline, city, experience band, company size) with any of the four
+dimensions replaced by '' ("all"). Saving or deleting a submission only marks
+those cells stale; `manage.py refresh_salary_cube` then loads the whole table
+into NumPy arrays once, computes percentiles for every group of every rollup
+with a single sort per rollup, and rewrites the stale cells.
+
+Cells with fewer than SALARY_MIN_CELL_COUNT submissions keep their count but
+never store percentiles, and the salary page only says "fewer than N" for
+them, so small groups can't be used to infer individual salaries.
+"""
+from itertools import product
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import SalaryData, SalaryCubeCell
+
+
+DIMENSIONS = ['discipline', 'city', 'experience_band', 'company_size']
+
+# (lowest years of experience, band label)
+EXPERIENCE_BANDS = [
+    (0, '0-2'),
+    (3, '3-5'),
+    (6, '6-10'),
+    (11, '11+'),
+]
+
+PERCENTILES = {'p10': 0.10, 'p25': 0.25, 'median': 0.50, 'p75': 0.75, 'p90': 0.90}
+
+MIN_CELL_COUNT = getattr(settings, 'SALARY_MIN_CELL_COUNT', 5)
+
+BAND_EDGES = np.array([low for low, _ in EXPERIENCE_BANDS[1:]])
+BAND_LABELS = [label for _, label in EXPERIENCE_BANDS]
+
+
+def clean(value):
+    return ' '.join(str(value or '').split())
+
+
+def experience_band(years):
+    return BAND_LABELS[int(np.digitize(years, BAND_EDGES))]
+
+
+def cell_key(discipline, city, years_of_experience, company_size):
+    """The fully specified cube key of one submission"""
+    return (clean(discipline), clean(city), experience_band(years_of_experience), company_size)
+
+
+def rollup_keys(key):
+    """The key itself plus every wildcarded combination of it"""
+    return set(product(*[(value, '') for value in key]))
+
+
+def mark_stale(keys):
+    """Create or flag the given cells for the next refresh"""
+    SalaryCubeCell.objects.bulk_create(
+        [SalaryCubeCell(**dict(zip(DIMENSIONS, key)), is_stale=True) for key in keys],
+        update_conflicts=True,
+        unique_fields=DIMENSIONS,
+        update_fields=['is_stale'],
+    )
+
+
+def load_table():
+    """Dimension codes, their labels and monthly salaries for every submission"""
+    rows = SalaryData.objects.values_list(
+        'discipline', 'city', 'years_of_experience', 'company_size', 'base_salary_monthly'
+    )
+    keys, salaries = [], []
+    for discipline, city, years, size, salary in rows.iterator(chunk_size=5000):
+        keys.append((clean(discipline), clean(city), years, size))
+        salaries.append(float(salary))
+
+    codes = np.zeros((len(keys), len(DIMENSIONS)), dtype=np.int64)
+    labels = []
+    for column, values in enumerate(zip(*keys) if keys else [()] * len(DIMENSIONS)):
+        if DIMENSIONS[column] == 'experience_band':
+            codes[:, column] = np.digitize(np.asarray(values, dtype=np.int64), BAND_EDGES)
+            labels.append(BAND_LABELS)
+        else:
+            names, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+            codes[:, column] = inverse
+            labels.append(list(names))
+    return codes, labels, np.asarray(salaries, dtype=np.float64)
+
+
+def group_percentiles(salaries, groups, group_count):
+    """Counts and linear-interpolated percentiles for each group, in one sort"""
+    order = np.lexsort((salaries, groups))
+    ordered = salaries[order]
+    counts = np.bincount(groups, minlength=group_count)
+    starts = np.cumsum(counts) - counts
+
+    quantiles = np.array(list(PERCENTILES.values()))
+    positions = starts[:, None] + quantiles[None, :] * np.maximum(counts - 1, 0)[:, None]
+    low = np.floor(positions).astype(np.int64)
+    high = np.ceil(positions).astype(np.int64)
+    values = ordered[low] + (ordered[high] - ordered[low]) * (positions - low)
+    return counts, values
+
+
+def compute_cube():
+    """{cube key: (count, {percentile: value})} for every non-empty cell"""
+    codes, labels, salaries = load_table()
+    if not len(salaries):
+        return {}
+
+    cube = {}
+    for kept in product([True, False], repeat=len(DIMENSIONS)):
+        columns = [column for column, keep in enumerate(kept) if keep]
+        if columns:
+            group_codes, groups = np.unique(codes[:, columns], axis=0, return_inverse=True)
+            groups = groups.ravel()
+        else:
+            group_codes, groups = np.zeros((1, 0), dtype=np.int64), np.zeros(len(salaries), dtype=np.int64)
+
+        counts, values = group_percentiles(salaries, groups, len(group_codes))
+        for group, group_code in enumerate(group_codes):
+            key = [''] * len(DIMENSIONS)
+            for column, code in zip(columns, group_code):
+                key[column] = labels[column][code]
+            cube[tuple(key)] = (int(counts[group]), dict(zip(PERCENTILES, values[group])))
+    return cube
+
+
+def refresh_cube(full=False, batch_size=1000):
+    """Recompute stale cells (or all cells); returns the number of cells written"""
+    cube = compute_cube()
+    now = timezone.now()
+
+    with transaction.atomic():
+        cells = SalaryCubeCell.objects.select_for_update()
+        if not full:
+            cells = cells.filter(is_stale=True)
+        existing = {tuple(getattr(cell, name) for name in DIMENSIONS): cell for cell in cells}
+        if full:
+            missing = set(cube) - set(existing)
+            for key in missing:
+                existing[key] = SalaryCubeCell(**dict(zip(DIMENSIONS, key)))
+
+        to_write, to_delete = [], []
+        for key, cell in existing.items():
+            if key not in cube:
+                # Every submission in this cell was deleted
+                to_delete.append(cell.pk)
+                continue
+            count, values = cube[key]
+            cell.count = count
+            for name, value in values.items():
+                setattr(cell, name, round(value, 2) if count >= MIN_CELL_COUNT else None)
+            cell.is_stale = False
+            cell.computed_at = now
+            to_write.append(cell)
+
+        SalaryCubeCell.objects.filter(pk__in=[pk for pk in to_delete if pk]).delete()
+        fields = ['count', *PERCENTILES, 'is_stale', 'computed_at']
+        SalaryCubeCell.objects.bulk_create(
+            [cell for cell in to_write if cell.pk is None], batch_size=batch_size
+        )
+        SalaryCubeCell.objects.bulk_update(
+            [cell for cell in to_write if cell.pk is not None], fields, batch_size=batch_size
+        )
+    return len(to_write)
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import salaries
+from .models import SalaryData
+
+
+def submission_keys(fields):
+    return salaries.rollup_keys(salaries.cell_key(
+        fields['discipline'], fields['city'], fields['years_of_experience'], fields['company_size']
+    ))
+
+
+@receiver(post_save, sender=SalaryData)
+@receiver(post_delete, sender=SalaryData)
+def mark_salary_cells_stale(sender, instance, **kwargs):
+    """Flag every cube cell the submission counts (or counted) towards"""
+    current = {name: getattr(instance, name) for name in ('discipline', 'city', 'years_of_experience', 'company_size')}
+    keys = submission_keys(current)
+    loaded = getattr(instance, '_loaded_cube_fields', None)
+    if loaded and loaded != current:
+        keys |= submission_keys(loaded)
+    salaries.mark_stale(keys)
+    instance._loaded_cube_fields = current
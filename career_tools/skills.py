@@ -0,0 +1,122 @@
+"""
+Shared skill vocabulary for resumes, jobs and mentors.
+
+Resume skills are comma-separated text and job requirements are free-form
+list items, so both are normalized to the same canonical skill names before
+anything compares them.
+"""
+import re
+
+
+# Common spellings/abbreviations -> canonical skill name
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'aws cloud': 'aws',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'cv': 'computer vision',
+    'auto cad': 'autocad',
+    'solid works': 'solidworks',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'plc programming': 'plc',
+    'embedded c': 'c',
+    'c/c++': 'c++',
+    'cpp': 'c++',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'golang': 'go',
+    'rest': 'rest api',
+    'restful api': 'rest api',
+    'restful apis': 'rest api',
+    'rest apis': 'rest api',
+    'ci/cd': 'ci cd',
+    'cicd': 'ci cd',
+}
+
+# Requirement items that describe experience or education rather than a skill
+NON_SKILL_PATTERN = re.compile(
+    r'\d+\+?\s*(years?|yrs?)|\b(degree|bachelor|bachelors|master|masters|phd|bsc|msc)\b|experience in|ability to',
+    re.IGNORECASE,
+)
+
+SPLIT_PATTERN = re.compile(r'[,;|\n]+')
+
+MAX_SKILL_WORDS = 4
+
+
+def normalize_skill(raw):
+    """Return the canonical name for a skill, or None if it isn't one"""
+    skill = ' '.join(raw.lower().split()).strip(' .:-*•')
+    if not skill or NON_SKILL_PATTERN.search(skill):
+        return None
+    if len(skill.split()) > MAX_SKILL_WORDS:
+        return None
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def parse_skills(text):
+    """Canonical skills from comma-separated text (ResumeSkill.skills, expertise areas)"""
+    skills = set()
+    for item in SPLIT_PATTERN.split(text or ''):
+        skill = normalize_skill(item)
+        if skill:
+            skills.add(skill)
+    return skills
+
+
+def job_skills(requirements):
+    """Canonical skills from a Job.requirements list"""
+    skills = set()
+    for item in requirements or []:
+        if isinstance(item, str):
+            skills |= parse_skills(item)
+    return skills
+
+
+class SkillVocabulary:
+    """Stable column ids for canonical skills"""
+
+    def __init__(self, documents=()):
+        self.ids = {}
+        for skills in documents:
+            self.update(skills)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, skill):
+        return skill in self.ids
+
+    def update(self, skills):
+        for skill in sorted(skills):
+            if skill not in self.ids:
+                self.ids[skill] = len(self.ids)
+
+    def columns(self, skills):
+        """Column ids of the known skills in a document"""
+        return sorted(self.ids[skill] for skill in skills if skill in self.ids)
+
+    def names(self):
+        names = [None] * len(self.ids)
+        for skill, column in self.ids.items():
+            names[column] = skill
+        return names
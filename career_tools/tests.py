@@ -1,3 +1,345 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.urls import reverse
+from jobs.models import Job
+from .models import Resume, ResumeSkill, JobMatch, SalaryData, SalaryCubeCell, RenderedResume
+from .skills import normalize_skill, parse_skills, job_skills
+from .matching import refresh_matches
+from . import salaries, rendering, gaps
+
+
+class SkillNormalizationTest(TestCase):
+    """Test the shared skill vocabulary"""
+
+    def test_aliases_map_to_canonical_names(self):
+        """Test common spellings collapse to one skill"""
+        self.assertEqual(normalize_skill(' ReactJS '), 'react')
+        self.assertEqual(normalize_skill('Postgres'), 'postgresql')
+        self.assertEqual(parse_skills('Python, py; JS'), {'python', 'javascript'})
+
+    def test_experience_items_are_not_skills(self):
+        """Test requirement lines about experience or degrees are dropped"""
+        self.assertEqual(
+            job_skills(['Python', 'Django', '3+ years experience', "Bachelor's degree in CS"]),
+            {'python', 'django'}
+        )
+
+
+class SkillFixtures:
+    """Jobs and resumes with skills"""
+
+    def create_job(self, title, requirements):
+        return Job.objects.create(
+            title=title,
+            company='Tech Corp',
+            location='Karachi',
+            description='Great opportunity',
+            requirements=requirements,
+            job_type='full-time',
+            experience_level='mid',
+            discipline='Software',
+            application_url='https://example.com/apply',
+        )
+
+    def create_resume(self, username, skills):
+        user = User.objects.create_user(username=username, password='testpass123')
+        resume = Resume.objects.create(
+            user=user,
+            title='My Resume',
+            full_name=username,
+            email=f'{username}@example.com',
+            phone='0300',
+            location='Karachi',
+            summary='Engineer',
+        )
+        ResumeSkill.objects.create(resume=resume, category='Skills', skills=skills)
+        return resume
+
+
+class JobMatchingTest(SkillFixtures, TestCase):
+    """Test batch resume-to-job matching"""
+
+    def setUp(self):
+        self.backend = self.create_job('Backend Engineer', ['Python', 'Django', 'PostgreSQL'])
+        self.frontend = self.create_job('Frontend Engineer', ['JavaScript', 'React', 'CSS'])
+        self.civil = self.create_job('Site Engineer', ['AutoCAD', 'Surveying'])
+
+        self.python_dev = self.create_resume('python_dev', 'Python, Django, Postgres, Docker')
+        self.web_dev = self.create_resume('web_dev', 'JS, ReactJS, CSS, Python')
+
+    def test_best_match_ranks_first(self):
+        """Test each user's top match is the job sharing most skills"""
+        refresh_matches(top_n=5)
+        best_backend = JobMatch.objects.filter(user=self.python_dev.user).first()
+        best_frontend = JobMatch.objects.filter(user=self.web_dev.user).first()
+        self.assertEqual(best_backend.job, self.backend)
+        self.assertEqual(best_frontend.job, self.frontend)
+        self.assertEqual(best_backend.matched_skills, ['django', 'postgresql', 'python'])
+
+    def test_jobs_without_shared_skills_are_not_stored(self):
+        """Test zero-similarity pairs are skipped"""
+        refresh_matches(top_n=5)
+        self.assertFalse(JobMatch.objects.filter(job=self.civil).exists())
+
+    def test_top_n_candidates_per_job(self):
+        """Test only the top N pairs per user and per job are stored"""
+        refresh_matches(top_n=1)
+        # web_dev shares Python with the backend job but is neither its best
+        # candidate nor has it as their best job, so the pair is dropped
+        candidates = list(JobMatch.objects.filter(job=self.backend).values_list('user__username', flat=True))
+        self.assertEqual(candidates, ['python_dev'])
+
+    def test_recommended_view(self):
+        """Test the recommended page lists stored matches"""
+        refresh_matches(top_n=5)
+        client = Client()
+        client.login(username='python_dev', password='testpass123')
+        response = client.get(reverse('jobs:recommended'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Backend Engineer')
+
+    def test_refresh_replaces_previous_matches(self):
+        """Test re-running drops matches for deactivated jobs"""
+        refresh_matches(top_n=5)
+        self.frontend.is_active = False
+        self.frontend.save()
+        refresh_matches(top_n=5)
+        self.assertFalse(JobMatch.objects.filter(job=self.frontend).exists())
+
+
+class SalaryCubeTest(TestCase):
+    """Test the salary percentile cube"""
+
+    def submit(self, salary, discipline='Software', city='Karachi', years=4, size='small'):
+        return SalaryData.objects.create(
+            position='Engineer', discipline=discipline, city=city, years_of_experience=years,
+            company_size=size, company_type='local', base_salary_monthly=salary,
+            satisfaction_rating=4, data_year=2024,
+        )
+
+    def cell(self, discipline='', city='', band='', size=''):
+        return SalaryCubeCell.objects.get(discipline=discipline, city=city, experience_band=band, company_size=size)
+
+    def test_submission_marks_rollup_cells_stale(self):
+        """Test a submission flags all 16 cells it counts towards"""
+        self.submit(100000)
+        self.assertEqual(SalaryCubeCell.objects.filter(is_stale=True).count(), 16)
+        self.assertEqual(self.cell(band='3-5').count, 0)
+
+    def test_percentiles_match_numpy(self):
+        """Test cube percentiles equal numpy's on the raw salaries"""
+        values = [80000, 95000, 100000, 120000, 150000, 210000]
+        for value in values:
+            self.submit(value)
+        self.submit(300000, city='Lahore', years=12)
+        call_command('refresh_salary_cube', stdout=StringIO())
+
+        cell = self.cell(discipline='Software', city='Karachi', band='3-5', size='small')
+        self.assertEqual(cell.count, 6)
+        self.assertAlmostEqual(float(cell.p10), np.percentile(values, 10), places=2)
+        self.assertAlmostEqual(float(cell.median), np.percentile(values, 50), places=2)
+        self.assertAlmostEqual(float(cell.p90), np.percentile(values, 90), places=2)
+        self.assertEqual(self.cell().count, 7)
+        self.assertFalse(SalaryCubeCell.objects.filter(is_stale=True).exists())
+
+    def test_small_cells_are_not_published(self):
+        """Test cells under the privacy threshold keep no percentiles"""
+        for value in [100000] * salaries.MIN_CELL_COUNT:
+            self.submit(value)
+        self.submit(500000, city='Quetta')
+        salaries.refresh_cube()
+
+        self.assertIsNone(self.cell(city='Quetta').median)
+        self.assertEqual(self.cell(city='Quetta').count, 1)
+        self.assertIsNotNone(self.cell(city='Karachi').median)
+
+    def test_incremental_refresh_only_touches_stale_cells(self):
+        """Test a new submission recomputes just its cells and a delete removes empty ones"""
+        self.submit(100000)
+        salaries.refresh_cube()
+        lahore = self.submit(200000, city='Lahore', years=1)
+        self.assertEqual(salaries.refresh_cube(), 16)
+        self.assertEqual(self.cell().count, 2)
+
+        lahore.delete()
+        salaries.refresh_cube()
+        self.assertFalse(SalaryCubeCell.objects.filter(city='Lahore').exists())
+        self.assertEqual(self.cell().count, 1)
+
+    def test_salary_page_reads_the_cube(self):
+        """Test the salary page shows cube percentiles without scanning submissions"""
+        for value in [90000, 100000, 110000, 120000, 130000]:
+            self.submit(value)
+        salaries.refresh_cube()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('career_tools:salaries'), {'discipline': 'Software'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '110,000')
+
+    def test_salary_page_buckets_small_cell_counts(self):
+        """Test unpublished bands show "fewer than N" instead of their submission count"""
+        for value in [90000, 100000, 110000, 120000, 130000]:
+            self.submit(value)
+        self.submit(80000, years=1)
+        self.submit(85000, years=1)
+        salaries.refresh_cube()
+
+        response = self.client.get(reverse('career_tools:salaries'), {'discipline': 'Software'})
+        self.assertContains(response, '<td class="py-2 text-gray-600">5</td>', html=True)
+        # 0-2 has two submissions; 6-10 and 11+ have none
+        self.assertContains(response, f'Fewer than {salaries.MIN_CELL_COUNT}', count=3)
+        self.assertNotContains(response, '<td class="py-2 text-gray-600">2</td>', html=True)
+
+
+class FakePDF:
+    """Stands in for weasyprint.HTML"""
+
+    def __init__(self, string):
+        self.string = string
+
+    def write_pdf(self):
+        return b'%PDF-' + self.string.encode()
+
+
+class ResumeRenderingTest(TestCase):
+    """Test cached resume rendering"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.resume = Resume.objects.create(
+            user=self.user, title='Backend Resume', full_name='Test User', email='test@example.com',
+            phone='0300', location='Karachi', summary='Backend engineer', template='technical',
+        )
+        ResumeSkill.objects.create(resume=self.resume, category='Languages', skills='Python, Go')
+        self.client.login(username='testuser', password='testpass123')
+
+    def url(self, file_format):
+        return reverse('career_tools:resume_download', args=[self.resume.pk, file_format])
+
+    def test_html_download_is_cached_by_content(self):
+        """Test repeat downloads reuse the stored render until the resume changes"""
+        with mock.patch.object(rendering, 'render_document', wraps=rendering.render_document) as render:
+            response = self.client.get(self.url('html'))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'Python, Go', b''.join(response.streaming_content))
+            self.client.get(self.url('html'))
+            self.assertEqual(render.call_count, 1)
+
+            ResumeSkill.objects.create(resume=self.resume, category='Tools', skills='Docker')
+            self.client.get(self.url('html'))
+            self.assertEqual(render.call_count, 2)
+
+    def test_rerender_deletes_superseded_file(self):
+        """Test replacing a render removes the old file from storage"""
+        self.client.get(self.url('html'))
+        old = RenderedResume.objects.get(format='html').file.name
+        self.assertTrue(default_storage.exists(old))
+
+        ResumeSkill.objects.create(resume=self.resume, category='Tools', skills='Docker')
+        self.client.get(self.url('html'))
+        new = RenderedResume.objects.get(format='html').file.name
+        self.assertNotEqual(new, old)
+        self.assertTrue(default_storage.exists(new))
+        self.assertFalse(default_storage.exists(old))
+
+    def test_pdf_is_never_rendered_in_the_request(self):
+        """Test a missing PDF is queued and served once the background render lands"""
+        with mock.patch.object(rendering, 'HTML', FakePDF), \
+                mock.patch.object(rendering, 'render_document', wraps=rendering.render_document) as render:
+            response = self.client.get(self.url('pdf'))
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(render.call_count, 0)
+            self.assertEqual(RenderedResume.objects.get(format='pdf').status, 'pending')
+
+            # What the background pool (or render_resumes) does
+            rendering.render_resumes(rendering.resume_queryset(), ['pdf'])
+            response = self.client.get(self.url('pdf'))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF-'))
+
+    def test_pdf_unavailable_without_weasyprint(self):
+        """Test PDF downloads 404 when the optional renderer isn't installed"""
+        with mock.patch.object(rendering, 'HTML', None):
+            self.assertEqual(self.client.get(self.url('pdf')).status_code, 404)
+
+    def test_other_users_resumes_are_private(self):
+        """Test a user can't download someone else's resume"""
+        User.objects.create_user(username='other', password='testpass123')
+        self.client.login(username='other', password='testpass123')
+        self.assertEqual(self.client.get(self.url('html')).status_code, 404)
+
+    def test_render_command_uses_process_pool(self):
+        """Test the bulk command renders stale resumes in worker processes"""
+        output = StringIO()
+        call_command('render_resumes', '--format', 'html', '--workers', '1', stdout=output)
+        self.assertIn('Rendered 1 documents', output.getvalue())
+        self.assertEqual(RenderedResume.objects.get().status, 'ready')
+
+        output = StringIO()
+        call_command('render_resumes', '--format', 'html', '--workers', '1', stdout=output)
+        self.assertIn('Rendered 0 documents', output.getvalue())
+
+
+class SkillGapTest(SkillFixtures, TestCase):
+    """Test resume keyword gap analysis"""
+
+    def setUp(self):
+        self.backend = self.create_job('Backend Engineer', ['Python', 'Django', 'PostgreSQL', 'Docker'])
+        self.frontend = self.create_job('Frontend Engineer', ['JavaScript', 'React', 'Docker'])
+        self.civil = self.create_job('Site Engineer', ['AutoCAD', 'Surveying'])
+        self.resume = self.create_resume('python_dev', 'Python, Django, Postgres')
+
+    def test_single_job_report(self):
+        """Test a report lists matched and missing skills with coverage"""
+        report = gaps.gap_report(self.resume, self.backend)
+        self.assertEqual(report['matched'], ['django', 'postgresql', 'python'])
+        self.assertEqual(report['missing'], ['docker'])
+        self.assertEqual(report['score'], 0.75)
+
+    def test_batch_reports_agree_with_single_reports(self):
+        """Test the vectorized pass ranks jobs and matches the per-job report"""
+        reports, total = gaps.gap_reports(self.resume)
+        self.assertEqual(total, 1)
+        job_id, report = reports[0]
+        self.assertEqual(job_id, self.backend.pk)
+        self.assertEqual(report, gaps.gap_report(self.resume, self.backend))
+
+    def test_skills_to_learn_ranked_by_demand(self):
+        """Test missing skills are ranked by how many jobs want them"""
+        self.assertEqual(gaps.skills_to_learn(self.resume, limit=1), [('docker', 2)])
+
+    def test_index_rebuilds_after_job_changes(self):
+        """Test new jobs show up without restarting the process"""
+        gaps.gap_reports(self.resume)
+        self.create_job('Data Engineer', ['Python', 'Spark'])
+        _, total = gaps.gap_reports(self.resume)
+        self.assertEqual(total, 2)
+
+    def test_gap_view(self):
+        """Test the gap page is limited to the resume's owner"""
+        url = reverse('career_tools:resume_gaps', args=[self.resume.pk])
+        self.client.login(username='python_dev', password='testpass123')
+        response = self.client.get(url)
+        self.assertContains(response, 'Backend Engineer')
+        self.assertContains(response, 'docker')
+        response = self.client.get(url, {'job': self.frontend.pk})
+        self.assertContains(response, 'Frontend Engineer')
+
+        User.objects.create_user(username='other', password='testpass123')
+        self.client.login(username='other', password='testpass123')
+        self.assertEqual(self.client.get(url).status_code, 404)
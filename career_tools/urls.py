@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+app_name = 'career_tools'
+
+urlpatterns = [
+    path('salaries/', views.SalaryInsightsView.as_view(), name='salaries'),
+    path('resumes/<int:pk>/gaps/', views.ResumeGapView.as_view(), name='resume_gaps'),
+    path('resumes/<int:pk>/download/<str:file_format>/', views.download_resume, name='resume_download'),
+]
@@ -1,3 +1,126 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Q
+from django.http import FileResponse, Http404
+from django.shortcuts import render, get_object_or_404
+from django.utils.text import slugify
+from django.views.generic import ListView, DetailView
 
-# Create your views here.
+from jobs.models import Job
+from . import gaps, rendering
+from .models import Resume, SalaryData, SalaryCubeCell, RenderedResume
+from .salaries import BAND_LABELS, MIN_CELL_COUNT
+
+
+class SalaryInsightsView(ListView):
+    """Salary percentiles by experience band, served entirely from the salary cube"""
+    template_name = 'career_tools/salaries.html'
+    context_object_name = 'bands'
+
+    def get_filters(self):
+        return {
+            'discipline': self.request.GET.get('discipline', '').strip(),
+            'city': self.request.GET.get('city', '').strip(),
+            'company_size': self.request.GET.get('size', ''),
+        }
+
+    def get_queryset(self):
+        # One row per experience band plus the all-experience row ('')
+        cells = {
+            cell.experience_band: cell
+            for cell in SalaryCubeCell.objects.filter(**self.get_filters())
+        }
+        self.overall = cells.get('')
+        return [(label, cells.get(label)) for label in BAND_LABELS]
+
+    def get_filter_options(self):
+        """Disciplines and cities with enough submissions to publish"""
+        options = {'discipline': [], 'city': []}
+        rows = SalaryCubeCell.objects.filter(
+            Q(city='') | Q(discipline=''),
+            experience_band='',
+            company_size='',
+            count__gte=MIN_CELL_COUNT,
+        ).values_list('discipline', 'city')
+        for discipline, city in rows:
+            if discipline and not city:
+                options['discipline'].append(discipline)
+            elif city and not discipline:
+                options['city'].append(city)
+        return {name: sorted(values) for name, values in options.items()}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Engineering Salaries - engg.pk'
+        context['meta_description'] = 'Monthly salary percentiles for engineers in Pakistan by discipline, city, experience and company size.'
+        context['overall'] = self.overall
+        context['filters'] = self.get_filters()
+        context['options'] = self.get_filter_options()
+        context['company_sizes'] = SalaryData._meta.get_field('company_size').choices
+        context['min_count'] = MIN_CELL_COUNT
+        return context
+
+
+@login_required
+def download_resume(request, pk, file_format):
+    """
+    Serve a rendered resume from the content-hash cache. HTML is cheap enough
+    to render on a miss; PDFs are queued for the background pool and the page
+    refreshes until the file is ready.
+    """
+    if file_format not in rendering.available_formats():
+        raise Http404('Format not available')
+    resume = get_object_or_404(rendering.resume_queryset(), pk=pk, user=request.user)
+
+    data = rendering.snapshot(resume)
+    digest = rendering.content_hash(data)
+    rendered = RenderedResume.objects.filter(resume=resume, format=file_format).first()
+
+    if rendered is None or not rendered.is_current(digest):
+        if file_format == 'html':
+            rendered = rendering.store(resume.pk, file_format, digest, rendering.render_document(data, file_format))
+        else:
+            if rendered is None or rendered.content_hash != digest or rendered.status == 'failed':
+                rendered = rendering.request_render(resume, file_format, data, digest)
+            return render(request, 'career_tools/resume_pending.html', {
+                'page_title': f'Preparing {resume.title} - engg.pk',
+                'resume': resume,
+                'rendered': rendered,
+            }, status=202)
+
+    filename = slugify(f'{resume.full_name} {resume.title}') or 'resume'
+    return FileResponse(
+        rendered.file.open('rb'),
+        as_attachment=file_format == 'pdf',
+        filename=f'{filename}.{file_format}',
+        content_type=rendering.CONTENT_TYPES[file_format],
+    )
+
+
+class ResumeGapView(LoginRequiredMixin, DetailView):
+    """Skills a resume covers and misses across active jobs, or for one job (?job=)"""
+    template_name = 'career_tools/gaps.html'
+    context_object_name = 'resume'
+
+    def get_queryset(self):
+        return Resume.objects.filter(user=self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = f'Skill Gaps for {self.object.title} - engg.pk'
+        skills = gaps.resume_skills(self.object)
+        context['skills'] = sorted(skills)
+
+        job_id = self.request.GET.get('job', '')
+        if job_id.isdigit():
+            job = get_object_or_404(Job, pk=job_id, is_active=True)
+            context['job'] = job
+            context['report'] = gaps.gap_report(self.object, job)
+            return context
+
+        reports, total = gaps.gap_reports(self.object, skills=skills)
+        jobs = Job.objects.in_bulk([job_id for job_id, _ in reports])
+        context['reports'] = [(jobs[job_id], report) for job_id, report in reports if job_id in jobs]
+        context['matching_jobs'] = total
+        context['skills_to_learn'] = gaps.skills_to_learn(self.object, skills=skills)
+        return context
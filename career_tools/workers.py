@@ -0,0 +1,16 @@
+"""
+Process-pool entry points for spawned workers.
+
+Spawned interpreters unpickle these by import path before Django is set up,
+so this module must not import models at load time.
+"""
+import django
+
+
+def init():
+    django.setup()
+
+
+def render_document(data, file_format):
+    from .rendering import render_document
+    return render_document(data, file_format)
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+from location import geohash
+
+
+def hash_hubs(apps, schema_editor):
+    LocalHub = apps.get_model('community', 'LocalHub')
+    hubs = list(LocalHub.objects.filter(latitude__isnull=False, longitude__isnull=False).only('latitude', 'longitude'))
+    for hub in hubs:
+        hub.geohash = geohash.encode(hub.latitude, hub.longitude)
+    LocalHub.objects.bulk_update(hubs, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='localhub',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(hash_hubs, migrations.RunPython.noop),
+    ]
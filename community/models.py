@@ -1,8 +1,10 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from location.models import GeohashedModel
 
-class LocalHub(models.Model):
+
+class LocalHub(GeohashedModel):
     """Local hubs directory (coworking, makerspaces, etc.)"""
     name = models.CharField(max_length=200)
     description = models.TextField()
@@ -63,6 +63,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'gamification.middleware.ActivityMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
@@ -108,6 +109,34 @@ DATABASES = {
 #     }
 # }
 
+# Cache
+# Management commands (cron) and web workers signal each other through
+# version keys in the cache (job facets, job pages, calendar feeds, the map
+# index), so production needs one cache shared by every process. The
+# per-process local-memory default is only suitable for development.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Incremental batch jobs (funnel rollups, reputation flushes) leave rows this
+# recent for the next run, so rows from transactions still committing aren't skipped
+CHECKPOINT_SETTLE_SECONDS = config('CHECKPOINT_SETTLE_SECONDS', default=300, cast=int)
+
+# Public base URL for absolute links built outside a request (calendar feeds);
+# feeds are cached and shared, so they must not take it from the Host header
+SITE_URL = config('SITE_URL', default='http://localhost:8000')
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -129,6 +158,9 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 
 # WhiteNoise configuration for serving static files
 STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
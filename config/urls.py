@@ -14,9 +14,14 @@ urlpatterns = [
     path('universities/', include('universities.urls')),
     path('careers/', include('careers.urls')),
     path('jobs/', include('jobs.urls')),
+    path('career-tools/', include('career_tools.urls')),
+    path('gamification/', include('gamification.urls')),
+    path('network/', include('networking.urls')),
+    path('mentorship/', include('mentorship.urls')),
     path('scholarships/', include('scholarships.urls')),
     path('insights/', include('insights.urls')),
     path('startups/', include('startups.urls')),
+    path('location/', include('location.urls')),
 ]
 
 # Serve media files in development
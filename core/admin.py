@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, SubjectConnection
+from .models import UserProfile, SubjectConnection, SavedSearch, SearchAlert
 
 
 @admin.register(UserProfile)
@@ -27,3 +27,19 @@ class SubjectConnectionAdmin(admin.ModelAdmin):
     list_display = ['subject', 'created_at', 'updated_at']
     search_fields = ['subject', 'description']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ['user', 'kind', 'name', 'search', 'job_type', 'discipline', 'level', 'is_active', 'created_at']
+    list_filter = ['kind', 'is_active']
+    search_fields = ['user__username', 'name', 'search']
+    readonly_fields = ['created_at']
+
+
+@admin.register(SearchAlert)
+class SearchAlertAdmin(admin.ModelAdmin):
+    list_display = ['user', 'saved_search', 'content_type', 'object_id', 'is_sent', 'created_at']
+    list_filter = ['is_sent', 'content_type']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at']
@@ -0,0 +1,125 @@
+"""
+Saved-search alerts.
+
+Instead of re-running every saved search on a timer, each newly created job
+or scholarship is "percolated": its discrete attributes select the handful of
+saved searches that could match it (an indexed lookup on the single-valued
+filter columns of SavedSearch), and only those candidates are checked in full.
+Matches are queued as SearchAlert rows for delivery.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+
+from jobs.facets import FACETS as JOB_FACETS
+from jobs.models import Job
+from scholarships.models import Scholarship
+from .models import SavedSearch, SearchAlert
+
+
+class SearchKind:
+    """How a list view's query parameters map onto one model"""
+
+    def __init__(self, model, filters, search_fields, indexed):
+        self.model = model
+        # URL parameter -> model field
+        self.filters = filters
+        # Fields the list view's ?search= matches with icontains
+        self.search_fields = search_fields
+        # SavedSearch column -> URL parameter
+        self.indexed = indexed
+
+    def item_value(self, item, param):
+        return getattr(item, self.filters[param])
+
+    def matches(self, saved_search, item):
+        for param, selected in saved_search.params.items():
+            if param in self.filters and selected and self.item_value(item, param) not in selected:
+                return False
+
+        search = saved_search.search.lower()
+        if search:
+            return any(search in (getattr(item, field) or '').lower() for field in self.search_fields)
+        return True
+
+
+KINDS = {
+    'job': SearchKind(
+        model=Job,
+        filters=JOB_FACETS,
+        search_fields=['title', 'company', 'location'],
+        indexed={'job_type': 'type', 'discipline': 'discipline', 'level': 'level'},
+    ),
+    'scholarship': SearchKind(
+        model=Scholarship,
+        filters={'level': 'level'},
+        search_fields=['name', 'provider', 'country'],
+        indexed={'level': 'level'},
+    ),
+}
+
+
+def save_search(user, kind, query, name=''):
+    """Create a SavedSearch from a list view's GET parameters"""
+    config = KINDS[kind]
+    params = {
+        param: [value for value in query.getlist(param) if value]
+        for param in config.filters
+    }
+    params = {param: values for param, values in params.items() if values}
+
+    saved_search = SavedSearch(
+        user=user,
+        kind=kind,
+        name=name,
+        search=query.get('search', '').strip(),
+        params=params,
+    )
+    # Only a single selected value can be used as an indexed equality filter;
+    # multi-select stays blank (any) here and is checked against params.
+    for column, param in config.indexed.items():
+        values = params.get(param, [])
+        if len(values) == 1:
+            setattr(saved_search, column, values[0])
+    saved_search.save()
+    return saved_search
+
+
+def candidate_filter(config, item):
+    """Saved searches whose indexed columns are blank (any) or equal the item's value"""
+    condition = Q()
+    for column, param in config.indexed.items():
+        condition &= Q(**{f'{column}__in': ['', config.item_value(item, param)]})
+    return condition
+
+
+def percolate(kind, items):
+    """Match new items against saved searches and queue alerts; returns alerts queued"""
+    config = KINDS[kind]
+    content_type = ContentType.objects.get_for_model(config.model)
+
+    # Items sharing indexed values share the same candidate set
+    groups = {}
+    for item in items:
+        key = tuple(config.item_value(item, param) for param in config.indexed.values())
+        groups.setdefault(key, []).append(item)
+
+    alerts = []
+    for group in groups.values():
+        candidates = SavedSearch.objects.filter(
+            candidate_filter(config, group[0]),
+            kind=kind,
+            is_active=True,
+        ).only('id', 'user_id', 'search', 'params')
+
+        for saved_search in candidates:
+            for item in group:
+                if config.matches(saved_search, item):
+                    alerts.append(SearchAlert(
+                        saved_search_id=saved_search.id,
+                        user_id=saved_search.user_id,
+                        content_type=content_type,
+                        object_id=item.pk,
+                    ))
+
+    SearchAlert.objects.bulk_create(alerts, batch_size=1000, ignore_conflicts=True)
+    return len(alerts)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def shared_cache(app_configs, **kwargs):
+    """Cron commands bump cache version keys that web workers must see"""
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith(('LocMemCache', 'DummyCache')):
+        return [Warning(
+            'The default cache is not shared between processes.',
+            hint='Set REDIS_URL so invalidations from management commands reach the web workers.',
+            id='core.W001',
+        )]
+    return []
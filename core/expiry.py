@@ -0,0 +1,54 @@
+"""
+Expiry sweeper for time-bounded listings.
+
+List views filter on is_active alone (served by partial indexes over the
+active rows) instead of comparing deadlines on every request, so a scheduled
+run of `manage.py expire_listings` flips rows whose date has passed.
+"""
+from django.utils import timezone
+
+from business.models import FundingOpportunity
+from jobs import facets, similar
+from jobs.models import Job
+from marketplace.models import Conference, FreelanceProject
+from projects.models import Competition
+from scholarships.models import Scholarship
+
+
+# (model, date field) - a row expires once the date is before today
+EXPIRING_LISTINGS = [
+    (Job, 'expires_on'),
+    (Scholarship, 'deadline'),
+    (FundingOpportunity, 'application_deadline'),
+    (Conference, 'paper_submission_deadline'),
+    (FreelanceProject, 'deadline'),
+    (Competition, 'registration_deadline'),
+]
+
+
+def expire_model(model, date_field, today, batch_size=1000, dry_run=False):
+    """Deactivate expired rows in primary-key batches; returns the number expired"""
+    expired = model.objects.filter(is_active=True, **{f'{date_field}__lt': today})
+    if dry_run:
+        return expired.count()
+
+    total = 0
+    while True:
+        pks = list(expired.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        total += model.objects.filter(pk__in=pks).update(is_active=False)
+
+
+def expire_listings(today=None, batch_size=1000, dry_run=False):
+    """Run the sweeper over every listing type; returns {label: count}"""
+    today = today or timezone.localdate()
+    results = {}
+    for model, date_field in EXPIRING_LISTINGS:
+        results[model._meta.label] = expire_model(model, date_field, today, batch_size, dry_run)
+
+    # Queryset updates bypass the signals that keep the job facet index and detail cache fresh
+    if results[Job._meta.label] and not dry_run:
+        facets.invalidate()
+        similar.invalidate()
+    return results
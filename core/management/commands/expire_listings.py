@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.expiry import expire_listings
+
+
+class Command(BaseCommand):
+    help = 'Deactivate jobs, scholarships, funding, conferences, projects and competitions past their deadline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would expire')
+
+    def handle(self, *args, **options):
+        results = expire_listings(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'would expire' if options['dry_run'] else 'expired'
+        for label, count in results.items():
+            self.stdout.write(f'{label}: {count} {verb}')
+        self.stdout.write(self.style.SUCCESS(f'{sum(results.values())} listings {verb}'))
@@ -1,5 +1,11 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 
 class UserProfile(models.Model):
@@ -42,3 +48,136 @@ class SubjectConnection(models.Model):
 
     def __str__(self):
         return self.subject
+
+
+class SavedSearch(models.Model):
+    """A user's saved job/scholarship filter + search combination"""
+    KIND_CHOICES = [
+        ('job', 'Jobs'),
+        ('scholarship', 'Scholarships'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=200, blank=True)
+    search = models.CharField(max_length=200, blank=True)
+    params = models.JSONField(default=dict, help_text="Full filter selection, {param: [values]}")
+
+    # Single-valued discrete filters, blank = any. New items are percolated
+    # against the saved searches these columns select (see core/alerts.py).
+    job_type = models.CharField(max_length=20, blank=True)
+    discipline = models.CharField(max_length=100, blank=True)
+    level = models.CharField(max_length=20, blank=True)
+
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'Saved Searches'
+        indexes = [
+            models.Index(fields=['kind', 'job_type', 'discipline', 'level']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.name or self.get_kind_display()}"
+
+
+class SearchAlert(models.Model):
+    """Queued notification: a new job/scholarship matched a saved search"""
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='alerts')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_alerts')
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    matched_object = GenericForeignKey('content_type', 'object_id')
+
+    is_sent = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['saved_search', 'content_type', 'object_id']
+        indexes = [
+            models.Index(fields=['user', 'is_sent']),
+        ]
+
+    def __str__(self):
+        return f"Alert for {self.user.username}: {self.matched_object}"
+
+
+class Checkpoint(models.Model):
+    """High-water mark for incremental batch jobs (last processed row id)"""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+    @classmethod
+    def locked(cls, name):
+        """Fetch (creating if needed) and row-lock a checkpoint; call inside a transaction"""
+        cls.objects.get_or_create(name=name)
+        return cls.objects.select_for_update().get(name=name)
+
+    def pending(self, queryset):
+        """Rows of `queryset` past this checkpoint that are safe to process, in id order"""
+        return self.settled(queryset, self.position)
+
+    @staticmethod
+    def settled(queryset, position=0):
+        """
+        Rows of `queryset` with ids past `position` that are safe to process, in id order.
+
+        Ids are allocated before commit, so a row can become visible after rows
+        with higher ids were processed. Stopping at the first row created within
+        CHECKPOINT_SETTLE_SECONDS leaves time for those late commits; the window
+        must be longer than any transaction that writes the rows.
+        """
+        pending = queryset.filter(id__gt=position).order_by('id')
+        cutoff = timezone.now() - timedelta(seconds=settings.CHECKPOINT_SETTLE_SECONDS)
+        first_recent = pending.filter(created_at__gte=cutoff).values_list('id', flat=True).first()
+        if first_recent is not None:
+            pending = pending.filter(id__lt=first_recent)
+        return pending
+
+
+class CounterFieldsMixin:
+    """
+    Keeps signal-maintained counters out of full saves.
+
+    Counters listed in `counter_fields` only change through F() updates; a
+    full save() of an instance loaded earlier would write its stale values
+    back, so it saves every other field instead.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class LoadedValuesMixin:
+    """
+    Remembers stored values on load so signals can tell what an edit changed.
+
+    `loaded_values` maps an attribute name to a field name, stored as that
+    field's value, or to a list of field names, stored as a {name: value} dict.
+    Signal handlers refresh the attribute after each save.
+    """
+    loaded_values = {}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        for attribute, fields in cls.loaded_values.items():
+            if isinstance(fields, str):
+                setattr(instance, attribute, instance.__dict__.get(fields))
+            else:
+                setattr(instance, attribute, {name: instance.__dict__.get(name) for name in fields})
+        return instance
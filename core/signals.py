@@ -0,0 +1,39 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from jobs.models import Job
+from scholarships.models import Scholarship
+from . import alerts
+
+
+# Users whose delete() is in progress. Handlers on rows cascading from a user
+# check this so they don't write new rows pointing at the user being deleted.
+_deleting_users = set()
+
+
+def being_deleted(user_id):
+    return user_id in _deleting_users
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    _deleting_users.add(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _deleting_users.discard(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def percolate_new_job(sender, instance, created, **kwargs):
+    if created and instance.is_active:
+        transaction.on_commit(lambda: alerts.percolate('job', [instance]))
+
+
+@receiver(post_save, sender=Scholarship)
+def percolate_new_scholarship(sender, instance, created, **kwargs):
+    if created and instance.is_active:
+        transaction.on_commit(lambda: alerts.percolate('scholarship', [instance]))
@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from io import StringIO
+
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import QueryDict
+from django.urls import reverse
+from django.utils import timezone
+from jobs.models import Job
+from scholarships.models import Scholarship
+from .models import SavedSearch, SearchAlert
+from .alerts import save_search, percolate
+from .expiry import expire_listings
+from .checks import shared_cache
+
+
+class SavedSearchAlertTest(TestCase):
+    """Test saved-search percolation for new jobs and scholarships"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+
+    def create_job(self, **kwargs):
+        defaults = {
+            'title': 'Backend Engineer',
+            'company': 'Tech Corp',
+            'location': 'Karachi',
+            'description': 'Great opportunity',
+            'job_type': 'full-time',
+            'experience_level': 'mid',
+            'discipline': 'Software',
+            'application_url': 'https://example.com/apply',
+        }
+        defaults.update(kwargs)
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(**defaults)
+
+    def test_save_search_indexes_single_valued_filters(self):
+        """Test single selections fill indexed columns and multi-select stays blank"""
+        saved = save_search(self.user, 'job', QueryDict('type=full-time&discipline=Software&discipline=Civil&search=python'))
+        self.assertEqual(saved.job_type, 'full-time')
+        self.assertEqual(saved.discipline, '')
+        self.assertEqual(saved.params, {'type': ['full-time'], 'discipline': ['Software', 'Civil']})
+        self.assertEqual(saved.search, 'python')
+
+    def test_new_job_queues_alerts_for_matching_searches(self):
+        """Test a new job alerts only the saved searches it matches"""
+        matching = save_search(self.user, 'job', QueryDict('discipline=Software&search=backend'))
+        save_search(self.other, 'job', QueryDict('discipline=Civil'))
+        save_search(self.other, 'job', QueryDict('level=senior'))
+
+        job = self.create_job()
+
+        alerts = SearchAlert.objects.all()
+        self.assertEqual(alerts.count(), 1)
+        self.assertEqual(alerts[0].saved_search, matching)
+        self.assertEqual(alerts[0].matched_object, job)
+
+    def test_multi_select_and_location_checked_in_full(self):
+        """Test non-indexed filters are verified on the candidates"""
+        save_search(self.user, 'job', QueryDict('discipline=Software&discipline=Civil&location=Lahore'))
+        self.create_job(location='Karachi')
+        self.assertFalse(SearchAlert.objects.exists())
+        self.create_job(location='Lahore', discipline='Civil')
+        self.assertEqual(SearchAlert.objects.count(), 1)
+
+    def test_percolate_batches_and_ignores_duplicates(self):
+        """Test percolating the same items twice queues each alert once"""
+        save_search(self.user, 'job', QueryDict(''))
+        jobs = [self.create_job(title=f'Engineer {i}') for i in range(3)]
+        percolate('job', jobs)
+        self.assertEqual(SearchAlert.objects.count(), 3)
+
+    def test_new_scholarship_matches_level(self):
+        """Test scholarship alerts use the level filter"""
+        save_search(self.user, 'scholarship', QueryDict('level=graduate'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Scholarship.objects.create(
+                name='Fulbright', provider='USEFP', country='USA', level='graduate',
+                amount='Full', deadline=timezone.now().date() + timedelta(days=30),
+                description='Study in the USA', application_url='https://example.com',
+                funded='fully',
+            )
+        self.assertEqual(SearchAlert.objects.count(), 1)
+
+    def test_save_search_view(self):
+        """Test saving a search from the list page"""
+        client = Client()
+        client.login(username='testuser', password='testpass123')
+        response = client.post(reverse('core:save_search', args=['job']), {'type': 'internship'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SavedSearch.objects.get(user=self.user).job_type, 'internship')
+
+
+class ExpireListingsTest(TestCase):
+    """Test the expiry sweeper for time-bounded listings"""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.create_scholarship('Expired', self.today - timedelta(days=1))
+        self.create_scholarship('Due Today', self.today)
+        self.job = Job.objects.create(
+            title='Old Posting', company='Tech Corp', location='Karachi',
+            description='Closed', job_type='full-time', experience_level='mid',
+            discipline='Software', application_url='https://example.com/apply',
+            expires_on=self.today - timedelta(days=3),
+        )
+        Job.objects.create(
+            title='Open Posting', company='Tech Corp', location='Karachi',
+            description='Open', job_type='full-time', experience_level='mid',
+            discipline='Software', application_url='https://example.com/apply',
+        )
+
+    def create_scholarship(self, name, deadline):
+        return Scholarship.objects.create(
+            name=name, provider='HEC', country='Pakistan', level='graduate',
+            amount='Full', deadline=deadline, description='Scholarship',
+            application_url='https://example.com', funded='fully',
+        )
+
+    def test_expires_only_past_deadlines(self):
+        """Test rows due today stay active and past rows are deactivated"""
+        results = expire_listings(batch_size=1)
+        self.assertEqual(results['scholarships.Scholarship'], 1)
+        self.assertEqual(results['jobs.Job'], 1)
+        self.assertEqual(
+            list(Scholarship.objects.filter(is_active=True).values_list('name', flat=True)),
+            ['Due Today']
+        )
+        self.assertFalse(Job.objects.get(pk=self.job.pk).is_active)
+
+    def test_dry_run_changes_nothing(self):
+        """Test --dry-run only reports counts"""
+        out = StringIO()
+        call_command('expire_listings', '--dry-run', stdout=out)
+        self.assertIn('2 listings would expire', out.getvalue())
+        self.assertEqual(Scholarship.objects.filter(is_active=True).count(), 2)
+
+    def test_list_view_reads_active_rows(self):
+        """Test the scholarship list shows only active rows after a sweep"""
+        expire_listings()
+        response = Client().get(reverse('scholarships:list'))
+        self.assertContains(response, 'Due Today')
+        self.assertNotContains(response, 'Expired')
+
+
+class SharedCacheCheckTest(TestCase):
+    """Test the deploy check that asks for a cache shared by cron and web processes"""
+
+    def test_warns_on_process_local_cache(self):
+        """Test local-memory caches are flagged and Redis passes"""
+        self.assertEqual([warning.id for warning in shared_cache(None)], ['core.W001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379/0'}}
+        with override_settings(CACHES=redis):
+            self.assertEqual(shared_cache(None), [])
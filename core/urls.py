@@ -17,4 +17,8 @@ urlpatterns = [
     # User profiles
     path('profile/<str:username>/', views.UserProfileView.as_view(), name='profile'),
     path('profile/edit/', views.UserProfileEditView.as_view(), name='profile_edit'),
+
+    # Saved search alerts (HTMX)
+    path('searches/<str:kind>/save/', views.save_search, name='save_search'),
+    path('searches/<int:pk>/delete/', views.delete_search, name='delete_search'),
 ]
@@ -0,0 +1,27 @@
+"""
+Cache version keys.
+
+Data that can't be invalidated key by key (paged payloads, per-process
+indexes) embeds a version number in its cache keys or remembers the version
+it was built at. Bumping the version retires everything built before it at
+once. Versions live in the default cache, so every process must share it
+(see CACHES in settings).
+"""
+from django.core.cache import cache
+
+
+def bump(key):
+    """Retire everything built under the current version of `key`"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def current(key):
+    """The version of `key`, starting at 0 (never expires)"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 0, timeout=None)
+        version = cache.get(key, 0)
+    return version
@@ -7,7 +7,10 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.http import HttpResponse
-from .models import SubjectConnection, UserProfile
+from gamification import activity
+from mentorship.models import MentorStats
+from .models import SubjectConnection, UserProfile, SavedSearch
+from . import alerts
 from .forms import UserRegisterForm, UserLoginForm, UserProfileForm
 
 
@@ -117,6 +120,8 @@ class UserProfileView(DetailView):
         context['forum_posts'] = user.forum_posts.all()[:5]
         context['insights'] = user.insights.all()[:5]
         context['program_reviews'] = user.program_reviews.all()[:5]
+        context['activity'] = activity.heatmap(user.pk)
+        context['mentor_stats'] = MentorStats.objects.filter(mentor__user=user).first()
         return context
 
 
@@ -137,3 +142,31 @@ class UserProfileEditView(LoginRequiredMixin, UpdateView):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Edit Profile - engg.pk'
         return context
+
+
+# Saved search alerts
+@login_required
+def save_search(request, kind):
+    """Save the current job/scholarship filters as an alert (HTMX)"""
+    if kind not in alerts.KINDS or request.method != 'POST':
+        return HttpResponse(status=400)
+
+    saved_search = alerts.save_search(request.user, kind, request.POST, name=request.POST.get('name', '').strip())
+
+    return render(request, 'core/partials/save_search_button.html', {
+        'kind': kind,
+        'saved_search': saved_search,
+    })
+
+
+@login_required
+def delete_search(request, pk):
+    """Stop alerts for a saved search (HTMX)"""
+    saved_search = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+    kind = saved_search.kind
+    if request.method == 'POST':
+        saved_search.delete()
+
+    return render(request, 'core/partials/save_search_button.html', {
+        'kind': kind,
+    })
@@ -0,0 +1,170 @@
+"""
+Daily activity streaks.
+
+Activity is kept as one ActivityBitmap row per user per year with a bit per
+day, instead of a row per action. ActivityMiddleware marks a signed-in user
+active at most once per day per process (the tracker remembers who it has
+already marked today), and that write also refreshes the user's
+ReputationScore streak.
+
+Streaks and heatmaps are read back by stitching the yearly rows into one
+integer whose bit i is `start + i days` and working on it with bit
+operations: the current streak is the distance to the highest zero bit, and
+the longest streak is how many times `bits &= bits >> 1` runs before the
+integer empties.
+"""
+import threading
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ActivityBitmap, ReputationScore
+
+
+BITMAP_BYTES = 46  # 366 days
+
+HEATMAP_WEEKS = 53
+
+
+def day_bit(day):
+    return day.timetuple().tm_yday - 1
+
+
+def to_int(data):
+    return int.from_bytes(bytes(data or b''), 'little')
+
+
+def to_bytes(bits):
+    return bits.to_bytes(BITMAP_BYTES, 'little')
+
+
+def window(user_id, start, end):
+    """Activity from start to end inclusive as an int; bit i is start + i days"""
+    bits = 0
+    rows = ActivityBitmap.objects.filter(user_id=user_id, year__gte=start.year, year__lte=end.year)
+    for year, data in rows.values_list('year', 'bits'):
+        offset = (date(year, 1, 1) - start).days
+        year_bits = to_int(data)
+        bits |= year_bits << offset if offset >= 0 else year_bits >> -offset
+    return bits & ((1 << ((end - start).days + 1)) - 1)
+
+
+def history(user_id, end):
+    """Every day up to end, starting from 1 January of the user's first active year"""
+    first = ActivityBitmap.objects.filter(user_id=user_id).order_by('year').values_list('year', flat=True).first()
+    start = date(first or end.year, 1, 1)
+    return start, window(user_id, start, end)
+
+
+def run_ending_at(bits, index):
+    """Length of the run of set bits ending at bit `index`"""
+    gaps = ~bits & ((1 << (index + 1)) - 1)
+    return index + 1 - gaps.bit_length()
+
+
+def longest_run(bits):
+    length = 0
+    while bits:
+        bits &= bits >> 1
+        length += 1
+    return length
+
+
+def live_run(bits, index):
+    """
+    The run ending at `index` (today); a run that reached the day before is
+    still alive until today ends.
+    """
+    if not bits >> index & 1:
+        index -= 1
+    return run_ending_at(bits, index) if index >= 0 else 0
+
+
+def current_streak(user_id, today=None):
+    today = today or timezone.localdate()
+    start, bits = history(user_id, today)
+    return live_run(bits, (today - start).days)
+
+
+def longest_streak(user_id, today=None):
+    _, bits = history(user_id, today or timezone.localdate())
+    return longest_run(bits)
+
+
+def mark_active(user_id, day=None):
+    """Set the day's bit; returns False if it was already set"""
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        ActivityBitmap.objects.bulk_create(
+            [ActivityBitmap(user_id=user_id, year=day.year, bits=to_bytes(0))],
+            ignore_conflicts=True,
+        )
+        row = ActivityBitmap.objects.select_for_update().get(user_id=user_id, year=day.year)
+        bits = to_int(row.bits)
+        mask = 1 << day_bit(day)
+        if bits & mask:
+            return False
+        row.bits = to_bytes(bits | mask)
+        row.save(update_fields=['bits', 'updated_at'])
+
+        start, bits = history(user_id, day)
+        ReputationScore.objects.bulk_create([ReputationScore(user_id=user_id)], ignore_conflicts=True)
+        ReputationScore.objects.filter(user_id=user_id).update(
+            consecutive_days_active=run_ending_at(bits, (day - start).days),
+            last_active_date=day,
+        )
+    return True
+
+
+class ActivityTracker:
+    """Users this process has already marked active today"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.day = None
+        self.seen = set()
+
+    def touch(self, user_id, today=None):
+        """Mark the user active unless already done today; returns whether a write happened"""
+        today = today or timezone.localdate()
+        with self.lock:
+            if today != self.day:
+                self.day = today
+                self.seen = set()
+            if user_id in self.seen:
+                return False
+            self.seen.add(user_id)
+        mark_active(user_id, today)
+        return True
+
+
+tracker = ActivityTracker()
+
+
+def heatmap(user_id, today=None, weeks=HEATMAP_WEEKS):
+    """
+    Week columns (Monday first) of (day, active) cells ending with the current
+    week, with None for days after today, plus the streak figures.
+    """
+    today = today or timezone.localdate()
+    start = today - timedelta(days=today.weekday() + (weeks - 1) * 7)
+    first, bits = history(user_id, today)
+    offset = (start - first).days
+    shown = bits >> offset if offset >= 0 else bits << -offset
+
+    columns = []
+    for week in range(weeks):
+        column = []
+        for weekday in range(7):
+            index = week * 7 + weekday
+            day = start + timedelta(days=index)
+            column.append((day, bool(shown >> index & 1)) if day <= today else None)
+        columns.append(column)
+
+    return {
+        'weeks': columns,
+        'active_days': shown.bit_count(),
+        'current_streak': live_run(bits, (today - first).days),
+        'longest_streak': longest_run(bits),
+    }
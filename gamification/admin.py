@@ -1,11 +1,14 @@
 from django.contrib import admin
-from .models import Badge, UserBadge, ReputationScore, WeeklyChallenge, ChallengeSubmission, Leaderboard
+from .models import (
+    Badge, UserBadge, ReputationScore, ReputationEvent, WeeklyChallenge, ChallengeSubmission, Leaderboard
+)
 
 
 @admin.register(Badge)
 class BadgeAdmin(admin.ModelAdmin):
-    list_display = ['name', 'badge_type', 'rarity', 'points_value', 'times_awarded']
-    list_filter = ['badge_type', 'rarity']
+    list_display = ['name', 'badge_type', 'rarity', 'rule_metric', 'rule_threshold', 'points_value', 'times_awarded']
+    list_filter = ['badge_type', 'rarity', 'rule_metric']
+    readonly_fields = ['times_awarded']
     search_fields = ['name', 'description']
 
 
@@ -23,16 +26,29 @@ class ReputationScoreAdmin(admin.ModelAdmin):
     search_fields = ['user__username']
 
 
+@admin.register(ReputationEvent)
+class ReputationEventAdmin(admin.ModelAdmin):
+    list_display = ['user', 'action', 'points', 'created_at']
+    list_filter = ['action']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
+
+    def has_change_permission(self, request, obj=None):
+        # The ledger is append-only; corrections are new events
+        return False
+
+
 @admin.register(WeeklyChallenge)
 class WeeklyChallengeAdmin(admin.ModelAdmin):
-    list_display = ['title', 'challenge_type', 'difficulty', 'start_date', 'end_date', 'points_reward']
+    list_display = ['title', 'challenge_type', 'difficulty', 'start_date', 'end_date', 'points_reward', 'winners_selected_at']
     list_filter = ['challenge_type', 'difficulty', 'start_date']
     search_fields = ['title', 'discipline']
 
 
 @admin.register(ChallengeSubmission)
 class ChallengeSubmissionAdmin(admin.ModelAdmin):
-    list_display = ['challenge', 'user', 'score', 'is_winner', 'submitted_at']
+    list_display = ['challenge', 'user', 'score', 'upvotes_total', 'is_winner', 'submitted_at']
+    readonly_fields = ['upvotes_total']
     list_filter = ['is_winner', 'challenge']
 
 
@@ -0,0 +1,80 @@
+"""
+Rule-based badge awards.
+
+A badge with `rule_metric` and `rule_threshold` is awarded to every user
+whose metric has reached the threshold. Rules are evaluated set-wise by
+`manage.py award_badges`: one query per badge finds all newly eligible users,
+awards are inserted with bulk_create(ignore_conflicts=True), and
+times_awarded is recounted for every rule badge in a single UPDATE. Nothing
+is evaluated on the request path.
+"""
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Badge, UserBadge, ReputationScore, ChallengeSubmission
+
+
+# ReputationScore columns usable directly as rule metrics
+SCORE_METRICS = [
+    'total_points', 'posts_created', 'replies_posted', 'helpful_votes_received', 'best_answers',
+    'resources_shared', 'projects_showcased', 'reviews_written', 'consecutive_days_active',
+]
+
+# Metrics counted from ChallengeSubmission rows
+CHALLENGE_METRICS = {
+    'challenge_wins': {'is_winner': True},
+    'challenge_submissions': {},
+}
+
+
+def eligible_users(metric, threshold):
+    """Queryset of user ids whose metric is at least threshold"""
+    if metric in SCORE_METRICS:
+        return ReputationScore.objects.filter(**{f'{metric}__gte': threshold}).values('user_id')
+    if metric in CHALLENGE_METRICS:
+        return (
+            ChallengeSubmission.objects.filter(**CHALLENGE_METRICS[metric])
+            .values('user_id')
+            .annotate(total=Count('id'))
+            .filter(total__gte=threshold)
+            .values('user_id')
+        )
+    raise ValueError(f'Unknown badge metric: {metric}')
+
+
+def rule_badges():
+    return Badge.objects.exclude(rule_metric='').filter(rule_threshold__isnull=False)
+
+
+def award_badges(batch_size=1000):
+    """Award every rule badge to newly eligible users; returns {badge name: awards}"""
+    awarded = {}
+    badges = list(rule_badges())
+    for badge in badges:
+        user_ids = list(
+            eligible_users(badge.rule_metric, badge.rule_threshold)
+            .exclude(user_id__in=UserBadge.objects.filter(badge=badge).values('user_id'))
+            .values_list('user_id', flat=True)
+        )
+        for start in range(0, len(user_ids), batch_size):
+            UserBadge.objects.bulk_create(
+                [UserBadge(user_id=user_id, badge=badge) for user_id in user_ids[start:start + batch_size]],
+                ignore_conflicts=True,
+            )
+        awarded[badge.name] = len(user_ids)
+
+    if badges:
+        recount_awards(badges)
+    return awarded
+
+
+def recount_awards(badges=None):
+    """Set times_awarded from UserBadge for the given (default: all) badges in one statement"""
+    queryset = Badge.objects.all() if badges is None else Badge.objects.filter(pk__in=[badge.pk for badge in badges])
+    counts = (
+        UserBadge.objects.filter(badge=OuterRef('pk'))
+        .values('badge')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    return queryset.update(times_awarded=Coalesce(Subquery(counts, output_field=IntegerField()), 0))
@@ -0,0 +1,76 @@
+"""
+Weekly challenge scoreboards and judging.
+
+Submissions keep their upvote total in a column (maintained by
+gamification/signals.py), so a scoreboard is a single index-ordered query
+over (challenge, score, upvotes_total) instead of a COUNT per submission.
+
+`manage.py close_challenges` picks winners for every challenge past its
+end_date in one pass: a single UPDATE marks each challenge's top-ranked
+submission, then rewards are written in bulk.
+"""
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import reputation
+from .badges import recount_awards
+from .models import WeeklyChallenge, ChallengeSubmission, UserBadge
+
+
+# Judges' score first (unjudged last), then community votes, then the earlier
+# entry; the same expressions as the challenge_ranking_idx index
+RANKING = [Coalesce('score', Value(-1)).desc(), F('upvotes_total').desc(), 'submitted_at']
+
+
+def scoreboard(challenge, user=None):
+    """The challenge's submissions in rank order, flagged with the viewer's upvotes"""
+    submissions = ChallengeSubmission.objects.filter(challenge=challenge).select_related('user').order_by(*RANKING)
+    if user is not None and user.is_authenticated:
+        submissions = submissions.annotate(
+            upvoted=Exists(ChallengeSubmission.upvotes.through.objects.filter(
+                challengesubmission=OuterRef('pk'), user=user,
+            ))
+        )
+    return submissions
+
+
+def due_challenges(now=None):
+    return WeeklyChallenge.objects.filter(end_date__lte=now or timezone.now(), winners_selected_at__isnull=True)
+
+
+def close_challenges(now=None):
+    """
+    Select winners for every ended, unjudged challenge; returns the number of
+    challenges closed. Challenges without submissions close with no winner.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        challenges = {
+            challenge.pk: challenge
+            for challenge in due_challenges(now).select_for_update().select_related('badge_reward')
+        }
+        if not challenges:
+            return 0
+
+        top = ChallengeSubmission.objects.filter(challenge=OuterRef('challenge')).order_by(*RANKING).values('pk')[:1]
+        winners = ChallengeSubmission.objects.filter(challenge__in=challenges, pk=Subquery(top))
+        winners.update(is_winner=True)
+
+        events = []
+        awards = []
+        for submission in winners:
+            challenge = challenges[submission.challenge_id]
+            events.append(reputation.event(
+                submission.user_id, 'challenge_won', submission, points=challenge.points_reward,
+            ))
+            if challenge.badge_reward:
+                awards.append(UserBadge(user_id=submission.user_id, badge=challenge.badge_reward))
+        reputation.record_many(events)
+        if awards:
+            UserBadge.objects.bulk_create(awards, ignore_conflicts=True)
+            recount_awards({award.badge for award in awards})
+
+        WeeklyChallenge.objects.filter(pk__in=challenges).update(winners_selected_at=now)
+    return len(challenges)
@@ -0,0 +1,23 @@
+from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+from .models import ChallengeSubmission
+
+
+MAX_SUBMISSION_FILE_SIZE = getattr(settings, 'CHALLENGE_MAX_FILE_SIZE', 50 * 1024 * 1024)
+
+
+class ChallengeSubmissionForm(forms.ModelForm):
+    """Form for entering (or updating an entry to) a weekly challenge"""
+    class Meta:
+        model = ChallengeSubmission
+        fields = ['submission_text', 'submission_file', 'submission_url']
+        widgets = {
+            'submission_text': forms.Textarea(attrs={'rows': 6, 'placeholder': 'Describe your solution...'}),
+        }
+
+    def clean_submission_file(self):
+        upload = self.cleaned_data.get('submission_file')
+        if upload and upload.size > MAX_SUBMISSION_FILE_SIZE:
+            raise forms.ValidationError(f'Files can be at most {filesizeformat(MAX_SUBMISSION_FILE_SIZE)}.')
+        return upload
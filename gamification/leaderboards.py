@@ -0,0 +1,152 @@
+"""
+Real-time leaderboards.
+
+Each process keeps one RankedBoard per period: a sorted array of
+(-points, user_id) keys searched with bisect, so "top N" is a slice and
+"my rank" is a binary search instead of a COUNT over every user. Boards are
+built from the reputation ledger the first time they're used (and again when
+a period rolls over), then kept current by tailing ledger events newer than
+the last one applied. Like the reputation flush, they only follow settled
+events (see Checkpoint.settled), so an event committed late is never skipped.
+`manage.py snapshot_leaderboards` persists the standings into Leaderboard rows.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.models import Checkpoint
+from .models import ReputationEvent, Leaderboard
+
+
+PERIODS = ['weekly', 'monthly', 'yearly', 'all_time']
+
+SNAPSHOT_SIZE = 100
+
+
+def period_bounds(period, today=None):
+    """(first day, last day) of the period containing today; all-time has no start"""
+    today = today or timezone.localdate()
+    if period == 'weekly':
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if period == 'monthly':
+        start = today.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    if period == 'yearly':
+        return date(today.year, 1, 1), date(today.year, 12, 31)
+    if period == 'all_time':
+        return None, today
+    raise ValueError(f'Unknown leaderboard period: {period}')
+
+
+class RankedBoard:
+    """Users ordered by points (then user id) in a bisectable sorted array"""
+
+    def __init__(self, points=None):
+        self.points = dict(points or {})
+        self.keys = sorted((-total, user_id) for user_id, total in self.points.items())
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, user_id, delta):
+        old = self.points.get(user_id)
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (-old, user_id))]
+        total = (old or 0) + delta
+        self.points[user_id] = total
+        insort(self.keys, (-total, user_id))
+
+    def top(self, n):
+        """[(rank, user_id, points)] for the first n users; tied users share a rank"""
+        return [(self.rank(user_id), user_id, -negative) for negative, user_id in self.keys[:n]]
+
+    def rank(self, user_id):
+        """1 + the number of users with strictly more points, or None if unranked"""
+        total = self.points.get(user_id)
+        if total is None:
+            return None
+        return bisect_left(self.keys, (-total,)) + 1
+
+
+def period_points(period, today=None, until_id=None):
+    """{user_id: points} earned in the period, straight from the ledger"""
+    start, _ = period_bounds(period, today)
+    events = ReputationEvent.objects.all()
+    if until_id is not None:
+        events = events.filter(id__lte=until_id)
+    if start:
+        events = events.filter(created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+    return dict(events.values('user_id').annotate(total=Sum('points')).values_list('user_id', 'total'))
+
+
+class Leaderboards:
+    """This process's boards for every period, kept in step with the ledger"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.boards = {}
+        self.position = None
+
+    def board(self, period):
+        with self.lock:
+            today = timezone.localdate()
+            if self.position is None:
+                self.position = Checkpoint.settled(ReputationEvent.objects).values_list('id', flat=True).last() or 0
+            else:
+                self.apply_new_events()
+
+            start, _ = period_bounds(period, today)
+            built_for, board = self.boards.get(period, (None, None))
+            if board is None or built_for != start:
+                # First use in this process, or the period rolled over
+                board = RankedBoard(period_points(period, today, until_id=self.position))
+                self.boards[period] = (start, board)
+            return board
+
+    def apply_new_events(self, batch_size=5000):
+        while True:
+            events = list(
+                Checkpoint.settled(ReputationEvent.objects, self.position)
+                .values_list('id', 'user_id', 'points', 'created_at')[:batch_size]
+            )
+            if not events:
+                return
+            for _, user_id, points, created_at in events:
+                day = timezone.localdate(created_at)
+                for start, board in self.boards.values():
+                    if start is None or day >= start:
+                        board.add(user_id, points)
+            self.position = events[-1][0]
+
+
+leaderboards = Leaderboards()
+
+
+def snapshot(period, today=None, size=SNAPSHOT_SIZE):
+    """Persist the period's current top users as a Leaderboard row"""
+    today = today or timezone.localdate()
+    start, end = period_bounds(period, today)
+    board = RankedBoard(period_points(period, today))
+    top = board.top(size)
+    users = User.objects.in_bulk([user_id for _, user_id, _ in top])
+
+    row, _ = Leaderboard.objects.update_or_create(
+        period_type=period,
+        # All-time snapshots are kept per day
+        period_start=start or today,
+        defaults={
+            'period_end': end,
+            'top_users_data': [
+                {'rank': rank, 'user_id': user_id, 'username': users[user_id].username, 'points': points}
+                for rank, user_id, points in top
+                if user_id in users
+            ],
+        },
+    )
+    return row
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from gamification.badges import award_badges
+
+
+class Command(BaseCommand):
+    help = 'Award rule-based badges to every user who now qualifies'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        awarded = award_badges(batch_size=options['batch_size'])
+        for name, count in awarded.items():
+            if count:
+                self.stdout.write(f'{name}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Awarded {sum(awarded.values())} badges'))
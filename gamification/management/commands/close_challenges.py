@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gamification.challenges import close_challenges
+
+
+class Command(BaseCommand):
+    help = 'Select winners for every weekly challenge past its end date'
+
+    def handle(self, *args, **options):
+        closed = close_challenges()
+        self.stdout.write(self.style.SUCCESS(f'Closed {closed} challenges'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from gamification.reputation import flush
+
+
+class Command(BaseCommand):
+    help = 'Apply new reputation ledger events to user reputation scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        applied = flush(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Applied {applied} reputation events'))
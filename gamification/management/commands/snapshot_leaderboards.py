@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from gamification.leaderboards import PERIODS, SNAPSHOT_SIZE, snapshot
+
+
+class Command(BaseCommand):
+    help = 'Save the current standings of every leaderboard period to Leaderboard rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', choices=PERIODS, action='append', dest='periods')
+        parser.add_argument('--size', type=int, default=SNAPSHOT_SIZE, help='Users kept per snapshot')
+
+    def handle(self, *args, **options):
+        for period in options['periods'] or PERIODS:
+            row = snapshot(period, size=options['size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{period}: saved {len(row.top_users_data)} users for {row.period_start} to {row.period_end}'
+            ))
@@ -0,0 +1,15 @@
+from . import activity
+
+
+class ActivityMiddleware:
+    """Record that a signed-in user was active today (a write at most once a day per process)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            activity.tracker.touch(user.pk)
+        return response
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('gamification', '0002_reputation_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='leaderboard',
+            unique_together={('period_type', 'period_start')},
+        ),
+        migrations.AddIndex(
+            model_name='reputationevent',
+            index=models.Index(fields=['created_at'], name='gamificatio_created_76143d_idx'),
+        ),
+    ]
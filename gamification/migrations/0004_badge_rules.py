@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0003_leaderboard_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='badge',
+            name='rule_metric',
+            field=models.CharField(blank=True, choices=[('total_points', 'Reputation points'), ('posts_created', 'Posts created'), ('replies_posted', 'Replies posted'), ('helpful_votes_received', 'Helpful votes received'), ('best_answers', 'Best answers'), ('resources_shared', 'Resources shared'), ('projects_showcased', 'Projects showcased'), ('reviews_written', 'Reviews written'), ('consecutive_days_active', 'Day streak'), ('challenge_wins', 'Challenge wins'), ('challenge_submissions', 'Challenge submissions')], max_length=30),
+        ),
+        migrations.AddField(
+            model_name='badge',
+            name='rule_threshold',
+            field=models.PositiveIntegerField(blank=True, help_text='Awarded once the metric reaches this value', null=True),
+        ),
+    ]
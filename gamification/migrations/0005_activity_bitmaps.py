@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0004_badge_rules'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reputationscore',
+            name='consecutive_days_active',
+            field=models.PositiveIntegerField(default=0, help_text='Streak as of last_active_date'),
+        ),
+        migrations.AlterField(
+            model_name='reputationscore',
+            name='last_active_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ActivityBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('bits', models.BinaryField(max_length=46)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_bitmaps', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'gamification_activity_bitmaps',
+                'unique_together': {('user', 'year')},
+            },
+        ),
+    ]
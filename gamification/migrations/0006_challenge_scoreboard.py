@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:31
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    ChallengeSubmission = apps.get_model('gamification', 'ChallengeSubmission')
+    WeeklyChallenge = apps.get_model('gamification', 'WeeklyChallenge')
+    votes = (
+        ChallengeSubmission.upvotes.through.objects.filter(challengesubmission=OuterRef('pk'))
+        .values('challengesubmission')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    ChallengeSubmission.objects.update(upvotes_total=Coalesce(Subquery(votes, output_field=IntegerField()), 0))
+    # Challenges already judged by hand must not get a second winner
+    WeeklyChallenge.objects.filter(
+        Exists(ChallengeSubmission.objects.filter(challenge=OuterRef('pk'), is_winner=True))
+    ).update(winners_selected_at=F('end_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0005_activity_bitmaps'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challengesubmission',
+            name='upvotes_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='weeklychallenge',
+            name='winners_selected_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='challengesubmission',
+            index=models.Index(models.F('challenge'), models.OrderBy(django.db.models.functions.comparison.Coalesce('score', models.Value(-1)), descending=True), models.OrderBy(models.F('upvotes_total'), descending=True), models.F('submitted_at'), name='challenge_ranking_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weeklychallenge',
+            index=models.Index(condition=models.Q(('winners_selected_at__isnull', True)), fields=['end_date'], name='challenge_unjudged_idx'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 
 
 class Badge(models.Model):
@@ -20,6 +24,26 @@ class Badge(models.Model):
     criteria = models.TextField(help_text="How to earn this badge")
     points_value = models.PositiveIntegerField(default=10)
 
+    # Automatic award rule (see gamification/badges.py); blank for manually awarded badges
+    rule_metric = models.CharField(
+        max_length=30,
+        blank=True,
+        choices=[
+            ('total_points', 'Reputation points'),
+            ('posts_created', 'Posts created'),
+            ('replies_posted', 'Replies posted'),
+            ('helpful_votes_received', 'Helpful votes received'),
+            ('best_answers', 'Best answers'),
+            ('resources_shared', 'Resources shared'),
+            ('projects_showcased', 'Projects showcased'),
+            ('reviews_written', 'Reviews written'),
+            ('consecutive_days_active', 'Day streak'),
+            ('challenge_wins', 'Challenge wins'),
+            ('challenge_submissions', 'Challenge submissions'),
+        ]
+    )
+    rule_threshold = models.PositiveIntegerField(null=True, blank=True, help_text="Awarded once the metric reaches this value")
+
     # Appearance
     icon = models.ImageField(upload_to='badges/', blank=True)
     color = models.CharField(max_length=20, default='blue')
@@ -92,9 +116,9 @@ class ReputationScore(models.Model):
     projects_showcased = models.PositiveIntegerField(default=0)
     reviews_written = models.PositiveIntegerField(default=0)
 
-    # Engagement
-    consecutive_days_active = models.PositiveIntegerField(default=0)
-    last_active_date = models.DateField(auto_now=True)
+    # Engagement, derived from ActivityBitmap (see gamification/activity.py)
+    consecutive_days_active = models.PositiveIntegerField(default=0, help_text="Streak as of last_active_date")
+    last_active_date = models.DateField(null=True, blank=True)
 
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -120,6 +144,53 @@ class ReputationScore(models.Model):
             return 'legend'
 
 
+class ReputationEvent(models.Model):
+    """
+    Append-only reputation points ledger (see gamification/reputation.py).
+    Undoing an action appends a reversing event rather than editing history.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reputation_events')
+    action = models.CharField(max_length=30)
+    points = models.IntegerField()
+    # +1 for the action, -1 for its reversal; applied to the action's counter
+    delta = models.SmallIntegerField(default=1)
+
+    # What the points were earned for
+    content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True, blank=True)
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    target = GenericForeignKey('content_type', 'object_id')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'gamification_reputation_events'
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.action} {self.points:+d}"
+
+
+class ActivityBitmap(models.Model):
+    """
+    A user's activity for one calendar year, one bit per day (bit 0 is
+    1 January), so a year costs 46 bytes however many actions it saw.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_bitmaps')
+    year = models.PositiveSmallIntegerField()
+    bits = models.BinaryField(max_length=46)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'gamification_activity_bitmaps'
+        unique_together = ['user', 'year']
+
+    def __str__(self):
+        return f"{self.user_id} {self.year}"
+
+
 class WeeklyChallenge(models.Model):
     """Weekly challenges"""
     title = models.CharField(max_length=200)
@@ -160,6 +231,8 @@ class WeeklyChallenge(models.Model):
 
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='challenges_created')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set by `manage.py close_challenges` once the winner has been picked
+    winners_selected_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = 'gamification_weekly_challenges'
@@ -167,6 +240,7 @@ class WeeklyChallenge(models.Model):
         indexes = [
             models.Index(fields=['-start_date']),
             models.Index(fields=['challenge_type']),
+            models.Index(fields=['end_date'], condition=Q(winners_selected_at__isnull=True), name='challenge_unjudged_idx'),
         ]
 
     def __str__(self):
@@ -193,6 +267,8 @@ class ChallengeSubmission(models.Model):
     feedback = models.TextField(blank=True)
 
     upvotes = models.ManyToManyField(User, related_name='challenge_upvotes', blank=True)
+    # Kept in step with `upvotes` by gamification/signals.py
+    upvotes_total = models.PositiveIntegerField(default=0)
 
     submitted_at = models.DateTimeField(auto_now_add=True)
 
@@ -200,12 +276,19 @@ class ChallengeSubmission(models.Model):
         db_table = 'gamification_challenge_submissions'
         unique_together = ['challenge', 'user']
         ordering = ['-submitted_at']
+        indexes = [
+            # Scoreboard order, unjudged entries last (must match gamification/challenges.py RANKING)
+            models.Index(
+                F('challenge'), Coalesce('score', Value(-1)).desc(), F('upvotes_total').desc(), F('submitted_at'),
+                name='challenge_ranking_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.challenge.title}"
 
     def upvote_count(self):
-        return self.upvotes.count()
+        return self.upvotes_total
 
 
 class Leaderboard(models.Model):
@@ -229,6 +312,7 @@ class Leaderboard(models.Model):
 
     class Meta:
         db_table = 'gamification_leaderboards'
+        unique_together = ['period_type', 'period_start']
         ordering = ['-period_start']
         indexes = [
             models.Index(fields=['period_type', '-period_start']),
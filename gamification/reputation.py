@@ -0,0 +1,174 @@
+"""
+Event-sourced reputation.
+
+Actions across the site (forum, feed, reviews, projects) only INSERT a
+ReputationEvent; nothing on the request path locks or updates a
+ReputationScore row. `manage.py flush_reputation` folds events past a
+Checkpoint into ReputationScore in batches, and `manage.py rebuild_reputation`
+recomputes every score from scratch by replaying the ledger in id order.
+"""
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Checkpoint
+from .models import ReputationEvent, ReputationScore
+
+
+CHECKPOINT = 'gamification.reputation'
+
+# action -> (points, ReputationScore counter it increments or None)
+ACTIONS = {
+    'forum_post': (5, 'posts_created'),
+    'forum_reply': (2, 'replies_posted'),
+    'forum_like_received': (3, 'helpful_votes_received'),
+    'feed_post': (2, 'posts_created'),
+    'feed_comment': (1, 'replies_posted'),
+    'feed_like_received': (1, 'helpful_votes_received'),
+    'review_written': (10, 'reviews_written'),
+    'project_showcased': (20, 'projects_showcased'),
+    'project_like_received': (2, 'helpful_votes_received'),
+    # Points default to the challenge's points_reward (see challenges.py)
+    'challenge_won': (50, None),
+}
+
+COUNTERS = sorted({counter for _, counter in ACTIONS.values() if counter})
+
+
+def event(user_id, action, target=None, reverse=False, points=None):
+    """Build (but don't save) a ledger entry; points default to the action's"""
+    if points is None:
+        points, _ = ACTIONS[action]
+    return ReputationEvent(
+        user_id=user_id,
+        action=action,
+        points=-points if reverse else points,
+        delta=-1 if reverse else 1,
+        content_type=ContentType.objects.get_for_model(target) if target is not None else None,
+        object_id=target.pk if target is not None else None,
+    )
+
+
+def record(user_id, action, target=None, reverse=False):
+    """Append one ledger entry (a single INSERT)"""
+    entry = event(user_id, action, target, reverse)
+    entry.save()
+    return entry
+
+
+def record_many(entries):
+    ReputationEvent.objects.bulk_create(entries)
+
+
+class Totals:
+    """Per-user points and counter deltas accumulated from events"""
+
+    def __init__(self):
+        self.points = defaultdict(int)
+        self.counters = defaultdict(lambda: defaultdict(int))
+
+    def add(self, user_id, action, points, delta):
+        self.points[user_id] += points
+        counter = ACTIONS.get(action, (0, None))[1]
+        if counter:
+            self.counters[user_id][counter] += delta
+
+    def users(self):
+        return self.points.keys() | self.counters.keys()
+
+
+def apply_totals(totals, reset=False, batch_size=1000):
+    """
+    Add (or with reset=True, assign) totals to ReputationScore rows, creating
+    missing rows, and re-derive each touched user's level.
+    """
+    user_ids = list(totals.users())
+    ReputationScore.objects.bulk_create(
+        [ReputationScore(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+        batch_size=batch_size,
+    )
+
+    now = timezone.now()
+    scores = []
+    for start in range(0, len(user_ids), batch_size):
+        chunk = user_ids[start:start + batch_size]
+        for score in ReputationScore.objects.select_for_update().filter(user_id__in=chunk):
+            base = 0 if reset else score.total_points
+            score.total_points = base + totals.points[score.user_id]
+            for counter in COUNTERS:
+                base = 0 if reset else getattr(score, counter)
+                # Reversals of actions older than the ledger must not go negative
+                setattr(score, counter, max(base + totals.counters[score.user_id][counter], 0))
+            score.reputation_level = score.calculate_level()
+            score.updated_at = now
+            scores.append(score)
+
+    ReputationScore.objects.bulk_update(
+        scores,
+        ['total_points', 'reputation_level', 'updated_at', *COUNTERS],
+        batch_size=batch_size,
+    )
+    return len(scores)
+
+
+def flush(batch_size=5000):
+    """Apply events past the checkpoint; returns the number of events applied"""
+    applied = 0
+    while True:
+        with transaction.atomic():
+            checkpoint = Checkpoint.locked(CHECKPOINT)
+            events = list(
+                checkpoint.pending(ReputationEvent.objects)
+                .values_list('id', 'user_id', 'action', 'points', 'delta')[:batch_size]
+            )
+            if not events:
+                return applied
+
+            totals = Totals()
+            for _, user_id, action, points, delta in events:
+                totals.add(user_id, action, points, delta)
+            apply_totals(totals)
+
+            checkpoint.position = events[-1][0]
+            checkpoint.save(update_fields=['position', 'updated_at'])
+            applied += len(events)
+
+
+def rebuild(chunk_size=10000):
+    """
+    Recompute every ledger-derived score from scratch by replaying all events
+    in id order; returns the number of scores written. Holds the checkpoint
+    lock throughout so no flush runs concurrently.
+    """
+    with transaction.atomic():
+        checkpoint = Checkpoint.locked(CHECKPOINT)
+
+        # Replay only settled events, as flush would, so the checkpoint never jumps a late commit
+        checkpoint.position = 0
+        settled = checkpoint.pending(ReputationEvent.objects)
+
+        totals = Totals()
+        last_id = 0
+        while True:
+            events = list(
+                settled.filter(id__gt=last_id)
+                .values_list('id', 'user_id', 'action', 'points', 'delta')[:chunk_size]
+            )
+            if not events:
+                break
+            for _, user_id, action, points, delta in events:
+                totals.add(user_id, action, points, delta)
+            last_id = events[-1][0]
+
+        # Scores of users with no events left are zeroed too
+        ReputationScore.objects.update(
+            total_points=0, reputation_level='newcomer', **{counter: 0 for counter in COUNTERS}
+        )
+        written = apply_totals(totals, reset=True)
+
+        checkpoint.position = last_id
+        checkpoint.save(update_fields=['position', 'updated_at'])
+    return written
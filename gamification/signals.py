@@ -0,0 +1,152 @@
+from django.contrib.auth.signals import user_logged_in
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete, m2m_changed
+
+from academic.models import SupervisorReview
+from core.signals import being_deleted
+from feed.models import FeedPost, Comment
+from forum.models import ForumPost, Reply
+from networking.models import CompanyReview
+from projects.models import Project
+from universities.models import ProgramReview
+from . import activity, reputation
+from .models import ChallengeSubmission
+
+
+# model -> (action, author field)
+AUTHORED_ACTIONS = {
+    ForumPost: ('forum_post', 'author_id'),
+    Reply: ('forum_reply', 'author_id'),
+    FeedPost: ('feed_post', 'author_user_id'),
+    Comment: ('feed_comment', 'author_id'),
+    CompanyReview: ('review_written', 'author_id'),
+    SupervisorReview: ('review_written', 'reviewer_id'),
+    ProgramReview: ('review_written', 'author_id'),
+    Project: ('project_showcased', 'owner_id'),
+}
+
+# likes through model -> (liked model, action credited to its author, author field)
+LIKE_ACTIONS = {
+    ForumPost.likes.through: (ForumPost, 'forum_like_received', 'author_id'),
+    Reply.likes.through: (Reply, 'forum_like_received', 'author_id'),
+    FeedPost.likes.through: (FeedPost, 'feed_like_received', 'author_user_id'),
+    Comment.likes.through: (Comment, 'feed_like_received', 'author_id'),
+    Project.likes.through: (Project, 'project_like_received', 'owner_id'),
+}
+
+
+def record_authored(instance, reverse):
+    action, author_field = AUTHORED_ACTIONS[type(instance)]
+    author_id = getattr(instance, author_field)
+    # Organization feed posts have no user to credit
+    if author_id:
+        reputation.record(author_id, action, instance, reverse=reverse)
+
+
+def content_created(sender, instance, created, **kwargs):
+    if created:
+        record_authored(instance, reverse=False)
+
+
+def content_deleted(sender, instance, **kwargs):
+    _, author_field = AUTHORED_ACTIONS[type(instance)]
+    # Content cascading from its author's deletion has no one left to debit
+    if not being_deleted(getattr(instance, author_field)):
+        record_authored(instance, reverse=True)
+
+
+def existing_likes(sender, instance, reverse, pk_set):
+    """(liker id, liked item) pairs that are liked now, of those pk_set names (all when None)"""
+    liked_model = LIKE_ACTIONS[sender][0]
+    field = liked_model._meta.get_field('likes')
+    content_field, user_field = field.m2m_field_name(), field.m2m_reverse_field_name()
+
+    if reverse:
+        rows = sender.objects.filter(**{user_field: instance.pk})
+        if pk_set is not None:
+            rows = rows.filter(**{f'{content_field}__in': pk_set})
+        return [(instance.pk, item) for item in liked_model.objects.filter(pk__in=rows.values(content_field))]
+
+    rows = sender.objects.filter(**{content_field: instance.pk})
+    if pk_set is not None:
+        rows = rows.filter(**{f'{user_field}__in': pk_set})
+    return [(user_id, instance) for user_id in rows.values_list(user_field, flat=True)]
+
+
+def likes_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Credit (or debit) the author of liked content, ignoring self-likes"""
+    if action in ('pre_remove', 'pre_clear'):
+        # remove() may name likes that don't exist and clear() names none;
+        # remember the rows actually going away
+        instance._removed_likes = existing_likes(sender, instance, reverse, pk_set)
+        return
+
+    liked_model, points_action, author_field = LIKE_ACTIONS[sender]
+    if action == 'post_add' and pk_set:
+        # pk_set only holds newly added rows
+        if reverse:
+            # user.liked_posts.add(*posts): instance is the liker, pk_set the content
+            likes = [(instance.pk, item) for item in liked_model.objects.filter(pk__in=pk_set)]
+        else:
+            # post.likes.add(*users): instance is the content, pk_set the likers
+            likes = [(user_id, instance) for user_id in pk_set]
+    elif action in ('post_remove', 'post_clear'):
+        likes = instance.__dict__.pop('_removed_likes', [])
+    else:
+        return
+
+    reputation.record_many([
+        reputation.event(getattr(item, author_field), points_action, item, reverse=action != 'post_add')
+        for liker_id, item in likes
+        if getattr(item, author_field) and getattr(item, author_field) != liker_id
+    ])
+
+
+def recount_upvotes(submissions):
+    votes = (
+        ChallengeSubmission.upvotes.through.objects.filter(challengesubmission=OuterRef('pk'))
+        .values('challengesubmission')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    submissions.update(upvotes_total=Coalesce(Subquery(votes, output_field=IntegerField()), 0))
+
+
+def upvotes_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep ChallengeSubmission.upvotes_total in step with its upvotes"""
+    if action == 'pre_clear' and reverse:
+        # user.challenge_upvotes.clear(): remember which submissions lose a vote
+        instance._cleared_upvotes = list(instance.challenge_upvotes.values_list('pk', flat=True))
+        return
+
+    if reverse:
+        submissions = ChallengeSubmission.objects.filter(pk__in=pk_set or [])
+    else:
+        submissions = ChallengeSubmission.objects.filter(pk=instance.pk)
+    if action == 'post_add' and pk_set:
+        # pk_set only holds newly added rows, so each is exactly one vote
+        submissions.update(upvotes_total=F('upvotes_total') + (1 if reverse else len(pk_set)))
+    elif action == 'post_remove' and pk_set:
+        # pk_set may name rows that weren't there; recount instead of subtracting
+        recount_upvotes(submissions)
+    elif action == 'post_clear':
+        if reverse:
+            recount_upvotes(ChallengeSubmission.objects.filter(pk__in=getattr(instance, '_cleared_upvotes', [])))
+        else:
+            submissions.update(upvotes_total=0)
+
+
+def logged_in(sender, request, user, **kwargs):
+    activity.tracker.touch(user.pk)
+
+
+for model in AUTHORED_ACTIONS:
+    post_save.connect(content_created, sender=model, dispatch_uid=f'reputation_created_{model._meta.label}')
+    post_delete.connect(content_deleted, sender=model, dispatch_uid=f'reputation_deleted_{model._meta.label}')
+
+for through in LIKE_ACTIONS:
+    m2m_changed.connect(likes_changed, sender=through, dispatch_uid=f'reputation_likes_{through._meta.label}')
+
+m2m_changed.connect(upvotes_changed, sender=ChallengeSubmission.upvotes.through, dispatch_uid='challenge_upvotes')
+user_logged_in.connect(logged_in, dispatch_uid='activity_logged_in')
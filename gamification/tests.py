@@ -1,3 +1,408 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from core.models import UserProfile
+from forum.models import ForumPost, Reply
+from .leaderboards import Leaderboards, RankedBoard, period_bounds
+from .models import (
+    ReputationEvent, ReputationScore, Leaderboard, Badge, UserBadge, WeeklyChallenge, ChallengeSubmission,
+    ActivityBitmap,
+)
+from . import activity, badges, challenges, reputation
+
+
+@override_settings(CHECKPOINT_SETTLE_SECONDS=0)
+class ReputationLedgerTest(TestCase):
+    """Test the event-sourced reputation ledger"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.post = ForumPost.objects.create(
+            title='How do I size a transformer?', content='Details', author=self.alice, category='technical'
+        )
+
+    def score(self, user):
+        return ReputationScore.objects.get(user=user)
+
+    def test_actions_only_append_events(self):
+        """Test content and likes write ledger rows, not scores"""
+        Reply.objects.create(post=self.post, author=self.bob, content='Use the load curve')
+        self.post.likes.add(self.bob)
+        self.post.likes.add(self.alice)  # self-likes earn nothing
+
+        actions = sorted(ReputationEvent.objects.values_list('user__username', 'action'))
+        self.assertEqual(actions, [
+            ('alice', 'forum_like_received'), ('alice', 'forum_post'), ('bob', 'forum_reply'),
+        ])
+        self.assertFalse(ReputationScore.objects.exists())
+
+    def test_flush_applies_each_event_once(self):
+        """Test flushing aggregates counters and points from the checkpoint"""
+        self.post.likes.add(self.bob)
+        self.assertEqual(reputation.flush(), 2)
+        self.assertEqual(reputation.flush(), 0)
+
+        score = self.score(self.alice)
+        self.assertEqual(score.total_points, 8)
+        self.assertEqual(score.posts_created, 1)
+        self.assertEqual(score.helpful_votes_received, 1)
+
+    def test_reversals_and_levels(self):
+        """Test unlikes subtract and levels follow calculate_level"""
+        self.post.likes.add(self.bob)
+        self.bob.liked_posts.remove(self.post)
+        for _ in range(5):
+            reputation.record(self.alice.pk, 'project_showcased')
+        reputation.flush(batch_size=2)
+
+        score = self.score(self.alice)
+        self.assertEqual(score.helpful_votes_received, 0)
+        self.assertEqual(score.total_points, 105)
+        self.assertEqual(score.reputation_level, 'member')
+
+    def test_unlikes_debit_only_existing_likes(self):
+        """Test removing a like that isn't there debits nothing and clears debit every like"""
+        carol = User.objects.create_user(username='carol', password='testpass123')
+        self.post.likes.add(self.bob)
+        self.post.likes.remove(self.bob, carol)
+        self.bob.liked_posts.remove(self.post)
+        self.assertEqual(ReputationEvent.objects.filter(action='forum_like_received').count(), 2)
+
+        self.post.likes.add(self.bob, carol)
+        self.post.likes.clear()
+        self.post.likes.add(carol)
+        carol.liked_posts.clear()
+        reputation.flush()
+        self.assertEqual(self.score(self.alice).helpful_votes_received, 0)
+        self.assertEqual(self.score(self.alice).total_points, 5)
+
+    def test_deleting_a_user_with_content(self):
+        """Test a user's content cascades away without ledger rows for the deleted user"""
+        Reply.objects.create(post=self.post, author=self.bob, content='Use the load curve')
+        self.post.likes.add(self.bob)
+        self.alice.delete()
+
+        self.assertFalse(User.objects.filter(username='alice').exists())
+        self.assertEqual(list(ReputationEvent.objects.values_list('user__username', 'action', 'points')), [
+            ('bob', 'forum_reply', 2), ('bob', 'forum_reply', -2),
+        ])
+
+    def test_rebuild_matches_incremental_flushes(self):
+        """Test replaying the ledger reproduces the flushed scores"""
+        Reply.objects.create(post=self.post, author=self.bob, content='Use the load curve')
+        reputation.flush()
+        self.post.likes.add(self.bob)
+        reputation.flush()
+        flushed = list(ReputationScore.objects.order_by('user_id').values_list('user_id', 'total_points', 'replies_posted'))
+
+        ReputationScore.objects.update(total_points=999, replies_posted=50)
+        output = StringIO()
+        call_command('rebuild_reputation', '--chunk-size', '1', stdout=output)
+        rebuilt = list(ReputationScore.objects.order_by('user_id').values_list('user_id', 'total_points', 'replies_posted'))
+        self.assertEqual(rebuilt, flushed)
+
+        # Nothing is double counted after a rebuild
+        self.assertEqual(reputation.flush(), 0)
+
+
+@override_settings(CHECKPOINT_SETTLE_SECONDS=0)
+class LeaderboardTest(TestCase):
+    """Test in-memory ranked leaderboards"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(3)]
+        self.boards = Leaderboards()
+
+    def test_ranked_board(self):
+        """Test top N and ranks, with ties sharing a rank"""
+        board = RankedBoard({1: 10, 2: 30, 3: 10})
+        board.add(4, 5)
+        board.add(1, 25)
+        self.assertEqual(board.top(2), [(1, 1, 35), (2, 2, 30)])
+        self.assertEqual(board.rank(3), 3)
+        board.add(4, 5)
+        self.assertEqual(board.rank(4), 3)
+        self.assertEqual(board.rank(3), 3)
+        self.assertIsNone(board.rank(99))
+
+    def test_period_bounds(self):
+        """Test weeks start on Monday and months end on their last day"""
+        self.assertEqual(period_bounds('weekly', date(2024, 2, 29)), (date(2024, 2, 26), date(2024, 3, 3)))
+        self.assertEqual(period_bounds('monthly', date(2024, 2, 10)), (date(2024, 2, 1), date(2024, 2, 29)))
+
+    def test_boards_follow_the_ledger(self):
+        """Test boards built from the DB pick up later events without a rebuild"""
+        reputation.record(self.users[0].pk, 'forum_post')
+        old = reputation.record(self.users[1].pk, 'project_showcased')
+        ReputationEvent.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=400))
+
+        weekly = self.boards.board('weekly')
+        all_time = self.boards.board('all_time')
+        self.assertEqual(weekly.rank(self.users[0].pk), 1)
+        self.assertIsNone(weekly.rank(self.users[1].pk))
+        self.assertEqual(all_time.rank(self.users[1].pk), 1)
+
+        reputation.record(self.users[2].pk, 'review_written')
+        weekly = self.boards.board('weekly')
+        self.assertEqual(weekly.top(1), [(1, self.users[2].pk, 10)])
+        self.assertEqual(weekly.points[self.users[0].pk], 5)
+
+    @override_settings(CHECKPOINT_SETTLE_SECONDS=60)
+    def test_boards_wait_for_late_commits(self):
+        """Test boards stop at unsettled events, so a lower id committing late isn't skipped"""
+        early = reputation.record(self.users[0].pk, 'forum_post')
+        late = reputation.record(self.users[1].pk, 'forum_post')
+        # `late` has settled while `early` is still inside the window, as if its transaction ran long
+        ReputationEvent.objects.filter(pk=late.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(len(self.boards.board('all_time')), 0)
+
+        ReputationEvent.objects.filter(pk=early.pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        board = self.boards.board('all_time')
+        self.assertEqual(board.points, {self.users[0].pk: 5, self.users[1].pk: 5})
+
+    def test_snapshot_command(self):
+        """Test snapshots persist the current top users"""
+        reputation.record(self.users[0].pk, 'forum_post')
+        call_command('snapshot_leaderboards', '--period', 'weekly', stdout=StringIO())
+        call_command('snapshot_leaderboards', '--period', 'weekly', stdout=StringIO())
+
+        snapshot = Leaderboard.objects.get(period_type='weekly')
+        self.assertEqual(snapshot.top_users_data, [{'rank': 1, 'user_id': self.users[0].pk, 'username': 'user0', 'points': 5}])
+
+    def test_leaderboard_view(self):
+        """Test the page lists leaders and the viewer's rank"""
+        reputation.record(self.users[0].pk, 'project_showcased')
+        reputation.record(self.users[1].pk, 'forum_post')
+        self.client.login(username='user1', password='testpass123')
+
+        with mock.patch('gamification.views.leaderboards', self.boards):
+            response = self.client.get(reverse('gamification:leaderboard_period', args=['monthly']))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['my_rank'], 2)
+        self.assertContains(response, 'user0')
+        self.assertEqual(self.client.get(reverse('gamification:leaderboard_period', args=['daily'])).status_code, 404)
+
+
+class BadgeRuleTest(TestCase):
+    """Test set-wise badge rule evaluation"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(3)]
+        ReputationScore.objects.create(user=self.users[0], posts_created=12)
+        ReputationScore.objects.create(user=self.users[1], posts_created=3)
+        self.prolific = Badge.objects.create(
+            name='Prolific', description='Ten posts', badge_type='contribution', criteria='Create 10 posts',
+            rule_metric='posts_created', rule_threshold=10,
+        )
+        self.champion = Badge.objects.create(
+            name='Champion', description='Won a challenge', badge_type='special', criteria='Win a weekly challenge',
+            rule_metric='challenge_wins', rule_threshold=1,
+        )
+        self.manual = Badge.objects.create(
+            name='Founder', description='Early member', badge_type='special', criteria='Awarded by staff',
+        )
+
+    def test_awards_and_counts(self):
+        """Test eligible users get badges and times_awarded is recounted"""
+        challenge = WeeklyChallenge.objects.create(
+            title='Bridge design', description='Design a bridge', challenge_type='design',
+            problem_statement='Span 20m', difficulty='easy', discipline='Civil',
+            start_date=timezone.now(), end_date=timezone.now() + timedelta(days=7), created_by=self.users[0],
+        )
+        ChallengeSubmission.objects.create(challenge=challenge, user=self.users[2], submission_text='Truss', is_winner=True)
+        ChallengeSubmission.objects.create(challenge=challenge, user=self.users[1], submission_text='Arch')
+
+        output = StringIO()
+        call_command('award_badges', stdout=output)
+        self.assertIn('Awarded 2 badges', output.getvalue())
+        self.assertEqual(
+            set(UserBadge.objects.values_list('user__username', 'badge__name')),
+            {('user0', 'Prolific'), ('user2', 'Champion')},
+        )
+        self.prolific.refresh_from_db()
+        self.manual.refresh_from_db()
+        self.assertEqual(self.prolific.times_awarded, 1)
+        self.assertEqual(self.manual.times_awarded, 0)
+
+    def test_rerun_awards_only_new_qualifiers(self):
+        """Test re-evaluating skips users who already hold the badge"""
+        self.assertEqual(badges.award_badges()['Prolific'], 1)
+        ReputationScore.objects.filter(user=self.users[1]).update(posts_created=10)
+        self.assertEqual(badges.award_badges()['Prolific'], 1)
+        self.assertEqual(badges.award_badges()['Prolific'], 0)
+        self.prolific.refresh_from_db()
+        self.assertEqual(self.prolific.times_awarded, 2)
+
+
+class ActivityBitmapTest(TestCase):
+    """Test daily activity bitmaps and streaks"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='testpass123')
+        self.today = date(2025, 1, 3)
+
+    def mark(self, *days_ago):
+        for days in days_ago:
+            activity.mark_active(self.user.pk, self.today - timedelta(days=days))
+
+    def test_bit_helpers(self):
+        """Test run lengths come straight from the bits"""
+        bits = 0b1101110111
+        self.assertEqual(activity.run_ending_at(bits, 2), 3)
+        self.assertEqual(activity.run_ending_at(bits, 9), 2)
+        self.assertEqual(activity.run_ending_at(bits, 3), 0)
+        self.assertEqual(activity.longest_run(bits), 3)
+        self.assertEqual(activity.live_run(0b0110, 3), 2)
+
+    def test_streaks_span_years(self):
+        """Test a streak across new year and a day's bit being set only once"""
+        self.mark(10, 9, 8, 4, 3, 2, 1)
+        self.assertFalse(activity.mark_active(self.user.pk, self.today - timedelta(days=1)))
+        self.assertEqual(ActivityBitmap.objects.filter(user=self.user).count(), 2)
+
+        # Yesterday still counts until today is over
+        self.assertEqual(activity.current_streak(self.user.pk, self.today), 4)
+        self.assertEqual(activity.current_streak(self.user.pk, self.today + timedelta(days=1)), 0)
+        self.assertEqual(activity.longest_streak(self.user.pk, self.today), 4)
+
+        score = ReputationScore.objects.get(user=self.user)
+        self.assertEqual(score.consecutive_days_active, 4)
+        self.assertEqual(score.last_active_date, self.today - timedelta(days=1))
+        # Unrelated saves no longer move the activity date
+        score.save()
+        score.refresh_from_db()
+        self.assertEqual(score.last_active_date, self.today - timedelta(days=1))
+
+    def test_heatmap(self):
+        """Test the heatmap grid lines days up with their bits"""
+        self.mark(0, 1, 400)
+        grid = activity.heatmap(self.user.pk, self.today)
+        self.assertEqual(len(grid['weeks']), activity.HEATMAP_WEEKS)
+        self.assertEqual(grid['active_days'], 2)
+        self.assertEqual(grid['current_streak'], 2)
+        # 3 January 2025 is a Friday
+        self.assertEqual(grid['weeks'][-1][4], (self.today, True))
+        self.assertEqual(grid['weeks'][-1][2], (self.today - timedelta(days=2), False))
+        self.assertIsNone(grid['weeks'][-1][5])
+
+    def test_requests_write_once_a_day(self):
+        """Test the middleware dedupes activity writes per user per day"""
+        UserProfile.objects.create(user=self.user)
+        with mock.patch.object(activity, 'tracker', activity.ActivityTracker()):
+            self.client.login(username='alice', password='testpass123')
+            with mock.patch.object(activity, 'mark_active') as mark_active:
+                self.client.get(reverse('gamification:leaderboard'))
+                self.client.get(reverse('core:profile', args=['alice']))
+            mark_active.assert_not_called()
+
+            row = ActivityBitmap.objects.get(user=self.user)
+            self.assertEqual(activity.to_int(row.bits), 1 << activity.day_bit(timezone.localdate()))
+            response = self.client.get(reverse('core:profile', args=['alice']))
+        self.assertEqual(response.context['activity']['current_streak'], 1)
+
+
+class ChallengeScoreboardTest(TestCase):
+    """Test stored upvote counts, batched winner selection and entry uploads"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(4)]
+        self.badge = Badge.objects.create(
+            name='Challenge Champion', description='Won a challenge', badge_type='special', criteria='Win',
+        )
+        now = timezone.now()
+        self.challenge = WeeklyChallenge.objects.create(
+            title='Bridge design', description='Design a bridge', challenge_type='design',
+            problem_statement='Span 20m', difficulty='easy', discipline='Civil', points_reward=75,
+            badge_reward=self.badge, start_date=now - timedelta(days=7), end_date=now - timedelta(minutes=1),
+            created_by=self.users[0],
+        )
+        self.entries = [
+            ChallengeSubmission.objects.create(challenge=self.challenge, user=user, submission_text=f'Entry {i}')
+            for i, user in enumerate(self.users[:3])
+        ]
+
+    def total(self, entry):
+        return ChallengeSubmission.objects.get(pk=entry.pk).upvotes_total
+
+    def test_upvote_totals_follow_the_m2m(self):
+        """Test adds, removes and clears from either side keep the stored count right"""
+        first, second, _ = self.entries
+        first.upvotes.add(self.users[1], self.users[2])
+        first.upvotes.add(self.users[1])
+        self.users[3].challenge_upvotes.add(first, second)
+        self.assertEqual(self.total(first), 3)
+        self.assertEqual(self.total(second), 1)
+
+        first.upvotes.remove(self.users[1], self.users[0])
+        self.assertEqual(self.total(first), 2)
+        self.users[3].challenge_upvotes.clear()
+        self.assertEqual((self.total(first), self.total(second)), (1, 0))
+        first.upvotes.clear()
+        first.refresh_from_db()
+        self.assertEqual(first.upvote_count(), 0)
+
+    def test_close_challenges_picks_top_ranked(self):
+        """Test judges' scores outrank votes and each challenge is closed once"""
+        self.entries[0].upvotes.add(*self.users)
+        ChallengeSubmission.objects.filter(pk=self.entries[1].pk).update(score=90)
+        ChallengeSubmission.objects.filter(pk=self.entries[2].pk).update(score=80)
+        self.assertEqual(
+            [entry.pk for entry in challenges.scoreboard(self.challenge)],
+            [self.entries[1].pk, self.entries[2].pk, self.entries[0].pk],
+        )
+
+        output = StringIO()
+        call_command('close_challenges', stdout=output)
+        self.assertIn('Closed 1 challenges', output.getvalue())
+        self.assertEqual(
+            list(ChallengeSubmission.objects.filter(is_winner=True).values_list('user', flat=True)), [self.users[1].pk]
+        )
+        self.assertTrue(UserBadge.objects.filter(user=self.users[1], badge=self.badge).exists())
+        self.badge.refresh_from_db()
+        self.assertEqual(self.badge.times_awarded, 1)
+        won = ReputationEvent.objects.get(action='challenge_won')
+        self.assertEqual((won.user, won.points), (self.users[1], 75))
+
+        self.assertEqual(challenges.close_challenges(), 0)
+        self.assertEqual(ChallengeSubmission.objects.filter(is_winner=True).count(), 1)
+
+    def test_scoreboard_view_and_upvote(self):
+        """Test the scoreboard renders stored counts and upvotes toggle"""
+        self.client.login(username='user3', password='testpass123')
+        response = self.client.post(reverse('gamification:submission_upvote', args=[self.entries[0].pk]))
+        self.assertContains(response, '<span>1</span>')
+        self.assertEqual(self.total(self.entries[0]), 1)
+
+        response = self.client.get(reverse('gamification:challenge_detail', args=[self.challenge.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['scoreboard'][0], self.entries[0])
+        self.assertTrue(response.context['scoreboard'][0].upvoted)
+        self.assertNotIn('form', response.context)
+
+    def test_entry_file_streams_through_a_temporary_file(self):
+        """Test uploads use the temporary file handler and are saved to storage"""
+        WeeklyChallenge.objects.filter(pk=self.challenge.pk).update(end_date=timezone.now() + timedelta(days=1))
+        self.client.login(username='user3', password='testpass123')
+        upload = SimpleUploadedFile('truss.txt', b'members and loads')
+
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media), \
+                mock.patch('gamification.views.TemporaryFileUploadHandler', wraps=TemporaryFileUploadHandler) as handler:
+            response = self.client.post(
+                reverse('gamification:challenge_submit', args=[self.challenge.pk]),
+                {'submission_text': 'A Warren truss', 'submission_file': upload},
+            )
+            self.assertRedirects(response, reverse('gamification:challenge_detail', args=[self.challenge.pk]))
+            handler.assert_called_once()
+            entry = ChallengeSubmission.objects.get(challenge=self.challenge, user=self.users[3])
+            with entry.submission_file.open() as saved:
+                self.assertEqual(saved.read(), b'members and loads')
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'gamification'
+
+urlpatterns = [
+    path('leaderboard/', views.LeaderboardView.as_view(), name='leaderboard'),
+    path('leaderboard/<str:period>/', views.LeaderboardView.as_view(), name='leaderboard_period'),
+    path('challenges/', views.ChallengeListView.as_view(), name='challenges'),
+    path('challenges/<int:pk>/', views.ChallengeDetailView.as_view(), name='challenge_detail'),
+    path('challenges/<int:pk>/submit/', views.submit_entry, name='challenge_submit'),
+    path('submissions/<int:pk>/upvote/', views.toggle_submission_upvote, name='submission_upvote'),
+]
@@ -1,3 +1,141 @@
-from django.shortcuts import render
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.generic import TemplateView, ListView, DetailView
 
-# Create your views here.
+from .challenges import scoreboard
+from .forms import ChallengeSubmissionForm
+from .leaderboards import PERIODS, leaderboards
+from .models import WeeklyChallenge, ChallengeSubmission
+
+
+class LeaderboardView(TemplateView):
+    """Top users for a period plus the viewer's own rank, from the in-memory boards"""
+    template_name = 'gamification/leaderboard.html'
+    page_size = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        period = self.kwargs.get('period', 'weekly')
+        if period not in PERIODS:
+            raise Http404('Unknown leaderboard period')
+
+        board = leaderboards.board(period)
+        top = board.top(self.page_size)
+        users = User.objects.in_bulk([user_id for _, user_id, _ in top])
+
+        context['page_title'] = f"{period.replace('_', '-').title()} Leaderboard - engg.pk"
+        context['meta_description'] = 'The most helpful engineers in the engg.pk community.'
+        context['period'] = period
+        context['periods'] = [(value, value.replace('_', ' ').title()) for value in PERIODS]
+        context['entries'] = [(rank, users[user_id], points) for rank, user_id, points in top if user_id in users]
+        context['total_ranked'] = len(board)
+
+        user = self.request.user
+        if user.is_authenticated:
+            context['my_rank'] = board.rank(user.pk)
+            context['my_points'] = board.points.get(user.pk, 0)
+        return context
+
+
+class ChallengeListView(ListView):
+    model = WeeklyChallenge
+    template_name = 'gamification/challenges.html'
+    context_object_name = 'challenges'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return WeeklyChallenge.objects.annotate(entries=Count('submissions'))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Weekly Challenges - engg.pk'
+        context['meta_description'] = 'Weekly engineering challenges for the engg.pk community.'
+        return context
+
+
+class ChallengeDetailView(DetailView):
+    """A challenge with its scoreboard, ranked straight off the ranking index"""
+    model = WeeklyChallenge
+    template_name = 'gamification/challenge_detail.html'
+    context_object_name = 'challenge'
+    scoreboard_size = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        challenge = self.object
+        user = self.request.user
+        page = Paginator(scoreboard(challenge, user), self.scoreboard_size).get_page(self.request.GET.get('page'))
+
+        context['page_title'] = f'{challenge.title} - engg.pk'
+        context['scoreboard'] = page
+        context['rank_offset'] = page.start_index() - 1 if page.object_list else 0
+        if user.is_authenticated:
+            entry = ChallengeSubmission.objects.filter(challenge=challenge, user=user).first()
+            context['my_submission'] = entry
+            if challenge.is_active():
+                context['form'] = ChallengeSubmissionForm(instance=entry)
+        return context
+
+
+@login_required
+def toggle_submission_upvote(request, pk):
+    """Toggle an upvote on a challenge submission (HTMX)"""
+    submission = get_object_or_404(ChallengeSubmission, pk=pk)
+    if request.method != 'POST':
+        return HttpResponse(status=400)
+
+    if submission.upvotes.filter(pk=request.user.pk).exists():
+        submission.upvotes.remove(request.user)
+        upvoted = False
+    else:
+        submission.upvotes.add(request.user)
+        upvoted = True
+    submission.refresh_from_db(fields=['upvotes_total'])
+
+    return render(request, 'gamification/partials/upvote_button.html', {
+        'submission': submission,
+        'upvoted': upvoted,
+    })
+
+
+@csrf_exempt
+@login_required
+def submit_entry(request, pk):
+    """
+    Enter a challenge. The CSRF check is deferred to the inner view so the
+    upload handlers can be swapped before the body is read: the file then
+    streams to a temporary file on disk in chunks instead of being buffered
+    in memory, and is moved (not copied) into storage on save.
+    """
+    request.upload_handlers = [TemporaryFileUploadHandler(request)]
+    return _submit_entry(request, pk)
+
+
+@csrf_protect
+def _submit_entry(request, pk):
+    challenge = get_object_or_404(WeeklyChallenge, pk=pk)
+    if request.method != 'POST':
+        return redirect('gamification:challenge_detail', pk=pk)
+    if not challenge.is_active():
+        messages.error(request, 'This challenge is not accepting entries.')
+        return redirect('gamification:challenge_detail', pk=pk)
+
+    entry = ChallengeSubmission.objects.filter(challenge=challenge, user=request.user).first()
+    form = ChallengeSubmissionForm(request.POST, request.FILES, instance=entry)
+    if form.is_valid():
+        submission = form.save(commit=False)
+        submission.challenge = challenge
+        submission.user = request.user
+        submission.save()
+        messages.success(request, 'Your entry has been submitted!')
+        return redirect('gamification:challenge_detail', pk=pk)
+
+    messages.error(request, ' '.join(error for errors in form.errors.values() for error in errors))
+    return redirect('gamification:challenge_detail', pk=pk)
@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import Job, SavedJob, JobApplication
+from .models import Job, SavedJob, JobApplication, ApplicationFunnelDaily
 
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ['title', 'company', 'location', 'job_type', 'experience_level', 'is_active', 'posted_date']
-    list_filter = ['job_type', 'experience_level', 'is_active', 'discipline', 'posted_date']
+    list_filter = ['job_type', 'experience_level', 'is_active', 'discipline', 'source', 'posted_date']
     search_fields = ['title', 'company', 'location', 'description']
     readonly_fields = ['posted_date']
     list_editable = ['is_active']
@@ -38,3 +38,10 @@ class JobApplicationAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'job__title']
     readonly_fields = ['applied_at', 'updated_at']
     list_editable = ['status']
+
+
+@admin.register(ApplicationFunnelDaily)
+class ApplicationFunnelDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'job', 'company', 'discipline', 'status', 'entered_count']
+    list_filter = ['status', 'date']
+    search_fields = ['company', 'discipline', 'job__title']
@@ -0,0 +1,124 @@
+"""
+Bitmap facet index over active jobs.
+
+Every facet value owns a bitset (a Python int) with one bit per active job,
+so facet counts for any combination of selected filters and search results
+are a few AND + bit_count() operations instead of one GROUP BY per facet.
+
+The index is built with a single query and kept per process. Job writes bump
+a version key in the cache (see jobs/signals.py), and each process rebuilds
+its copy lazily the next time it notices the version changed.
+"""
+from core import versions
+from .models import Job
+
+
+# URL parameter -> Job field
+FACETS = {
+    'discipline': 'discipline',
+    'level': 'experience_level',
+    'type': 'job_type',
+    'location': 'location',
+}
+
+FACET_LABELS = {
+    'discipline': 'Discipline',
+    'level': 'Experience Level',
+    'type': 'Job Type',
+    'location': 'Location',
+}
+
+VERSION_KEY = 'jobs:facet_index:version'
+
+_index = None
+_index_version = None
+
+
+def _bitset(positions, size):
+    """Build an int bitset from bit positions without O(n^2) int ORs"""
+    buffer = bytearray((size + 7) // 8)
+    for pos in positions:
+        buffer[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class FacetIndex:
+    """Per-value bitsets over the active jobs"""
+
+    def __init__(self, rows):
+        self.positions = {}
+        value_positions = {facet: {} for facet in FACETS}
+
+        for pos, (pk, *values) in enumerate(rows):
+            self.positions[pk] = pos
+            for facet, value in zip(FACETS, values):
+                value_positions[facet].setdefault(value, []).append(pos)
+
+        self.size = len(self.positions)
+        self.all = (1 << self.size) - 1
+        self.bitmaps = {
+            facet: {value: _bitset(positions, self.size) for value, positions in values.items()}
+            for facet, values in value_positions.items()
+        }
+
+    @classmethod
+    def build(cls):
+        rows = Job.objects.filter(is_active=True).order_by('pk').values_list('pk', *FACETS.values())
+        return cls(rows.iterator(chunk_size=5000))
+
+    def mask_for_ids(self, pks):
+        """Bitset of the given job ids (ids outside the index are ignored)"""
+        positions = self.positions
+        return _bitset((positions[pk] for pk in pks if pk in positions), self.size)
+
+    def filter_mask(self, selected, exclude=None):
+        """AND across facets, OR within a facet (multi-select)"""
+        mask = self.all
+        for facet, values in selected.items():
+            if facet == exclude or not values:
+                continue
+            bitmaps = self.bitmaps[facet]
+            facet_mask = 0
+            for value in values:
+                facet_mask |= bitmaps.get(value, 0)
+            mask &= facet_mask
+        return mask
+
+    def counts(self, selected, base_mask=None):
+        """
+        Count every facet value under the current selection.
+
+        Counts for a facet ignore that facet's own selection so users can
+        see how many results picking another value would add.
+        """
+        if base_mask is None:
+            base_mask = self.all
+
+        result = {}
+        for facet, bitmaps in self.bitmaps.items():
+            mask = base_mask & self.filter_mask(selected, exclude=facet)
+            counts = [(value, (bitmap & mask).bit_count()) for value, bitmap in bitmaps.items()]
+            counts.sort(key=lambda item: (-item[1], item[0]))
+            result[facet] = counts
+        return result
+
+
+def invalidate():
+    """Mark every process's facet index stale"""
+    versions.bump(VERSION_KEY)
+
+
+def version():
+    """Counter bumped on every job write; in-process job indexes compare against it"""
+    return versions.current(VERSION_KEY)
+
+
+def get_index():
+    """Return this process's index, rebuilding it if a job changed since it was built"""
+    global _index, _index_version
+
+    current = version()
+    if _index is None or current != _index_version:
+        _index = FacetIndex.build()
+        _index_version = current
+    return _index
@@ -0,0 +1,145 @@
+"""
+Job application funnel analytics.
+
+Status changes are appended to ApplicationStatusEvent (one cheap INSERT on
+the request path). `manage.py rollup_application_funnel` folds new events
+into ApplicationFunnelDaily, resuming from a Checkpoint so each event is
+counted exactly once. Funnel and time-to-offer reports read only the rollups.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.models import Checkpoint
+from .models import ApplicationStatusEvent, ApplicationFunnelDaily
+
+
+CHECKPOINT = 'jobs.application_funnel'
+
+FUNNEL_STAGES = ['applied', 'reviewing', 'interview', 'offer']
+
+
+def record_transition(application, from_status, to_status):
+    """Append a status transition to the event log"""
+    return ApplicationStatusEvent.objects.create(
+        application=application,
+        job_id=application.job_id,
+        from_status=from_status or '',
+        to_status=to_status,
+    )
+
+
+def rollup_events(batch_size=5000):
+    """Fold events past the checkpoint into the daily rollups; returns events processed"""
+    processed = 0
+    while True:
+        with transaction.atomic():
+            checkpoint = Checkpoint.locked(CHECKPOINT)
+            events = list(
+                checkpoint.pending(ApplicationStatusEvent.objects)
+                .values('id', 'job_id', 'job__company', 'job__discipline', 'to_status',
+                        'created_at', 'application__applied_at')[:batch_size]
+            )
+            if not events:
+                return processed
+
+            apply_events(events)
+
+            checkpoint.position = events[-1]['id']
+            checkpoint.save(update_fields=['position', 'updated_at'])
+            processed += len(events)
+
+
+def apply_events(events):
+    """Add a batch of events to the matching rollup rows"""
+    deltas = defaultdict(lambda: [0, 0.0])
+    labels = {}
+    for event in events:
+        key = (timezone.localdate(event['created_at']), event['job_id'], event['to_status'])
+        age = event['created_at'] - event['application__applied_at']
+        deltas[key][0] += 1
+        deltas[key][1] += max(age.total_seconds(), 0) / 86400
+        labels[event['job_id']] = (event['job__company'], event['job__discipline'])
+
+    dates = {date for date, _, _ in deltas}
+    job_ids = {job_id for _, job_id, _ in deltas}
+    existing = {
+        (row.date, row.job_id, row.status): row
+        for row in ApplicationFunnelDaily.objects.select_for_update().filter(date__in=dates, job_id__in=job_ids)
+    }
+
+    to_update, to_create = [], []
+    for key, (count, days) in deltas.items():
+        row = existing.get(key)
+        if row:
+            row.entered_count += count
+            row.days_since_applied_total += days
+            to_update.append(row)
+        else:
+            date, job_id, status = key
+            company, discipline = labels[job_id]
+            to_create.append(ApplicationFunnelDaily(
+                date=date, job_id=job_id, company=company, discipline=discipline,
+                status=status, entered_count=count, days_since_applied_total=days,
+            ))
+
+    ApplicationFunnelDaily.objects.bulk_update(to_update, ['entered_count', 'days_since_applied_total'])
+    ApplicationFunnelDaily.objects.bulk_create(to_create)
+
+
+def funnel_report(start=None, end=None, **filters):
+    """
+    Stage counts, conversion and mean time-to-status from the rollups.
+
+    `filters` narrows the rollup rows, e.g. job_id=..., company=..., discipline=...
+    """
+    rows = ApplicationFunnelDaily.objects.filter(**filters)
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+
+    totals = {
+        row['status']: row
+        for row in rows.values('status').annotate(count=Sum('entered_count'), days=Sum('days_since_applied_total'))
+    }
+
+    stages = []
+    first = totals.get(FUNNEL_STAGES[0], {}).get('count') or 0
+    previous = None
+    for status in FUNNEL_STAGES:
+        count = totals.get(status, {}).get('count') or 0
+        days = totals.get(status, {}).get('days') or 0
+        stages.append({
+            'status': status,
+            'count': count,
+            'conversion_from_previous': (count / previous * 100) if previous else None,
+            'conversion_from_applied': (count / first * 100) if first else None,
+            'mean_days': (days / count) if count else None,
+        })
+        previous = count
+
+    offer = totals.get('offer', {})
+    return {
+        'stages': stages,
+        'rejected': totals.get('rejected', {}).get('count') or 0,
+        'withdrawn': totals.get('withdrawn', {}).get('count') or 0,
+        'mean_days_to_offer': (offer['days'] / offer['count']) if offer.get('count') else None,
+    }
+
+
+def daily_series(status, start=None, end=None, **filters):
+    """[(date, count, mean_days)] for one status, for charts"""
+    rows = ApplicationFunnelDaily.objects.filter(status=status, **filters)
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+    return [
+        (row['date'], row['count'], row['days'] / row['count'] if row['count'] else None)
+        for row in rows.values('date').annotate(
+            count=Sum('entered_count'), days=Sum('days_since_applied_total')
+        ).order_by('date')
+    ]
@@ -0,0 +1,213 @@
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.alerts import percolate
+from jobs import facets, similar
+from jobs.models import Job
+
+
+REQUIRED_FIELDS = ['title', 'company', 'location', 'application_url']
+
+URL_MAX_LENGTH = Job._meta.get_field('application_url').max_length
+
+UPDATE_FIELDS = [
+    'title', 'company', 'location', 'job_type', 'discipline', 'experience_level',
+    'description', 'requirements', 'salary', 'application_url',
+    'expires_on', 'is_active', 'source', 'last_seen_at',
+]
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or JSONL job feed into the job board (dedupe, upsert, deactivate missing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Feed file, or '-' to read from stdin")
+        parser.add_argument('--source', required=True, help='Feed name; jobs missing from this feed are deactivated')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--keep-missing', action='store_true', help="Don't deactivate jobs absent from the feed")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        feed_format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if feed_format not in ('csv', 'jsonl'):
+            raise CommandError('Cannot infer feed format; pass --format csv or --format jsonl')
+
+        self.source = options['source']
+        self.started_at = timezone.now()
+        self.today = timezone.localdate(self.started_at)
+        self.stats = {'rows': 0, 'upserted': 0, 'duplicates': 0, 'skipped': 0}
+        started = time.monotonic()
+
+        handle = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            rows = self.read_csv(handle) if feed_format == 'csv' else self.read_jsonl(handle)
+            self.import_rows(rows, options['batch_size'])
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        deactivated = 0
+        if not options['keep_missing']:
+            deactivated = Job.objects.filter(
+                source=self.source,
+                is_active=True,
+                last_seen_at__lt=self.started_at,
+            ).update(is_active=False)
+
+        # Bulk writes skip model signals
+        facets.invalidate()
+        similar.invalidate()
+
+        elapsed = time.monotonic() - started
+        rate = self.stats['rows'] / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.stats['rows']} rows in {elapsed:.1f}s ({rate:,.0f} rows/s): "
+            f"{self.stats['upserted']} upserted, {self.stats['duplicates']} duplicates, "
+            f"{self.stats['skipped']} skipped, {deactivated} deactivated"
+        ))
+
+    def read_csv(self, handle):
+        yield from csv.DictReader(handle)
+
+    def read_jsonl(self, handle):
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                self.stderr.write(f'Line {line_number}: invalid JSON, skipped')
+                yield None
+
+    def import_rows(self, rows, batch_size):
+        seen = set()
+        batch = []
+
+        for row in rows:
+            self.stats['rows'] += 1
+            job = self.build_job(row)
+            if job is None:
+                self.stats['skipped'] += 1
+                continue
+            if job.content_hash in seen:
+                self.stats['duplicates'] += 1
+                continue
+            seen.add(job.content_hash)
+
+            batch.append(job)
+            if len(batch) >= batch_size:
+                self.flush(batch)
+                batch = []
+
+        if batch:
+            self.flush(batch)
+
+    def build_job(self, row):
+        if not isinstance(row, dict):
+            return None
+        # JSONL values may be numbers, lists or objects; everything is read as text
+        row = {
+            key.strip(): value if key.strip() == 'requirements' else self.text(value)
+            for key, value in row.items() if key
+        }
+        if any(not row.get(field) for field in REQUIRED_FIELDS):
+            return None
+        if not self.valid_url(row['application_url']):
+            return None
+
+        job_type = self.parse_choice(row.get('job_type'), Job.TYPE_CHOICES, 'full-time')
+        level = self.parse_choice(row.get('experience_level'), Job.LEVEL_CHOICES, 'entry')
+        if job_type is None or level is None:
+            return None
+        expires_on = self.parse_expiry(row.get('expires_on'))
+
+        return Job(
+            title=row['title'][:200],
+            company=row['company'][:200],
+            location=row['location'][:100],
+            job_type=job_type,
+            discipline=row.get('discipline', '')[:100],
+            experience_level=level,
+            description=row.get('description', ''),
+            requirements=self.parse_requirements(row.get('requirements')),
+            salary=row.get('salary', '')[:100],
+            application_url=row['application_url'],
+            expires_on=expires_on,
+            # A posting already past its expiry stays closed, as expire_listings would leave it
+            is_active=expires_on is None or expires_on >= self.today,
+            source=self.source,
+            last_seen_at=self.started_at,
+            content_hash=Job.compute_content_hash(
+                row['title'], row['company'], row['location'], row['application_url']
+            ),
+        )
+
+    def text(self, value):
+        return '' if value is None else str(value).strip()
+
+    def valid_url(self, value):
+        """An http(s) URL that fits Job.application_url (too long would fail the whole batch)"""
+        if len(value) > URL_MAX_LENGTH:
+            return False
+        try:
+            URLValidator()(value)
+        except ValidationError:
+            return False
+        return True
+
+    def parse_choice(self, value, choices, default):
+        """A choice key from a key or display label in any case ('Full-time', 'full time', 'SENIOR'); None if unknown"""
+        value = ' '.join(str(value or '').replace('-', ' ').replace('_', ' ').lower().split())
+        if not value:
+            return default
+        for key, label in choices:
+            if value in (key.replace('-', ' '), label.replace('-', ' ').lower()):
+                return key
+        return None
+
+    def parse_requirements(self, value):
+        """JSONL feeds send a list; CSV feeds send a JSON list or ';'-separated text"""
+        if isinstance(value, list):
+            return [str(item) for item in value]
+        value = self.text(value)
+        if value.startswith('['):
+            try:
+                return [str(item) for item in json.loads(value)]
+            except json.JSONDecodeError:
+                pass
+        return [item.strip() for item in value.split(';') if item.strip()]
+
+    def parse_expiry(self, value):
+        try:
+            return parse_date(str(value).strip()) if value else None
+        except ValueError:
+            return None
+
+    def flush(self, batch):
+        hashes = [job.content_hash for job in batch]
+        with transaction.atomic():
+            existing = set(Job.objects.filter(content_hash__in=hashes).values_list('content_hash', flat=True))
+            Job.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=['content_hash'],
+                update_fields=UPDATE_FIELDS,
+            )
+        self.stats['upserted'] += len(batch)
+
+        # bulk_create skips post_save, so match brand-new postings against saved searches here
+        new_hashes = [content_hash for content_hash in hashes if content_hash not in existing]
+        if new_hashes:
+            percolate('job', Job.objects.filter(content_hash__in=new_hashes))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.similar import refresh_similar_jobs
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed "similar jobs" list for every active job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        changed = refresh_similar_jobs(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated similar jobs for {changed} jobs'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.funnel import rollup_events
+
+
+class Command(BaseCommand):
+    help = 'Fold new application status events into the daily funnel rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        processed = rollup_events(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {processed} status events'))
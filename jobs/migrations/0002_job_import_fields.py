@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, help_text='Last time the source feed listed this job', null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='source',
+            field=models.CharField(blank=True, help_text='Feed the job was imported from', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['source', 'last_seen_at'], name='jobs_job_source_d5f3ce_idx'),
+        ),
+    ]
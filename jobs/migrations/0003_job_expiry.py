@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_import_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='expires_on',
+            field=models.DateField(blank=True, help_text='Deactivated by expire_listings after this date', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-posted_date'], name='jobs_active_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['expires_on'], name='jobs_active_expiry_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(choices=[('applied', 'Applied'), ('reviewing', 'Under Review'), ('interview', 'Interview Scheduled'), ('offer', 'Offer Received'), ('rejected', 'Rejected'), ('accepted', 'Accepted'), ('withdrawn', 'Withdrawn')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='jobs.jobapplication')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='application_events', to='jobs.job')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ApplicationFunnelDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('company', models.CharField(max_length=200)),
+                ('discipline', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('reviewing', 'Under Review'), ('interview', 'Interview Scheduled'), ('offer', 'Offer Received'), ('rejected', 'Rejected'), ('accepted', 'Accepted'), ('withdrawn', 'Withdrawn')], max_length=20)),
+                ('entered_count', models.PositiveIntegerField(default=0, help_text='Applications that reached this status on this day')),
+                ('days_since_applied_total', models.FloatField(default=0, help_text='Summed age of those applications, for time-to-status')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to='jobs.job')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['company', 'date'], name='jobs_applic_company_89dfa8_idx'), models.Index(fields=['discipline', 'date'], name='jobs_applic_discipl_5b39ec_idx')],
+                'unique_together': {('date', 'job', 'status')},
+            },
+        ),
+    ]
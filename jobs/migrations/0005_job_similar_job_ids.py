@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_application_funnel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='similar_job_ids',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -1,7 +1,11 @@
+import hashlib
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 
+from core.models import LoadedValuesMixin
+
 
 class Job(models.Model):
     """Engineering job listings"""
@@ -31,6 +35,15 @@ class Job(models.Model):
     application_url = models.URLField()
     is_active = models.BooleanField(default=True)
     posted_date = models.DateField(auto_now_add=True)
+    expires_on = models.DateField(null=True, blank=True, help_text="Deactivated by expire_listings after this date")
+
+    # Bulk feed imports (see the import_jobs management command)
+    source = models.CharField(max_length=100, blank=True, help_text="Feed the job was imported from")
+    content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    last_seen_at = models.DateTimeField(null=True, blank=True, help_text="Last time the source feed listed this job")
+
+    # Precomputed by the refresh_similar_jobs command (see jobs/similar.py)
+    similar_job_ids = models.JSONField(default=list, blank=True, editable=False)
 
     class Meta:
         ordering = ['-posted_date']
@@ -38,11 +51,20 @@ class Job(models.Model):
             models.Index(fields=['-posted_date']),
             models.Index(fields=['job_type']),
             models.Index(fields=['discipline']),
+            models.Index(fields=['source', 'last_seen_at']),
+            models.Index(fields=['-posted_date'], name='jobs_active_posted_idx', condition=models.Q(is_active=True)),
+            models.Index(fields=['expires_on'], name='jobs_active_expiry_idx', condition=models.Q(is_active=True)),
         ]
 
     def __str__(self):
         return f"{self.title} at {self.company}"
 
+    @staticmethod
+    def compute_content_hash(title, company, location, application_url):
+        """Identity of a posting across feed re-imports"""
+        parts = [' '.join(str(value or '').lower().split()) for value in (title, company, location, application_url)]
+        return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
     def get_absolute_url(self):
         return reverse('jobs:detail', kwargs={'pk': self.pk})
 
@@ -65,8 +87,11 @@ class SavedJob(models.Model):
         return f"{self.user.username} saved {self.job.title}"
 
 
-class JobApplication(models.Model):
+class JobApplication(LoadedValuesMixin, models.Model):
     """Track job applications"""
+    # The stored status, so a save can log the transition without re-reading it
+    loaded_values = {'_loaded_status': 'status'}
+
     STATUS_CHOICES = [
         ('applied', 'Applied'),
         ('reviewing', 'Under Review'),
@@ -90,3 +115,40 @@ class JobApplication(models.Model):
 
     def __str__(self):
         return f"{self.user.username} applied to {self.job.title}"
+
+
+class ApplicationStatusEvent(models.Model):
+    """Append-only log of application status transitions"""
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='status_events')
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='application_events')
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.application}: {self.from_status or 'new'} -> {self.to_status}"
+
+
+class ApplicationFunnelDaily(models.Model):
+    """Daily per-job rollup of status transitions (see jobs/funnel.py)"""
+    date = models.DateField()
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='funnel_rollups')
+    company = models.CharField(max_length=200)
+    discipline = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=JobApplication.STATUS_CHOICES)
+    entered_count = models.PositiveIntegerField(default=0, help_text="Applications that reached this status on this day")
+    days_since_applied_total = models.FloatField(default=0, help_text="Summed age of those applications, for time-to-status")
+
+    class Meta:
+        unique_together = ['date', 'job', 'status']
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['company', 'date']),
+            models.Index(fields=['discipline', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.job_id} {self.status}: {self.entered_count}"
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import facets, funnel, similar
+from .models import Job, JobApplication
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_facets(sender, **kwargs):
+    """Any job write can change facet membership or counts"""
+    facets.invalidate()
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_detail(sender, **kwargs):
+    """Cached detail pages embed this job, either as the page or as a similar job"""
+    similar.invalidate()
+
+
+@receiver(post_save, sender=JobApplication)
+def log_application_status(sender, instance, created, **kwargs):
+    """Append status transitions (from any code path, including admin) to the funnel log"""
+    previous = None if created else getattr(instance, '_loaded_status', None)
+    if created or previous != instance.status:
+        funnel.record_transition(instance, previous, instance.status)
+    instance._loaded_status = instance.status
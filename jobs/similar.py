@@ -0,0 +1,91 @@
+"""
+Similar jobs and the cached job detail payload.
+
+`manage.py refresh_similar_jobs` groups active jobs into clusters by
+discipline, level and location and stores each job's nearest neighbours in
+Job.similar_job_ids, so the detail page never searches for them. The job and
+its similar jobs are cached per job; only the viewer's saved/applied state is
+read per request.
+"""
+from core import versions
+from .models import Job
+
+
+SIMILAR_LIMIT = 4
+
+# Cluster keys from most to least specific; a job's neighbours are filled
+# from the tightest cluster first
+CLUSTER_KEYS = [
+    ('discipline', 'experience_level', 'location'),
+    ('discipline', 'experience_level'),
+    ('discipline',),
+]
+
+VERSION_KEY = 'jobs:detail:version'
+DETAIL_TIMEOUT = 60 * 60
+
+# Columns needed to render a similar job card
+CARD_FIELDS = ['id', 'title', 'company', 'location', 'job_type', 'posted_date']
+
+
+def compute_similar(jobs, limit=SIMILAR_LIMIT):
+    """
+    {job_id: [similar job ids]} for dicts with id + cluster fields, which
+    must already be ordered newest first.
+    """
+    clusters = [{} for _ in CLUSTER_KEYS]
+    for job in jobs:
+        for fields, members in zip(CLUSTER_KEYS, clusters):
+            group = members.setdefault(tuple(job[field] for field in fields), [])
+            # A job never needs more than `limit` neighbours besides itself
+            if len(group) <= limit:
+                group.append(job['id'])
+
+    similar = {}
+    for job in jobs:
+        chosen = []
+        for fields, members in zip(CLUSTER_KEYS, clusters):
+            for pk in members[tuple(job[field] for field in fields)]:
+                if pk != job['id'] and pk not in chosen:
+                    chosen.append(pk)
+            if len(chosen) >= limit:
+                break
+        similar[job['id']] = chosen[:limit]
+    return similar
+
+
+def refresh_similar_jobs(batch_size=1000):
+    """Recompute similar_job_ids for every active job; returns rows changed"""
+    jobs = list(
+        Job.objects.filter(is_active=True)
+        .order_by('-posted_date', '-pk')
+        .values('id', 'discipline', 'experience_level', 'location', 'similar_job_ids')
+    )
+    similar = compute_similar(jobs)
+
+    changed = [
+        Job(pk=job['id'], similar_job_ids=similar[job['id']])
+        for job in jobs
+        if job['similar_job_ids'] != similar[job['id']]
+    ]
+    Job.objects.bulk_update(changed, ['similar_job_ids'], batch_size=batch_size)
+    if changed:
+        invalidate()
+    return len(changed)
+
+
+def similar_jobs(job):
+    """Active jobs from job.similar_job_ids, in stored order"""
+    if not job.similar_job_ids:
+        return []
+    jobs = Job.objects.filter(pk__in=job.similar_job_ids, is_active=True).only(*CARD_FIELDS).in_bulk()
+    return [jobs[pk] for pk in job.similar_job_ids if pk in jobs]
+
+
+def invalidate():
+    """Drop every cached job detail payload"""
+    versions.bump(VERSION_KEY)
+
+
+def detail_cache_key(pk):
+    return f'jobs:detail:{versions.current(VERSION_KEY)}:{pk}'
@@ -1,8 +1,16 @@
-from django.test import TestCase, Client
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.urls import reverse
 from django.utils import timezone
-from .models import Job, SavedJob, JobApplication
+from .models import Job, SavedJob, JobApplication, ApplicationStatusEvent, ApplicationFunnelDaily
+from . import funnel, similar
 
 
 class JobModelTest(TestCase):
@@ -137,3 +145,325 @@ class JobViewsTest(TestCase):
         application = JobApplication.objects.filter(user=self.user, job=self.job).first()
         self.assertIsNotNone(application)
         self.assertEqual(application.status, 'applied')
+
+
+class JobDetailTest(TestCase):
+    """Test the cached job detail page and similar jobs"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.jobs = [
+            Job.objects.create(
+                title=title, company='Tech Corp', location=location, description='Great opportunity',
+                job_type='full-time', experience_level=level, discipline=discipline,
+                application_url='https://example.com/apply',
+            )
+            for title, discipline, level, location in [
+                ('Backend Engineer', 'Software', 'mid', 'Karachi'),
+                ('API Engineer', 'Software', 'mid', 'Karachi'),
+                ('Platform Engineer', 'Software', 'mid', 'Lahore'),
+                ('Staff Engineer', 'Software', 'lead', 'Karachi'),
+                ('Site Engineer', 'Civil', 'mid', 'Karachi'),
+            ]
+        ]
+        call_command('refresh_similar_jobs', stdout=StringIO())
+
+    def test_similar_jobs_prefer_tightest_cluster(self):
+        """Test neighbours come from the same discipline/level/location first"""
+        backend = Job.objects.get(pk=self.jobs[0].pk)
+        self.assertEqual(backend.similar_job_ids[0], self.jobs[1].pk)
+        self.assertEqual(set(backend.similar_job_ids), {job.pk for job in self.jobs[1:4]})
+        self.assertEqual(Job.objects.get(pk=self.jobs[4].pk).similar_job_ids, [])
+        self.assertEqual(similar.refresh_similar_jobs(), 0)
+
+    def test_detail_query_budget(self):
+        """Test a detail page costs two queries uncached and one cached"""
+        self.client.login(username='testuser', password='testpass123')
+        SavedJob.objects.create(user=self.user, job=self.jobs[0])
+        url = reverse('jobs:detail', args=[self.jobs[0].pk])
+
+        # Session and user lookups come on top of the view's own queries
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertTrue(response.context['is_saved'])
+        self.assertFalse(response.context['has_applied'])
+        self.assertContains(response, 'API Engineer')
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertTrue(response.context['is_saved'])
+
+    def test_cached_page_reflects_job_changes(self):
+        """Test saving a job invalidates its cached detail page"""
+        url = reverse('jobs:detail', args=[self.jobs[0].pk])
+        self.client.get(url)
+        self.jobs[0].is_active = False
+        self.jobs[0].save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class JobFacetTest(TestCase):
+    """Test faceted job search and bitmap facet counts"""
+
+    def setUp(self):
+        self.client = Client()
+        for title, discipline, level, job_type, location in [
+            ('Backend Engineer', 'Software', 'mid', 'full-time', 'Karachi'),
+            ('Frontend Engineer', 'Software', 'entry', 'full-time', 'Lahore'),
+            ('Site Engineer', 'Civil', 'mid', 'contract', 'Karachi'),
+            ('Power Engineer', 'Electrical', 'senior', 'full-time', 'Islamabad'),
+        ]:
+            Job.objects.create(
+                title=title,
+                company='Tech Corp',
+                location=location,
+                description='Great opportunity',
+                job_type=job_type,
+                experience_level=level,
+                discipline=discipline,
+                application_url='https://example.com/apply',
+            )
+        Job.objects.create(
+            title='Archived Engineer',
+            company='Old Corp',
+            location='Karachi',
+            description='Closed',
+            job_type='full-time',
+            experience_level='mid',
+            discipline='Software',
+            application_url='https://example.com/apply',
+            is_active=False,
+        )
+
+    def facet_counts(self, response, facet):
+        group = next(g for g in response.context['facets'] if g['param'] == facet)
+        return {option['value']: option['count'] for option in group['options']}
+
+    def test_counts_cover_active_jobs_only(self):
+        """Test facet counts ignore inactive jobs"""
+        response = self.client.get(reverse('jobs:list'))
+        self.assertEqual(self.facet_counts(response, 'discipline'), {'Software': 2, 'Civil': 1, 'Electrical': 1})
+        self.assertEqual(self.facet_counts(response, 'location'), {'Karachi': 2, 'Lahore': 1, 'Islamabad': 1})
+
+    def test_multi_select_within_facet(self):
+        """Test selecting several values of one facet ORs them together"""
+        response = self.client.get(reverse('jobs:list'), {'discipline': ['Civil', 'Electrical']})
+        titles = {job.title for job in response.context['jobs']}
+        self.assertEqual(titles, {'Site Engineer', 'Power Engineer'})
+        # A facet's own counts ignore its selection
+        self.assertEqual(self.facet_counts(response, 'discipline')['Software'], 2)
+
+    def test_facets_combine_across_facets_and_search(self):
+        """Test counts reflect other facets' selections and the search"""
+        response = self.client.get(reverse('jobs:list'), {'search': 'Karachi', 'level': 'mid'})
+        self.assertEqual(len(response.context['jobs']), 2)
+        self.assertEqual(self.facet_counts(response, 'discipline'), {'Software': 1, 'Civil': 1})
+        self.assertEqual(self.facet_counts(response, 'type'), {'full-time': 1, 'contract': 1})
+
+    def test_index_refreshes_after_job_change(self):
+        """Test saving a job invalidates the cached facet index"""
+        self.client.get(reverse('jobs:list'))
+        Job.objects.filter(title='Site Engineer').first().delete()
+        response = self.client.get(reverse('jobs:list'))
+        self.assertNotIn('Civil', self.facet_counts(response, 'discipline'))
+
+
+class ImportJobsCommandTest(TestCase):
+    """Test the streaming import_jobs command"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write_feed(self, name, content):
+        path = Path(self.tmpdir.name) / name
+        path.write_text(content, encoding='utf-8')
+        return str(path)
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command('import_jobs', path, '--source', 'partner', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_csv_import_dedupes_rows(self):
+        """Test duplicate postings in one feed are imported once"""
+        path = self.write_feed('feed.csv', (
+            'title,company,location,application_url,job_type,experience_level,discipline,requirements\n'
+            'Backend Engineer,Tech Corp,Karachi,https://example.com/1,full-time,mid,Software,Python;Django\n'
+            'backend engineer, Tech Corp ,Karachi,https://example.com/1,full-time,mid,Software,Python\n'
+            'Site Engineer,Build Co,Lahore,https://example.com/2,contract,senior,Civil,AutoCAD\n'
+        ))
+        output = self.run_import(path)
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertIn('1 duplicates', output)
+        job = Job.objects.get(company='Tech Corp')
+        self.assertEqual(job.requirements, ['Python', 'Django'])
+        self.assertEqual(job.source, 'partner')
+
+    def test_reimport_updates_and_deactivates_missing(self):
+        """Test re-importing upserts existing jobs and deactivates dropped ones"""
+        first = self.write_feed('first.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'title': 'Backend Engineer', 'company': 'Tech Corp', 'location': 'Karachi',
+             'application_url': 'https://example.com/1', 'salary': 'PKR 100,000'},
+            {'title': 'Site Engineer', 'company': 'Build Co', 'location': 'Lahore',
+             'application_url': 'https://example.com/2'},
+        ]))
+        self.run_import(first)
+
+        second = self.write_feed('second.jsonl', json.dumps(
+            {'title': 'Backend Engineer', 'company': 'Tech Corp', 'location': 'Karachi',
+             'application_url': 'https://example.com/1', 'salary': 'PKR 150,000'}
+        ))
+        self.run_import(second)
+
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(Job.objects.get(company='Tech Corp').salary, 'PKR 150,000')
+        self.assertTrue(Job.objects.get(company='Tech Corp').is_active)
+        self.assertFalse(Job.objects.get(company='Build Co').is_active)
+
+    def test_choice_labels_are_normalised(self):
+        """Test display labels and mixed case map to choice keys instead of skipping the row"""
+        path = self.write_feed('feed.csv', (
+            'title,company,location,application_url,job_type,experience_level\n'
+            'Backend Engineer,Tech Corp,Karachi,https://example.com/1,Full-time,Senior\n'
+            'Site Engineer,Build Co,Lahore,https://example.com/2,PART TIME,mid\n'
+        ))
+        output = self.run_import(path)
+        self.assertIn('0 skipped', output)
+        self.assertEqual(
+            sorted(Job.objects.values_list('job_type', 'experience_level')),
+            [('full-time', 'senior'), ('part-time', 'mid')],
+        )
+
+    def test_reimport_keeps_expired_jobs_closed(self):
+        """Test a posting whose expiry has passed isn't reactivated by the next import"""
+        yesterday = (timezone.localdate() - timedelta(days=1)).isoformat()
+        path = self.write_feed('feed.jsonl', json.dumps(
+            {'title': 'Backend Engineer', 'company': 'Tech Corp', 'location': 'Karachi',
+             'application_url': 'https://example.com/1', 'expires_on': yesterday}
+        ))
+        self.run_import(path)
+        Job.objects.update(is_active=False)
+        self.run_import(path)
+        self.assertFalse(Job.objects.get().is_active)
+
+    def test_invalid_rows_are_skipped(self):
+        """Test rows missing required fields or with unknown choices are skipped"""
+        path = self.write_feed('feed.jsonl', '\n'.join([
+            json.dumps({'title': 'No URL', 'company': 'Tech Corp', 'location': 'Karachi'}),
+            json.dumps({'title': 'Bad Type', 'company': 'Tech Corp', 'location': 'Karachi',
+                        'application_url': 'https://example.com/3', 'job_type': 'gig'}),
+            'not json',
+            json.dumps({'title': 'Bad URL', 'company': 'Tech Corp', 'location': 'Karachi', 'application_url': 'apply here'}),
+            json.dumps({'title': 'Long URL', 'company': 'Tech Corp', 'location': 'Karachi',
+                        'application_url': 'https://example.com/' + 'a' * 200}),
+        ]))
+        output = self.run_import(path)
+        self.assertEqual(Job.objects.count(), 0)
+        self.assertIn('5 skipped', output)
+
+    def test_non_string_values_are_read_as_text(self):
+        """Test JSONL numbers and objects are coerced to text instead of aborting the import"""
+        path = self.write_feed('feed.jsonl', '\n'.join([
+            json.dumps({'title': 2024, 'company': 'Tech Corp', 'location': 42, 'application_url': 'https://example.com/1',
+                        'salary': 150000}),
+            json.dumps({'title': {'en': 'Engineer'}, 'company': 'Tech Corp', 'location': 'Karachi',
+                        'application_url': ['https://example.com/2']}),
+        ]))
+        output = self.run_import(path)
+        self.assertIn('1 upserted', output)
+        self.assertIn('1 skipped', output)
+        job = Job.objects.get()
+        self.assertEqual((job.title, job.location, job.salary), ('2024', '42', '150000'))
+
+
+@override_settings(CHECKPOINT_SETTLE_SECONDS=0)
+class ApplicationFunnelTest(TestCase):
+    """Test the application status log and funnel rollups"""
+
+    def setUp(self):
+        self.job = Job.objects.create(
+            title='Software Engineer',
+            company='Tech Corp',
+            location='Karachi',
+            description='Great opportunity',
+            discipline='Software',
+            application_url='https://example.com/apply',
+        )
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(3)]
+
+    def apply(self, user):
+        return JobApplication.objects.create(user=user, job=self.job)
+
+    def test_status_changes_are_logged(self):
+        """Test creating and updating an application appends transitions"""
+        application = self.apply(self.users[0])
+        application.status = 'interview'
+        application.save()
+        application.save()  # no change, no event
+
+        events = list(ApplicationStatusEvent.objects.values_list('from_status', 'to_status'))
+        self.assertEqual(events, [('', 'applied'), ('applied', 'interview')])
+
+    def test_rollup_counts_each_event_once(self):
+        """Test re-running the rollup resumes from the checkpoint"""
+        for user in self.users:
+            self.apply(user)
+        self.assertEqual(funnel.rollup_events(), 3)
+        self.assertEqual(funnel.rollup_events(), 0)
+
+        application = JobApplication.objects.get(user=self.users[0])
+        application.status = 'offer'
+        application.save()
+        self.assertEqual(funnel.rollup_events(batch_size=1), 1)
+
+        row = ApplicationFunnelDaily.objects.get(status='applied')
+        self.assertEqual(row.entered_count, 3)
+        self.assertEqual(row.company, 'Tech Corp')
+
+    def test_rollup_waits_for_recent_events(self):
+        """Test events inside the settle window are left for a later run, not skipped"""
+        for user in self.users[:2]:
+            self.apply(user)
+        with override_settings(CHECKPOINT_SETTLE_SECONDS=300):
+            self.assertEqual(funnel.rollup_events(), 0)
+            # The older event settles; the newer one still holds back everything after it
+            ApplicationStatusEvent.objects.filter(application__user=self.users[0]).update(
+                created_at=timezone.now() - timedelta(minutes=10),
+            )
+            self.assertEqual(funnel.rollup_events(), 1)
+        self.assertEqual(funnel.rollup_events(), 1)
+        self.assertEqual(ApplicationFunnelDaily.objects.get(status='applied').entered_count, 2)
+
+    def test_funnel_report(self):
+        """Test stage counts and conversion come from the rollups"""
+        applications = [self.apply(user) for user in self.users]
+        for application in applications[:2]:
+            application.status = 'interview'
+            application.save()
+        applications[0].status = 'offer'
+        applications[0].save()
+        call_command('rollup_application_funnel', stdout=StringIO())
+
+        report = funnel.funnel_report(company='Tech Corp')
+        stages = {stage['status']: stage for stage in report['stages']}
+        self.assertEqual(stages['applied']['count'], 3)
+        self.assertEqual(stages['interview']['count'], 2)
+        self.assertEqual(stages['offer']['count'], 1)
+        self.assertAlmostEqual(stages['offer']['conversion_from_applied'], 100 / 3)
+        self.assertIsNotNone(report['mean_days_to_offer'])
+
+    def test_funnel_view_is_staff_only(self):
+        """Test the funnel page requires a staff account"""
+        url = reverse('jobs:funnel')
+        self.client.login(username='user0', password='testpass123')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        User.objects.filter(username='user0').update(is_staff=True)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Application Funnel')
+        self.assertEqual(self.client.get(url, {'job': self.job.pk}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'job': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2024-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'end': '2024-13-01'}).status_code, 400)
@@ -5,7 +5,9 @@ app_name = 'jobs'
 
 urlpatterns = [
     path('', views.JobListView.as_view(), name='list'),
+    path('recommended/', views.RecommendedJobListView.as_view(), name='recommended'),
     path('<int:pk>/', views.JobDetailView.as_view(), name='detail'),
+    path('analytics/funnel/', views.application_funnel, name='funnel'),
 
     # HTMX endpoints
     path('<int:pk>/save/', views.toggle_save_job, name='toggle_save'),
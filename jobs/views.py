@@ -1,9 +1,15 @@
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
-from django.http import HttpResponse
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.dateparse import parse_date
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.http import HttpResponseBadRequest
+from career_tools.models import JobMatch
 from .models import Job, SavedJob, JobApplication
+from . import facets, funnel, similar
 
 
 class JobListView(ListView):
@@ -12,7 +18,13 @@ class JobListView(ListView):
     context_object_name = 'jobs'
     paginate_by = 20
 
-    def get_queryset(self):
+    def get_selected_facets(self):
+        return {
+            facet: [value for value in self.request.GET.getlist(facet) if value]
+            for facet in facets.FACETS
+        }
+
+    def get_search_queryset(self):
         queryset = Job.objects.filter(is_active=True)
 
         # Search
@@ -24,20 +36,81 @@ class JobListView(ListView):
                 Q(location__icontains=search)
             )
 
-        # Type filter
-        job_type = self.request.GET.get('type', '')
-        if job_type:
-            queryset = queryset.filter(job_type=job_type)
+        return queryset
+
+    def get_queryset(self):
+        queryset = self.get_search_queryset()
+
+        # Facet filters (multi-select within a facet, combined across facets)
+        for facet, values in self.get_selected_facets().items():
+            if values:
+                queryset = queryset.filter(**{f'{facets.FACETS[facet]}__in': values})
 
         return queryset
 
+    def get_facet_context(self):
+        """Facet options with counts, read from the bitmap index"""
+        index = facets.get_index()
+        selected = self.get_selected_facets()
+
+        base_mask = None
+        if self.request.GET.get('search', ''):
+            base_mask = index.mask_for_ids(self.get_search_queryset().values_list('pk', flat=True))
+
+        labels = {
+            'level': dict(Job.LEVEL_CHOICES),
+            'type': dict(Job.TYPE_CHOICES),
+        }
+
+        facet_groups = []
+        for facet, counts in index.counts(selected, base_mask).items():
+            options = [
+                {
+                    'value': value,
+                    'label': labels.get(facet, {}).get(value, value),
+                    'count': count,
+                    'selected': value in selected[facet],
+                }
+                for value, count in counts
+                if count or value in selected[facet]
+            ]
+            facet_groups.append({
+                'param': facet,
+                'label': facets.FACET_LABELS[facet],
+                'options': options,
+            })
+        return facet_groups
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'Job Opportunities - engg.pk'
         context['meta_description'] = 'Find engineering job opportunities across Pakistan in various industries.'
-        context['job_types'] = Job.TYPE_CHOICES
-        context['selected_type'] = self.request.GET.get('type', '')
         context['search_query'] = self.request.GET.get('search', '')
+        context['facets'] = self.get_facet_context()
+
+        # Preserve search and facet selections across pagination links
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context['querystring'] = params.urlencode()
+        return context
+
+
+class RecommendedJobListView(LoginRequiredMixin, ListView):
+    """Jobs matched to the user's resume skills by the nightly matching job"""
+    template_name = 'jobs/recommended.html'
+    context_object_name = 'matches'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return JobMatch.objects.filter(
+            user=self.request.user,
+            job__is_active=True
+        ).select_related('job').order_by('-score')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Recommended Jobs - engg.pk'
+        context['meta_description'] = 'Engineering jobs matched to the skills on your resume.'
         return context
 
 
@@ -46,19 +119,50 @@ class JobDetailView(DetailView):
     template_name = 'jobs/detail.html'
     context_object_name = 'job'
 
+    # Per-viewer annotations, never stored in the shared cache entry
+    VIEWER_FIELDS = ('is_saved', 'has_applied')
+
     def get_queryset(self):
         return Job.objects.filter(is_active=True)
 
+    def get_viewer_queryset(self):
+        """Active jobs annotated with the viewer's saved/applied state"""
+        user = self.request.user
+        return self.get_queryset().annotate(
+            is_saved=Exists(SavedJob.objects.filter(user=user, job=OuterRef('pk'))),
+            has_applied=Exists(JobApplication.objects.filter(user=user, job=OuterRef('pk'))),
+        )
+
+    def get_object(self, queryset=None):
+        """
+        Serve the job and its similar jobs from the per-job cache. A miss costs
+        two queries (job + viewer state, similar jobs); a hit costs one for
+        signed-in viewers and none for anonymous ones.
+        """
+        user = self.request.user
+        key = similar.detail_cache_key(self.kwargs['pk'])
+        cached = cache.get(key)
+
+        if cached is None:
+            job = super().get_object(self.get_viewer_queryset() if user.is_authenticated else None)
+            viewer = {name: job.__dict__.pop(name) for name in self.VIEWER_FIELDS if name in job.__dict__}
+            cached = (job, similar.similar_jobs(job))
+            cache.set(key, cached, similar.DETAIL_TIMEOUT)
+        else:
+            viewer = {}
+            if user.is_authenticated:
+                viewer = self.get_viewer_queryset().filter(pk=cached[0].pk).values(*self.VIEWER_FIELDS).first() or {}
+
+        self.viewer = viewer
+        self.similar_jobs = cached[1]
+        return cached[0]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = f'{self.object.title} at {self.object.company} - Jobs - engg.pk'
         context['meta_description'] = self.object.description[:155]
-
-        # Check if user has saved or applied to this job
-        if self.request.user.is_authenticated:
-            context['is_saved'] = SavedJob.objects.filter(user=self.request.user, job=self.object).exists()
-            context['has_applied'] = JobApplication.objects.filter(user=self.request.user, job=self.object).exists()
-
+        context['similar_jobs'] = self.similar_jobs
+        context.update(self.viewer)
         return context
 
 
@@ -106,3 +210,32 @@ def track_application(request, pk):
         'has_applied': True,
         'application': application
     })
+
+
+@staff_member_required
+def application_funnel(request):
+    """Application funnel and time-to-offer, read from the daily rollups"""
+    filters = {}
+    for param in ('company', 'discipline'):
+        value = request.GET.get(param, '')
+        if value:
+            filters[param] = value
+    if request.GET.get('job'):
+        try:
+            filters['job_id'] = int(request.GET['job'])
+        except ValueError:
+            return HttpResponseBadRequest()
+
+    try:
+        # parse_date() returns None for malformed input but raises on impossible dates like 2024-02-30
+        start = parse_date(request.GET.get('start', ''))
+        end = parse_date(request.GET.get('end', ''))
+    except ValueError:
+        return HttpResponseBadRequest()
+
+    return render(request, 'jobs/funnel.html', {
+        'page_title': 'Application Funnel - Jobs - engg.pk',
+        'report': funnel.funnel_report(start, end, **filters),
+        'offers_by_day': funnel.daily_series('offer', start, end, **filters),
+        'filters': request.GET,
+    })
@@ -0,0 +1,132 @@
+"""
+Server-side marker clustering for the zone/hub/service map.
+
+A map view asks for a bounding box at a zoom level. The box is split into
+the standard web-mercator (slippy map) tiles for that zoom, and the points in
+each tile are grouped by geohash prefix, with longer prefixes (smaller cells)
+as the map zooms in. Each cluster carries its count, per-kind counts and the
+mean position of its members; a cluster of one carries the point itself.
+
+Clusters are computed from the in-memory spatial index (location/spatial.py)
+and cached per tile. The spatial index version is part of the cache key, so
+a write to any mapped row retires every cached tile at once.
+"""
+import math
+from collections import Counter
+
+from django.core.cache import cache
+
+from . import spatial
+
+
+MAX_ZOOM = 20
+
+# Keeps one request to a handful of cache round trips (a 1920x1080 map spans ~40 tiles)
+MAX_TILES = 64
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Web-mercator stops short of the poles
+MAX_LATITUDE = 85.05112878
+
+TILE_KEY = 'location:clusters:{version}:{kinds}:{zoom}:{x}:{y}'
+
+
+def precision_for(zoom):
+    """Geohash length whose cells are a few to a few dozen pixels across at this zoom"""
+    return min(max(1, (zoom * 2 + 4) // 5), 9)
+
+
+def tile_x(longitude, zoom):
+    return min(max(int((longitude + 180) / 360 * 2 ** zoom), 0), 2 ** zoom - 1)
+
+
+def tile_y(latitude, zoom):
+    latitude = math.radians(min(max(latitude, -MAX_LATITUDE), MAX_LATITUDE))
+    y = (1 - math.asinh(math.tan(latitude)) / math.pi) / 2 * 2 ** zoom
+    return min(max(int(y), 0), 2 ** zoom - 1)
+
+
+def tile_bounds(zoom, x, y):
+    """(south, west, north, east) of a tile"""
+    size = 2 ** zoom
+
+    def longitude(column):
+        return column / size * 360 - 180
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / size))))
+
+    # Edge tiles are open-ended so points past the mercator limits or on the antimeridian still land somewhere
+    return (
+        -math.inf if y == size - 1 else latitude(y + 1),
+        -math.inf if x == 0 else longitude(x),
+        math.inf if y == 0 else latitude(y),
+        math.inf if x == size - 1 else longitude(x + 1),
+    )
+
+
+def tiles(south, west, north, east, zoom):
+    """The (x, y) tiles covering a bounding box (west > east means it crosses the antimeridian)"""
+    first, last = tile_x(west, zoom), tile_x(east, zoom)
+    if first <= last:
+        columns = list(range(first, last + 1))
+    else:
+        columns = [*range(first, 2 ** zoom), *range(0, last + 1)]
+    rows = range(tile_y(north, zoom), tile_y(south, zoom) + 1)
+    return [(x, y) for x in columns for y in rows]
+
+
+def tile_clusters(index, zoom, x, y, kinds):
+    """Geohash clusters of the points in one tile"""
+    south, west, north, east = tile_bounds(zoom, x, y)
+    precision = precision_for(zoom)
+    cells = {}
+    for kind in kinds:
+        points = index.kinds[kind]
+        for position in points.within(south, west, north, east).tolist():
+            cells.setdefault(points.geohashes[position][:precision], []).append((kind, position))
+
+    clusters = []
+    for cell, members in sorted(cells.items()):
+        latitudes = [index.kinds[kind].latitudes[position] for kind, position in members]
+        longitudes = [index.kinds[kind].longitudes[position] for kind, position in members]
+        cluster = {
+            'geohash': cell,
+            'count': len(members),
+            'kinds': dict(Counter(kind for kind, _ in members)),
+            'latitude': round(float(sum(latitudes) / len(members)), 6),
+            'longitude': round(float(sum(longitudes) / len(members)), 6),
+        }
+        if len(members) == 1:
+            kind, position = members[0]
+            cluster['point'] = index.kinds[kind].point(position)
+        clusters.append(cluster)
+    return clusters
+
+
+def clusters(south, west, north, east, zoom, kinds=None):
+    """Clusters for every tile covering the box, from the cache where possible"""
+    kinds = sorted(kinds or spatial.SOURCES)
+    covering = tiles(south, west, north, east, zoom)
+    if len(covering) > MAX_TILES:
+        raise ValueError(f'The box covers more than {MAX_TILES} tiles at zoom {zoom}')
+
+    version = spatial.version()
+    keys = {
+        TILE_KEY.format(version=version, kinds=','.join(kinds), zoom=zoom, x=x, y=y): (x, y)
+        for x, y in covering
+    }
+    cached = cache.get_many(keys)
+    missing = {}
+    if len(cached) < len(keys):
+        index = spatial.get_index()
+        for key, (x, y) in keys.items():
+            if key not in cached:
+                missing[key] = tile_clusters(index, zoom, x, y, kinds)
+        cache.set_many(missing, timeout=CACHE_TIMEOUT)
+
+    found = []
+    for key in keys:
+        found.extend(cached[key] if key in cached else missing[key])
+    return found
@@ -0,0 +1,108 @@
+"""
+Geohash encoding.
+
+A geohash interleaves longitude and latitude bisections into base-32
+characters, so points that share a prefix share a cell: each extra character
+narrows the cell about 32x. Every mapped row stores its geohash (see
+location.models.GeohashedModel), so an index on the column answers
+"everything in this cell" with a prefix range scan, and map clusters group
+points by prefix without re-encoding them.
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# ~5m cells: plenty to tell two buildings apart
+PRECISION = 9
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        coordinate, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def for_point(latitude, longitude):
+    """The stored geohash for optional coordinates ('' when either is missing)"""
+    if latitude is None or longitude is None:
+        return ''
+    return encode(latitude, longitude)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of the cells of a geohash length"""
+    bits = 5 * precision
+    return 180 / 2 ** (bits // 2), 360 / 2 ** ((bits + 1) // 2)
+
+
+def bounds(cell):
+    """(south, west, north, east) of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lng_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if value >> shift & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def neighbourhood(cell):
+    """The cell and its (up to) eight neighbours, wrapping at the antimeridian"""
+    south, west, north, east = bounds(cell)
+    height, width = north - south, east - west
+    latitude, longitude = (south + north) / 2, (west + east) / 2
+    cells = set()
+    for row in (-1, 0, 1):
+        row_latitude = latitude + row * height
+        if not -90 < row_latitude < 90:
+            continue
+        for column in (-1, 0, 1):
+            cells.add(encode(row_latitude, (longitude + column * width + 180) % 360 - 180, len(cell)))
+    return sorted(cells)
+
+
+def covering(latitude, longitude, radius_km, earth_radius_km=6371.0088):
+    """
+    Cells that together hold every point within radius_km: the neighbourhood
+    of the point's cell at the longest length whose cells are at least the
+    radius across (narrowest at the poleward edge). [''] (every cell) when
+    no length is wide enough.
+    """
+    angle = radius_km / earth_radius_km
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        # Poleward edge of the rows the neighbourhood spans
+        edge = math.radians(min(abs(latitude) + height + math.degrees(angle), 90))
+        if math.cos(edge) <= math.sin(angle / 2):
+            continue
+        max_lng = math.degrees(2 * math.asin(math.sin(angle / 2) / math.cos(edge)))
+        if height >= math.degrees(angle) and width >= max_lng:
+            return neighbourhood(encode(latitude, longitude, precision))
+    return ['']
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+from location import geohash
+
+
+def hash_locations(apps, schema_editor):
+    for name in ('IndustryZone', 'ProfessionalService'):
+        model = apps.get_model('location', name)
+        rows = list(model.objects.filter(latitude__isnull=False, longitude__isnull=False).only('latitude', 'longitude'))
+        for row in rows:
+            row.geohash = geohash.encode(row.latitude, row.longitude)
+        model.objects.bulk_update(rows, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='industryzone',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='professionalservice',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='professionalservice',
+            name='latitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='professionalservice',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+        migrations.RunPython(hash_locations, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,29 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+from . import geohash
 
-class IndustryZone(models.Model):
+
+class GeohashedModel(models.Model):
+    """
+    A mapped row whose geohash is kept in step with its latitude/longitude on
+    save(), so the spatial index and map clusters read cells without encoding.
+    """
+    # Indexed for prefix (cell) lookups, see location/spatial.py
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.geohash = geohash.for_point(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+
+class IndustryZone(GeohashedModel):
     """Engineering industry map"""
     name = models.CharField(max_length=200)
     zone_type = models.CharField(
@@ -76,7 +97,7 @@ class IndustryZone(models.Model):
         return f"{self.name} - {self.city}"
 
 
-class ProfessionalService(models.Model):
+class ProfessionalService(GeohashedModel):
     """Professional services directory"""
     name = models.CharField(max_length=200)
     service_type = models.CharField(
@@ -101,6 +122,8 @@ class ProfessionalService(models.Model):
     city = models.CharField(max_length=100)
     province = models.CharField(max_length=50)
     address = models.TextField()
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     serves_nationwide = models.BooleanField(default=False)
 
     # Contact
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from community.models import LocalHub
+from . import spatial
+from .models import IndustryZone, ProfessionalService
+
+
+@receiver([post_save, post_delete], sender=IndustryZone)
+@receiver([post_save, post_delete], sender=LocalHub)
+@receiver([post_save, post_delete], sender=ProfessionalService)
+def invalidate_spatial_index(sender, **kwargs):
+    """A mapped row changed: every process rebuilds its nearest-neighbour index on next use"""
+    spatial.invalidate()
@@ -0,0 +1,195 @@
+"""
+Nearest-neighbour search over mapped industry zones, local hubs and
+professional services.
+
+Coordinates are projected onto the unit sphere (x, y, z) and loaded into one
+k-d tree per kind, where straight-line (chord) distance orders points exactly
+like great-circle distance. A radius in km becomes a chord length, so radius
+and k-nearest queries are a tree lookup instead of a haversine over every row.
+
+The trees are built with one query per kind and kept per process. Writes to
+any of the three models bump a version key in the cache (see
+location/signals.py), and each process rebuilds lazily the next time it
+notices the version changed.
+
+Small radii don't need the whole map: the point's geohash cell and its
+neighbours hold every row in range, so those queries read just those cells
+with prefix range scans on the indexed geohash column and search a tree
+over the few rows found.
+"""
+import math
+import operator
+from functools import reduce
+
+import numpy as np
+from scipy.spatial import cKDTree
+from django.db.models import Q
+
+from community.models import LocalHub
+from core import versions
+from . import geohash
+from .models import IndustryZone, ProfessionalService
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# kind -> (model, type field)
+SOURCES = {
+    'zone': (IndustryZone, 'zone_type'),
+    'hub': (LocalHub, 'hub_type'),
+    'service': (ProfessionalService, 'service_type'),
+}
+
+MAX_RADIUS_KM = 500
+MAX_RESULTS = 100
+
+# Radii up to this are answered from the geohash cells in the database
+CELL_QUERY_MAX_KM = 5
+
+VERSION_KEY = 'location:spatial_index:version'
+
+_index = None
+_index_version = None
+
+
+def to_xyz(latitudes, longitudes):
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lng = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+
+def chord_length(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def arc_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord, 2.0) / 2)
+
+
+class KindIndex:
+    """A k-d tree over one kind's mapped rows, plus the fields the API returns"""
+
+    def __init__(self, kind, rows, labels):
+        self.kind = kind
+        columns = list(zip(*rows)) or [()] * 7
+        self.pks, self.names, self.cities, self.types = (list(column) for column in columns[:4])
+        latitudes, longitudes, geohashes = columns[4:]
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        # Rows written with update()/bulk_create() skip save() and may lack a stored geohash
+        self.geohashes = [
+            cell or geohash.encode(latitude, longitude)
+            for cell, latitude, longitude in zip(geohashes, latitudes, longitudes)
+        ]
+        self.labels = labels
+        self.tree = cKDTree(to_xyz(self.latitudes, self.longitudes)) if rows else None
+
+    def __len__(self):
+        return len(self.pks)
+
+    def point(self, position):
+        return {
+            'kind': self.kind,
+            'id': self.pks[position],
+            'name': self.names[position],
+            'city': self.cities[position],
+            'type': self.labels.get(self.types[position], self.types[position]),
+            'latitude': float(self.latitudes[position]),
+            'longitude': float(self.longitudes[position]),
+        }
+
+    def result(self, position, distance):
+        return {**self.point(position), 'distance_km': round(float(distance), 2)}
+
+    def within(self, south, west, north, east):
+        """Positions of the points inside a lat/lng box"""
+        return np.flatnonzero(
+            (self.latitudes >= south) & (self.latitudes < north)
+            & (self.longitudes >= west) & (self.longitudes < east)
+        )
+
+    def nearest(self, point, chord, limit):
+        """Up to `limit` (position, km) pairs within `chord` of the point, closest first"""
+        if self.tree is None:
+            return []
+        if limit is None:
+            positions = self.tree.query_ball_point(point, chord)
+            chords = np.linalg.norm(self.tree.data[positions] - point, axis=1) if positions else np.empty(0)
+        else:
+            chords, positions = self.tree.query(point, k=min(limit, len(self)), distance_upper_bound=chord)
+            chords, positions = np.atleast_1d(chords), np.atleast_1d(positions)
+            found = np.isfinite(chords)
+            chords, positions = chords[found], positions[found]
+        return list(zip(np.asarray(positions).tolist(), arc_km(np.asarray(chords)).tolist()))
+
+
+class SpatialIndex:
+    def __init__(self, kinds):
+        self.kinds = kinds
+
+    @classmethod
+    def build(cls, kinds=None, cells=None):
+        """Index every mapped row of the given kinds, or only those in the given geohash cells"""
+        indexes = {}
+        for kind in kinds or SOURCES:
+            model, type_field = SOURCES[kind]
+            rows = model.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            if cells is not None:
+                rows = rows.filter(in_cells(cells))
+            rows = rows.order_by('pk').values_list('pk', 'name', 'city', type_field, 'latitude', 'longitude', 'geohash')
+            labels = dict(model._meta.get_field(type_field).choices)
+            indexes[kind] = KindIndex(kind, list(rows.iterator(chunk_size=5000)), labels)
+        return cls(indexes)
+
+    def nearby(self, latitude, longitude, radius_km, limit=None, kinds=None):
+        """
+        Points of the given kinds within radius_km, closest first; with a limit,
+        the k nearest across all kinds.
+        """
+        point = to_xyz([latitude], [longitude])[0]
+        chord = chord_length(radius_km)
+        found = []
+        for kind in kinds or SOURCES:
+            index = self.kinds[kind]
+            found.extend((distance, kind, position) for position, distance in index.nearest(point, chord, limit))
+        found.sort(key=lambda item: (item[0], item[1]))
+        if limit is not None:
+            found = found[:limit]
+        return [self.kinds[kind].result(position, distance) for distance, kind, position in found]
+
+
+def in_cells(cells):
+    """Rows whose geohash starts with any of the cells: one index range scan per cell"""
+    return reduce(operator.or_, (Q(geohash__startswith=cell) for cell in cells))
+
+
+def invalidate():
+    """Mark every process's spatial index stale"""
+    versions.bump(VERSION_KEY)
+
+
+def version():
+    return versions.current(VERSION_KEY)
+
+
+def get_index():
+    """Return this process's index, rebuilding it if a mapped row changed since it was built"""
+    global _index, _index_version
+
+    current = version()
+    if _index is None or current != _index_version:
+        _index = SpatialIndex.build()
+        _index_version = current
+    return _index
+
+
+def nearby(latitude, longitude, radius_km, limit=None, kinds=None):
+    """
+    SpatialIndex.nearby for the API: small radii read the surrounding geohash
+    cells from the database, larger ones use this process's index.
+    """
+    if radius_km <= CELL_QUERY_MAX_KM:
+        index = SpatialIndex.build(kinds, cells=geohash.covering(latitude, longitude, radius_km, EARTH_RADIUS_KM))
+    else:
+        index = get_index()
+    return index.nearby(latitude, longitude, radius_km, limit=limit, kinds=kinds)
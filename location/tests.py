@@ -1,3 +1,194 @@
+import math
+import random
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from community.models import LocalHub
+from . import clusters, geohash, spatial
+from .models import IndustryZone, ProfessionalService
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * spatial.EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class SpatialIndexTest(TestCase):
+    """Test stored geohashes and nearest-neighbour search over zones, hubs and services"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='surveyor', password='testpass123')
+        self.sundar = self.zone('Sundar Industrial Estate', 'Lahore', 31.3100, 74.2100)
+        self.m3 = self.zone('M-3 Industrial City', 'Faisalabad', 31.5700, 73.2300)
+        self.korangi = self.zone('Korangi Industrial Area', 'Karachi', 24.8300, 67.1200)
+        self.hub = LocalHub.objects.create(
+            name='Arfa Tower Coworking', description='Desks', hub_type='coworking', city='Lahore', address='Ferozepur Road',
+            latitude=31.4760, longitude=74.3430, facilities='WiFi', operating_hours='9-9', pricing_info='Daily passes',
+        )
+        self.lab = self.service('Punjab Testing Lab', 'Lahore', 31.5200, 74.3500)
+        self.service('Unmapped Consultancy', 'Multan', None, None)
+
+    def zone(self, name, city, latitude, longitude):
+        return IndustryZone.objects.create(
+            name=name, zone_type='industrial_estate', city=city, province='punjab', address=city,
+            latitude=latitude, longitude=longitude, description='Estate', primary_industries='Textiles',
+            infrastructure='Roads', utilities='Gas', managing_authority='PIEDMC',
+        )
+
+    def service(self, name, city, latitude, longitude):
+        return ProfessionalService.objects.create(
+            name=name, service_type='testing_lab', description='Lab', disciplines_served='Civil',
+            services_offered='Material testing', city=city, province='Punjab', address=city,
+            latitude=latitude, longitude=longitude, phone='042-1234567', email='lab@example.com', added_by=self.user,
+        )
+
+    def test_geohash(self):
+        """Test geohashes are encoded on save, shared by nearby points and cleared without coordinates"""
+        self.assertEqual(geohash.encode(57.64911, 10.40744, precision=11), 'u4pruydqqvj')
+        self.assertEqual(len(self.sundar.geohash), geohash.PRECISION)
+        # Both Lahore points fall in the same ~40km cell
+        self.assertEqual(self.hub.geohash[:4], self.lab.geohash[:4])
+        self.assertEqual(ProfessionalService.objects.get(name='Unmapped Consultancy').geohash, '')
+
+        self.lab.latitude, self.lab.longitude = 24.86, 67.00
+        self.lab.save(update_fields=['latitude', 'longitude'])
+        self.lab.refresh_from_db()
+        self.assertEqual(self.lab.geohash, geohash.encode(24.86, 67.00))
+
+    def test_nearby(self):
+        """Test radius and k-nearest queries across kinds, closest first"""
+        index = spatial.get_index()
+        results = index.nearby(31.5204, 74.3587, radius_km=50)
+        self.assertEqual([(row['kind'], row['name']) for row in results], [
+            ('service', 'Punjab Testing Lab'),
+            ('hub', 'Arfa Tower Coworking'),
+            ('zone', 'Sundar Industrial Estate'),
+        ])
+        self.assertAlmostEqual(results[0]['distance_km'], haversine_km(31.5204, 74.3587, 31.52, 74.35), places=1)
+        self.assertEqual(results[2]['type'], 'Industrial Estate')
+
+        results = index.nearby(31.5204, 74.3587, radius_km=200, limit=1, kinds=['zone'])
+        self.assertEqual([row['name'] for row in results], ['Sundar Industrial Estate'])
+        self.assertEqual(len(index.nearby(31.5204, 74.3587, radius_km=200, kinds=['zone'])), 2)
+
+    def test_matches_brute_force(self):
+        """Test the tree finds exactly the points a haversine scan over every row finds"""
+        generator = random.Random(7)
+        for i in range(200):
+            self.zone(f'Zone {i}', 'Somewhere', round(generator.uniform(24, 36), 6), round(generator.uniform(61, 77), 6))
+        rows = IndustryZone.objects.values_list('name', 'latitude', 'longitude')
+        expected = sorted(
+            (haversine_km(30.0, 70.0, float(lat), float(lng)), name)
+            for name, lat, lng in rows if haversine_km(30.0, 70.0, float(lat), float(lng)) <= 300
+        )
+        results = spatial.get_index().nearby(30.0, 70.0, radius_km=300, kinds=['zone'])
+        self.assertEqual([row['name'] for row in results], [name for _, name in expected])
+
+    def test_geohash_cells(self):
+        """Test cell bounds, neighbourhoods and the cells covering a radius"""
+        cell = geohash.encode(31.5204, 74.3587, precision=5)
+        south, west, north, east = geohash.bounds(cell)
+        self.assertTrue(south <= 31.5204 < north and west <= 74.3587 < east)
+        self.assertEqual((north - south, east - west), geohash.cell_size(5))
+        self.assertEqual(len(geohash.neighbourhood(cell)), 9)
+        # Neighbours wrap around the antimeridian
+        self.assertIn(geohash.encode(0.01, -179.99, 3), geohash.neighbourhood(geohash.encode(0.01, 179.99, 3)))
+        self.assertEqual(geohash.covering(31.5, 74.3, 5000), [''])
+
+    def test_small_radius_reads_geohash_cells(self):
+        """Test small radii are answered by prefix scans of the surrounding cells, exactly like a full scan"""
+        generator = random.Random(11)
+        for i in range(150):
+            self.zone(f'Zone {i}', 'Lahore', round(generator.uniform(31.4, 31.6), 6), round(generator.uniform(74.2, 74.5), 6))
+        rows = IndustryZone.objects.values_list('name', 'latitude', 'longitude')
+        for latitude, longitude in [(31.5204, 74.3587), (31.45, 74.25), (31.5, 74.4)]:
+            expected = sorted(
+                (haversine_km(latitude, longitude, float(lat), float(lng)), name)
+                for name, lat, lng in rows if haversine_km(latitude, longitude, float(lat), float(lng)) <= 5
+            )
+            with self.assertNumQueries(1) as queries:
+                results = spatial.nearby(latitude, longitude, 5, kinds=['zone'])
+            self.assertIn('LIKE', queries.captured_queries[0]['sql'])
+            self.assertEqual([row['name'] for row in results], [name for _, name in expected])
+
+    def test_index_rebuilds_after_writes(self):
+        """Test the per-process index is reused until a mapped row changes"""
+        index = spatial.get_index()
+        self.assertIs(spatial.get_index(), index)
+        self.hub.delete()
+        self.assertIsNot(spatial.get_index(), index)
+        self.assertEqual(len(spatial.get_index().kinds['hub']), 0)
+
+    def test_nearby_view(self):
+        """Test the JSON endpoint validates input and answers from the in-memory index"""
+        spatial.get_index()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('location:nearby'), {'lat': 31.5204, 'lng': 74.3587, 'radius': 10, 'kind': 'hub'})
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Arfa Tower Coworking'])
+
+        self.assertEqual(self.client.get(reverse('location:nearby'), {'lat': 95, 'lng': 74}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('location:nearby'), {'lat': 31, 'lng': 74, 'radius': 5000}).status_code, 400)
+
+
+class MapClusterTest(TestCase):
+    """Test geohash marker clusters per tile, their cache and the JSON endpoint"""
+
+    PAKISTAN = (23.0, 60.0, 37.5, 78.0)
+
+    def setUp(self):
+        for name, city, latitude, longitude in [
+            ('Sundar Industrial Estate', 'Lahore', 31.3100, 74.2100),
+            ('Quaid-e-Azam Industrial Estate', 'Lahore', 31.4500, 74.3500),
+            ('M-3 Industrial City', 'Faisalabad', 31.5700, 73.2300),
+            ('Korangi Industrial Area', 'Karachi', 24.8300, 67.1200),
+        ]:
+            self.zone(name, city, latitude, longitude)
+        self.hub = LocalHub.objects.create(
+            name='Arfa Tower Coworking', description='Desks', hub_type='coworking', city='Lahore', address='Ferozepur Road',
+            latitude=31.4760, longitude=74.3430, facilities='WiFi', operating_hours='9-9', pricing_info='Daily passes',
+        )
+
+    def zone(self, name, city, latitude, longitude):
+        return IndustryZone.objects.create(
+            name=name, zone_type='industrial_estate', city=city, province='punjab', address=city,
+            latitude=latitude, longitude=longitude, description='Estate', primary_industries='Textiles',
+            infrastructure='Roads', utilities='Gas', managing_authority='PIEDMC',
+        )
+
+    def test_clusters_by_zoom(self):
+        """Test zoomed-out maps merge nearby points and zoomed-in maps return single points"""
+        zoomed_out = clusters.clusters(*self.PAKISTAN, zoom=5)
+        self.assertEqual(sum(cluster['count'] for cluster in zoomed_out), 5)
+        lahore = max(zoomed_out, key=lambda cluster: cluster['count'])
+        self.assertEqual(lahore['kinds'], {'hub': 1, 'zone': 3})
+        self.assertEqual(len(lahore['geohash']), clusters.precision_for(5))
+
+        zoomed_in = clusters.clusters(31.40, 74.30, 31.50, 74.40, zoom=14)
+        points = sorted(cluster['point']['name'] for cluster in zoomed_in)
+        self.assertEqual(points, ['Arfa Tower Coworking', 'Quaid-e-Azam Industrial Estate'])
+        self.assertEqual(clusters.clusters(*self.PAKISTAN, zoom=5, kinds=['hub'])[0]['count'], 1)
+
+    def test_tiles_cached_until_points_change(self):
+        """Test repeat requests are served from the tile cache and a write retires it"""
+        first = clusters.clusters(*self.PAKISTAN, zoom=6)
+        spatial._index = None
+        with self.assertNumQueries(0):
+            self.assertEqual(clusters.clusters(*self.PAKISTAN, zoom=6), first)
+        self.assertIsNone(spatial._index)
+
+        self.zone('Hattar Industrial Estate', 'Haripur', 33.8800, 72.8500)
+        self.assertEqual(sum(cluster['count'] for cluster in clusters.clusters(*self.PAKISTAN, zoom=6)), 6)
+
+    def test_clusters_view(self):
+        """Test the endpoint validates the viewport and refuses boxes spanning too many tiles"""
+        url = reverse('location:clusters')
+        response = self.client.get(url, {'bbox': '60,23,78,37.5', 'zoom': 5})
+        self.assertEqual(response.json()['precision'], clusters.precision_for(5))
+        self.assertEqual(sum(cluster['count'] for cluster in response.json()['clusters']), 5)
 
-# Create your tests here.
+        self.assertEqual(self.client.get(url, {'bbox': '60,23,78', 'zoom': 5}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'bbox': '60,23,78,37.5', 'zoom': 25}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'bbox': '60,23,78,37.5', 'zoom': 12}).status_code, 400)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'location'
+
+urlpatterns = [
+    path('nearby/', views.nearby, name='nearby'),
+    path('clusters/', views.map_clusters, name='clusters'),
+]
@@ -1,3 +1,55 @@
-from django.shortcuts import render
+from django.http import JsonResponse
 
-# Create your views here.
+from . import clusters, spatial
+
+
+def parse_float(value, low, high):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if low <= number <= high else None
+
+
+def nearby(request):
+    """
+    JSON list of zones, hubs and services within ?radius= km of ?lat=&lng=,
+    closest first. ?kind= (repeatable) limits the kinds, ?limit= caps results.
+    """
+    latitude = parse_float(request.GET.get('lat'), -90, 90)
+    longitude = parse_float(request.GET.get('lng'), -180, 180)
+    if latitude is None or longitude is None:
+        return JsonResponse({'error': 'lat and lng are required'}, status=400)
+
+    radius = parse_float(request.GET.get('radius', 25), 0, spatial.MAX_RADIUS_KM)
+    if radius is None:
+        return JsonResponse({'error': f'radius must be between 0 and {spatial.MAX_RADIUS_KM} km'}, status=400)
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in spatial.SOURCES]
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), spatial.MAX_RESULTS)
+    except ValueError:
+        limit = 20
+
+    results = spatial.nearby(latitude, longitude, radius, limit=limit, kinds=kinds)
+    return JsonResponse({'radius_km': radius, 'results': results})
+
+
+def map_clusters(request):
+    """
+    JSON marker clusters for a map viewport: ?bbox=west,south,east,north and
+    ?zoom=0-20, optionally limited to ?kind= (repeatable).
+    """
+    try:
+        west, south, east, north = (float(value) for value in request.GET.get('bbox', '').split(','))
+        zoom = int(request.GET.get('zoom', ''))
+    except ValueError:
+        return JsonResponse({'error': 'bbox (west,south,east,north) and zoom are required'}, status=400)
+    if not (0 <= zoom <= clusters.MAX_ZOOM and -90 <= south <= north <= 90 and -180 <= min(west, east) and max(west, east) <= 180):
+        return JsonResponse({'error': 'bbox or zoom out of range'}, status=400)
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in spatial.SOURCES]
+
+    try:
+        found = clusters.clusters(south, west, north, east, zoom, kinds=kinds)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    return JsonResponse({'zoom': zoom, 'precision': clusters.precision_for(zoom), 'clusters': found})
@@ -5,7 +5,7 @@ from .models import FreelanceProject, FreelanceProposal, ResearchCollaboration,
 @admin.register(FreelanceProject)
 class FreelanceProjectAdmin(admin.ModelAdmin):
     list_display = ['title', 'posted_by', 'category', 'status', 'budget_min', 'budget_max', 'deadline']
-    list_filter = ['status', 'category', 'remote_ok']
+    list_filter = ['status', 'category', 'remote_ok', 'is_active']
     search_fields = ['title', 'description', 'posted_by__username']
 
 
@@ -25,5 +25,5 @@ class ResearchCollaborationAdmin(admin.ModelAdmin):
 @admin.register(Conference)
 class ConferenceAdmin(admin.ModelAdmin):
     list_display = ['name', 'conference_type', 'location', 'start_date', 'paper_submission_deadline']
-    list_filter = ['conference_type', 'pakistan_friendly']
+    list_filter = ['conference_type', 'pakistan_friendly', 'is_active']
     search_fields = ['name', 'venue', 'topics']
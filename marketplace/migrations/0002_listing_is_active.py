@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conference',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Cleared by expire_listings once paper submission closes'),
+        ),
+        migrations.AddField(
+            model_name='freelanceproject',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Cleared by expire_listings once the deadline passes'),
+        ),
+        migrations.AddIndex(
+            model_name='conference',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['paper_submission_deadline'], name='conference_active_cfp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='freelanceproject',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['deadline'], name='freelance_active_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0002_listing_is_active'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='conference',
+            index=models.Index(fields=['start_date'], name='marketplace_start_d_bb51ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conference',
+            index=models.Index(fields=['notification_date'], name='marketplace_notific_ede851_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conference',
+            index=models.Index(fields=['camera_ready_deadline'], name='marketplace_camera__91f250_idx'),
+        ),
+    ]
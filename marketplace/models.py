@@ -54,6 +54,7 @@ class FreelanceProject(models.Model):
     views = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     deadline = models.DateField()
+    is_active = models.BooleanField(default=True, help_text="Cleared by expire_listings once the deadline passes")
 
     class Meta:
         db_table = 'marketplace_freelance_projects'
@@ -61,6 +62,7 @@ class FreelanceProject(models.Model):
         indexes = [
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['discipline']),
+            models.Index(fields=['deadline'], name='freelance_active_deadline_idx', condition=models.Q(is_active=True)),
         ]
 
     def __str__(self):
@@ -190,6 +192,7 @@ class Conference(models.Model):
     pakistan_friendly = models.BooleanField(default=False, help_text="Easy visa/affordable for Pakistanis")
     travel_grants_available = models.BooleanField(default=False)
 
+    is_active = models.BooleanField(default=True, help_text="Cleared by expire_listings once paper submission closes")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -198,6 +201,11 @@ class Conference(models.Model):
         indexes = [
             models.Index(fields=['discipline']),
             models.Index(fields=['paper_submission_deadline']),
+            models.Index(fields=['paper_submission_deadline'], name='conference_active_cfp_idx', condition=models.Q(is_active=True)),
+            # Calendar range scans (networking/agenda.py)
+            models.Index(fields=['start_date']),
+            models.Index(fields=['notification_date']),
+            models.Index(fields=['camera_ready_deadline']),
         ]
 
     def __str__(self):
@@ -1,16 +1,16 @@
 from django.contrib import admin
 from .models import (
-    MentorProfile, MentorshipRequest, MentorshipSession,
+    MentorProfile, MentorshipRequest, MentorSuggestion, MentorshipSession, MentorStats, MentorshipMonthlyStats,
     SkillAssessment, InterviewExperience, StudyGroup, StudyGroupMembership
 )
 
 
 @admin.register(MentorProfile)
 class MentorProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'years_of_experience', 'current_position', 'available_for_mentorship', 'created_at']
+    list_display = ['user', 'years_of_experience', 'current_position', 'active_mentees', 'max_mentees', 'available_for_mentorship', 'created_at']
     list_filter = ['available_for_mentorship', 'mentorship_type']
     search_fields = ['user__username', 'company', 'expertise_areas']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['active_mentees', 'created_at', 'updated_at']
 
 
 @admin.register(MentorshipRequest)
@@ -21,6 +21,14 @@ class MentorshipRequestAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
 
+@admin.register(MentorSuggestion)
+class MentorSuggestionAdmin(admin.ModelAdmin):
+    list_display = ['mentee', 'mentor', 'score', 'assigned', 'computed_at']
+    list_filter = ['assigned']
+    search_fields = ['mentee__username', 'mentor__user__username']
+    raw_id_fields = ['mentee', 'mentor']
+
+
 @admin.register(MentorshipSession)
 class MentorshipSessionAdmin(admin.ModelAdmin):
     list_display = ['mentorship', 'session_date', 'duration_minutes', 'mentee_rating', 'mentor_rating']
@@ -29,6 +37,20 @@ class MentorshipSessionAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+@admin.register(MentorStats)
+class MentorStatsAdmin(admin.ModelAdmin):
+    list_display = ['mentor', 'session_count', 'total_minutes', 'mentee_rating_count', 'mentor_rating_count']
+    search_fields = ['mentor__user__username']
+    raw_id_fields = ['mentor']
+
+
+@admin.register(MentorshipMonthlyStats)
+class MentorshipMonthlyStatsAdmin(admin.ModelAdmin):
+    list_display = ['month', 'mentor', 'session_count', 'total_minutes']
+    list_filter = ['month']
+    raw_id_fields = ['mentor']
+
+
 @admin.register(SkillAssessment)
 class SkillAssessmentAdmin(admin.ModelAdmin):
     list_display = ['user', 'skill_name', 'category', 'current_level', 'target_level']
@@ -0,0 +1,54 @@
+"""
+Study group membership.
+
+StudyGroup.members_count is kept by signals on StudyGroupMembership insert
+and delete (mentorship/signals.py), so listings read it instead of counting.
+Joining inserts the membership, whose signal bumps the count with an UPDATE
+that the database serialises per group row, then checks the group is still
+within max_members inside the same transaction; if a concurrent join took
+the last place the whole join rolls back. However many people race for the
+last place, the count never ends above max_members.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+
+from .models import StudyGroup, StudyGroupMembership
+
+
+class GroupFull(Exception):
+    """The study group has no free places or is no longer active"""
+
+
+def open_groups(discipline=None, meeting_format=None):
+    """Active groups with space, newest first; the filter matches the study_group_open_* partial indexes"""
+    groups = StudyGroup.objects.filter(is_active=True, members_count__lt=F('max_members'))
+    if discipline:
+        groups = groups.filter(discipline=discipline)
+    if meeting_format:
+        groups = groups.filter(meeting_format=meeting_format)
+    return groups.order_by('-created_at')
+
+
+def with_membership(groups, user):
+    """Flag each group with whether the viewer is in it, without a query per group"""
+    if user is None or not user.is_authenticated:
+        return groups
+    return groups.annotate(joined=Exists(StudyGroupMembership.objects.filter(study_group=OuterRef('pk'), user=user)))
+
+
+def join(group, user):
+    """Add the user to the group; joining twice returns the existing membership"""
+    try:
+        with transaction.atomic():
+            membership = StudyGroupMembership.objects.create(study_group=group, user=user)
+            if not StudyGroup.objects.filter(pk=group.pk, is_active=True, members_count__lte=F('max_members')).exists():
+                raise GroupFull(group.name)
+    except IntegrityError:
+        return StudyGroupMembership.objects.get(study_group=group, user=user)
+    return membership
+
+
+def leave(group, user):
+    """Remove the user from the group; returns whether they were in it"""
+    deleted, _ = StudyGroupMembership.objects.filter(study_group=group, user=user).delete()
+    return bool(deleted)
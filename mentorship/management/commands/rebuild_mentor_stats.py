@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from mentorship.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-mentor and monthly session rollups from the sessions table'
+
+    def handle(self, *args, **options):
+        mentors, months = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {mentors} mentors ({months} monthly rows)'))
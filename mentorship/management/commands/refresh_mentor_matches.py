@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mentorship.matching import refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recompute ranked mentor suggestions and the capacity-aware mentor assignment (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=10, help='Mentors to keep per mentee')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Mentees scored per matrix multiply')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stored = refresh_suggestions(k=options['top_k'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {stored} mentor suggestions in {time.monotonic() - started:.1f}s'
+        ))
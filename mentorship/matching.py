@@ -0,0 +1,180 @@
+"""
+Batch mentor <-> mentee matching.
+
+A mentee's needs are the skills they assess below their target level
+(weighted by the size of the gap) plus skills named in the goals of their
+mentorship requests. A mentor offers the skills in their expertise areas.
+Both sides are normalised through career_tools.skills and turned into sparse
+vectors over the mentors' vocabulary (mentor skills IDF-weighted, so rare
+expertise counts for more), and every mentee is scored against every mentor
+with one sparse matrix product per chunk.
+
+The top-K mentors per mentee are stored in MentorSuggestion. On top of that
+ranking, a greedy capacity-constrained assignment walks all candidate pairs
+from best to worst score and gives each mentee the best mentor who still has
+an open slot (max_mentees - active_mentees, counting slots handed out in
+this run), so popular mentors aren't recommended to everyone at once. The
+assigned pair is flagged and shown first.
+"""
+import re
+
+import numpy as np
+from scipy import sparse
+from django.db import transaction
+
+from career_tools.skills import MAX_SKILL_WORDS, SkillVocabulary, normalize_skill, parse_skills
+from .models import MentorProfile, MentorshipRequest, MentorSuggestion, SkillAssessment
+
+
+TOP_K = 10
+
+# A request goal naming a skill counts as much as the widest assessment gap
+GOAL_WEIGHT = 1.0
+
+WORD_PATTERN = re.compile(r'[a-z0-9+#./-]+')
+
+
+def load_mentors():
+    """{mentor_id: (user_id, skills, open slots)} for available mentors with recognised expertise"""
+    mentors = {}
+    rows = MentorProfile.objects.filter(available_for_mentorship=True).values_list(
+        'pk', 'user_id', 'expertise_areas', 'max_mentees', 'active_mentees',
+    )
+    for pk, user_id, expertise, max_mentees, active in rows.iterator(chunk_size=2000):
+        skills = parse_skills(expertise)
+        if skills:
+            mentors[pk] = (user_id, skills, max(max_mentees - active, 0))
+    return mentors
+
+
+def goal_skills(text, vocabulary):
+    """Known skills mentioned anywhere in free text, matched on runs of up to MAX_SKILL_WORDS words"""
+    words = WORD_PATTERN.findall((text or '').lower())
+    found = set()
+    for size in range(1, MAX_SKILL_WORDS + 1):
+        for start in range(len(words) - size + 1):
+            skill = normalize_skill(' '.join(words[start:start + size]))
+            if skill in vocabulary:
+                found.add(skill)
+    return found
+
+
+def load_needs(vocabulary):
+    """{user_id: {skill: weight}} from assessment gaps and request goals"""
+    needs = {}
+    gaps = SkillAssessment.objects.values_list('user_id', 'skill_name', 'current_level', 'target_level')
+    for user_id, name, current, target in gaps.iterator(chunk_size=2000):
+        skill = normalize_skill(name)
+        if target > current and skill in vocabulary:
+            weights = needs.setdefault(user_id, {})
+            # Levels run 1-5, so a gap of 4 weighs 1.0
+            weights[skill] = max(weights.get(skill, 0), (target - current) / 4)
+
+    for user_id, goals in MentorshipRequest.objects.values_list('mentee_id', 'goals').iterator(chunk_size=2000):
+        for skill in goal_skills(goals, vocabulary):
+            weights = needs.setdefault(user_id, {})
+            weights[skill] = max(weights.get(skill, 0), GOAL_WEIGHT)
+    return needs
+
+
+def load_requested():
+    """{mentee_id: mentor ids they have already asked}"""
+    requested = {}
+    for mentee_id, mentor_id in MentorshipRequest.objects.values_list('mentee_id', 'mentor_id').iterator(chunk_size=5000):
+        requested.setdefault(mentee_id, set()).add(mentor_id)
+    return requested
+
+
+def build_matrix(rows, vocabulary, column_weights=None):
+    """L2-normalised CSR matrix from [{skill: weight}] (one row per document)"""
+    indptr = [0]
+    indices = []
+    data = []
+    for weights in rows:
+        for skill, weight in weights.items():
+            column = vocabulary.ids[skill]
+            indices.append(column)
+            data.append(weight * (column_weights[column] if column_weights is not None else 1))
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+        shape=(len(rows), len(vocabulary)),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
+
+
+def assign(candidates, slots):
+    """
+    Greedy capacity-constrained assignment over (score, mentee_id, mentor_id)
+    candidates; returns {mentee_id: mentor_id}.
+    """
+    slots = dict(slots)
+    assigned = {}
+    for score, mentee_id, mentor_id in sorted(candidates, key=lambda candidate: -candidate[0]):
+        if mentee_id not in assigned and slots.get(mentor_id, 0) > 0:
+            assigned[mentee_id] = mentor_id
+            slots[mentor_id] -= 1
+    return assigned
+
+
+def compute_suggestions(k=TOP_K, chunk_size=1000):
+    """MentorSuggestion rows (unsaved) for every mentee with a need some mentor covers"""
+    mentors = load_mentors()
+    if not mentors:
+        return []
+    mentor_ids = list(mentors)
+    vocabulary = SkillVocabulary(skills for _, skills, _ in mentors.values())
+    needs = load_needs(vocabulary)
+    if not needs:
+        return []
+
+    document_frequency = np.zeros(len(vocabulary), dtype=np.float64)
+    for _, skills, _ in mentors.values():
+        document_frequency[vocabulary.columns(skills)] += 1
+    idf = np.log((1 + len(mentors)) / (1 + document_frequency)) + 1
+
+    mentor_matrix_t = build_matrix(
+        [dict.fromkeys(mentors[pk][1], 1.0) for pk in mentor_ids], vocabulary, idf,
+    ).T.tocsr()
+    mentee_ids = list(needs)
+    mentee_matrix = build_matrix([needs[user_id] for user_id in mentee_ids], vocabulary)
+    mentor_users = np.array([mentors[pk][0] for pk in mentor_ids])
+    mentor_columns = {pk: column for column, pk in enumerate(mentor_ids)}
+    requested = load_requested()
+
+    candidates = []
+    for start in range(0, len(mentee_ids), chunk_size):
+        chunk = (mentee_matrix[start:start + chunk_size] @ mentor_matrix_t).toarray()
+        for offset, scores in enumerate(chunk):
+            mentee_id = mentee_ids[start + offset]
+            # Nobody mentors themselves or is suggested someone they already asked
+            scores[mentor_users == mentee_id] = 0
+            scores[[mentor_columns[pk] for pk in requested.get(mentee_id, ()) if pk in mentor_columns]] = 0
+            keep = min(k, len(scores))
+            best = np.argpartition(-scores, keep - 1)[:keep]
+            best = best[scores[best] > 0]
+            for column in best[np.argsort(-scores[best], kind='stable')]:
+                candidates.append((float(scores[column]), mentee_id, mentor_ids[column]))
+
+    assigned = assign(candidates, {pk: slots for pk, (_, _, slots) in mentors.items()})
+    return [
+        MentorSuggestion(
+            mentee_id=mentee_id,
+            mentor_id=mentor_id,
+            score=round(score, 4),
+            matched_skills=sorted(needs[mentee_id].keys() & mentors[mentor_id][1], key=lambda skill: (-needs[mentee_id][skill], skill)),
+            assigned=assigned.get(mentee_id) == mentor_id,
+        )
+        for score, mentee_id, mentor_id in candidates
+    ]
+
+
+def refresh_suggestions(k=TOP_K, chunk_size=1000, batch_size=2000):
+    """Recompute and atomically replace the stored suggestions"""
+    suggestions = compute_suggestions(k=k, chunk_size=chunk_size)
+    with transaction.atomic():
+        MentorSuggestion.objects.all().delete()
+        MentorSuggestion.objects.bulk_create(suggestions, batch_size=batch_size)
+    return len(suggestions)
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_active_mentees(apps, schema_editor):
+    MentorProfile = apps.get_model('mentorship', 'MentorProfile')
+    MentorshipRequest = apps.get_model('mentorship', 'MentorshipRequest')
+    accepted = (
+        MentorshipRequest.objects.filter(mentor=OuterRef('pk'), status='accepted')
+        .values('mentor')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    MentorProfile.objects.update(active_mentees=Coalesce(Subquery(accepted, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentorship', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mentorprofile',
+            name='active_mentees',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='MentorSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('matched_skills', models.JSONField(default=list)),
+                ('assigned', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('mentee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentor_suggestions', to=settings.AUTH_USER_MODEL)),
+                ('mentor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggested_to', to='mentorship.mentorprofile')),
+            ],
+            options={
+                'db_table': 'mentorship_mentor_suggestions',
+                'indexes': [models.Index(fields=['mentee', '-assigned', '-score'], name='mentorship__mentee__f74d9f_idx')],
+                'unique_together': {('mentee', 'mentor')},
+            },
+        ),
+        migrations.RunPython(count_active_mentees, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_members(apps, schema_editor):
+    StudyGroup = apps.get_model('mentorship', 'StudyGroup')
+    StudyGroupMembership = apps.get_model('mentorship', 'StudyGroupMembership')
+    members = (
+        StudyGroupMembership.objects.filter(study_group=OuterRef('pk'))
+        .values('study_group')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    StudyGroup.objects.update(members_count=Coalesce(Subquery(members, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentorship', '0002_mentor_matching'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studygroup',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='studygroup',
+            index=models.Index(condition=models.Q(('is_active', True), ('members_count__lt', models.F('max_members'))), fields=['discipline', 'meeting_format', '-created_at'], name='study_group_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studygroup',
+            index=models.Index(condition=models.Q(('is_active', True), ('members_count__lt', models.F('max_members'))), fields=['-created_at'], name='study_group_open_recent_idx'),
+        ),
+        migrations.RunPython(count_members, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def sum_sessions(apps, schema_editor):
+    MentorshipSession = apps.get_model('mentorship', 'MentorshipSession')
+    MentorStats = apps.get_model('mentorship', 'MentorStats')
+    MentorshipMonthlyStats = apps.get_model('mentorship', 'MentorshipMonthlyStats')
+    totals = {
+        'session_count': Count('id'),
+        'total_minutes': Sum('duration_minutes'),
+        'mentee_rating_sum': Sum('mentee_rating', default=0),
+        'mentee_rating_count': Count('id', filter=Q(mentee_rating__isnull=False)),
+        'mentor_rating_sum': Sum('mentor_rating', default=0),
+        'mentor_rating_count': Count('id', filter=Q(mentor_rating__isnull=False)),
+    }
+    MentorStats.objects.bulk_create([
+        MentorStats(mentor_id=row.pop('mentorship__mentor'), **row)
+        for row in MentorshipSession.objects.values('mentorship__mentor').annotate(**totals).order_by()
+    ])
+    monthly = (
+        MentorshipSession.objects
+        .annotate(month=TruncMonth('session_date', output_field=DateField(), tzinfo=timezone.get_current_timezone()))
+        .values('month', 'mentorship__mentor')
+        .annotate(**totals)
+        .order_by()
+    )
+    MentorshipMonthlyStats.objects.bulk_create([
+        MentorshipMonthlyStats(month=row.pop('month'), mentor_id=row.pop('mentorship__mentor'), **row)
+        for row in monthly
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mentorship', '0003_study_group_members_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MentorStats',
+            fields=[
+                ('mentor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='mentorship.mentorprofile')),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('total_minutes', models.PositiveIntegerField(default=0)),
+                ('mentee_rating_sum', models.PositiveIntegerField(default=0)),
+                ('mentee_rating_count', models.PositiveIntegerField(default=0)),
+                ('mentor_rating_sum', models.PositiveIntegerField(default=0)),
+                ('mentor_rating_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Mentor stats',
+                'db_table': 'mentorship_mentor_stats',
+                'indexes': [models.Index(fields=['-total_minutes'], name='mentorship__total_m_69b22d_idx'), models.Index(fields=['-session_count'], name='mentorship__session_af01fd_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MentorshipMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('session_count', models.IntegerField(default=0)),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('mentee_rating_sum', models.IntegerField(default=0)),
+                ('mentee_rating_count', models.IntegerField(default=0)),
+                ('mentor_rating_sum', models.IntegerField(default=0)),
+                ('mentor_rating_count', models.IntegerField(default=0)),
+                ('mentor', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='monthly_stats', to='mentorship.mentorprofile')),
+            ],
+            options={
+                'verbose_name_plural': 'Mentorship monthly stats',
+                'db_table': 'mentorship_monthly_stats',
+                'ordering': ['month'],
+                'unique_together': {('month', 'mentor')},
+            },
+        ),
+        migrations.RunPython(sum_sessions, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
-from core.models import UserProfile
+from core.models import CounterFieldsMixin, LoadedValuesMixin, UserProfile
 
 
-class MentorProfile(models.Model):
+class MentorProfile(CounterFieldsMixin, models.Model):
     """Extended profile for mentors"""
+    counter_fields = ('active_mentees',)
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='mentor_profile')
     bio = models.TextField(help_text="Tell potential mentees about your background and what you can help with")
     years_of_experience = models.PositiveIntegerField()
@@ -12,6 +14,8 @@ class MentorProfile(models.Model):
     company = models.CharField(max_length=200)
     expertise_areas = models.TextField(help_text="Comma-separated list of expertise areas")
     max_mentees = models.PositiveIntegerField(default=3, help_text="Maximum number of mentees at once")
+    # Accepted requests, maintained by mentorship/signals.py
+    active_mentees = models.PositiveIntegerField(default=0)
     available_for_mentorship = models.BooleanField(default=True)
     mentorship_type = models.CharField(
         max_length=20,
@@ -37,11 +41,17 @@ class MentorProfile(models.Model):
         return f"Mentor: {self.user.get_full_name() or self.user.username}"
 
     def current_mentees_count(self):
-        return self.mentorship_requests.filter(status='accepted').count()
+        return self.active_mentees
+
+    def open_slots(self):
+        return max(self.max_mentees - self.active_mentees, 0)
 
 
-class MentorshipRequest(models.Model):
+class MentorshipRequest(LoadedValuesMixin, models.Model):
     """Mentorship connection requests"""
+    # The stored mentor and status, so an edit can move MentorProfile.active_mentees
+    loaded_values = {'_loaded_status': 'status', '_loaded_mentor_id': 'mentor_id'}
+
     mentee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentorship_requests_sent')
     mentor = models.ForeignKey(MentorProfile, on_delete=models.CASCADE, related_name='mentorship_requests')
     message = models.TextField(help_text="Tell the mentor why you want their guidance")
@@ -72,8 +82,34 @@ class MentorshipRequest(models.Model):
         return f"{self.mentee.username} -> {self.mentor.user.username} ({self.status})"
 
 
-class MentorshipSession(models.Model):
+class MentorSuggestion(models.Model):
+    """Precomputed mentor ranking for a mentee (see mentorship/matching.py)"""
+    mentee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentor_suggestions')
+    mentor = models.ForeignKey(MentorProfile, on_delete=models.CASCADE, related_name='suggested_to')
+    score = models.FloatField()
+    matched_skills = models.JSONField(default=list)
+    # The mentor the capacity-constrained batch assignment picked for this mentee
+    assigned = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'mentorship_mentor_suggestions'
+        unique_together = ['mentee', 'mentor']
+        indexes = [
+            models.Index(fields=['mentee', '-assigned', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.mentee.username} -> {self.mentor.user.username} ({self.score:.2f})"
+
+
+class MentorshipSession(LoadedValuesMixin, models.Model):
     """Track individual mentorship sessions"""
+    # The stored values, so an edit can move them between rollups
+    loaded_values = {
+        '_loaded_stats': ['mentorship_id', 'session_date', 'duration_minutes', 'mentee_rating', 'mentor_rating'],
+    }
+
     mentorship = models.ForeignKey(MentorshipRequest, on_delete=models.CASCADE, related_name='sessions')
     session_date = models.DateTimeField()
     duration_minutes = models.PositiveIntegerField(default=60)
@@ -105,6 +141,60 @@ class MentorshipSession(models.Model):
         return f"Session: {self.mentorship} on {self.session_date.date()}"
 
 
+class MentorStats(models.Model):
+    """A mentor's running session totals, kept current by signals (see mentorship/stats.py)"""
+    mentor = models.OneToOneField(MentorProfile, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    session_count = models.PositiveIntegerField(default=0)
+    total_minutes = models.PositiveIntegerField(default=0)
+    mentee_rating_sum = models.PositiveIntegerField(default=0)
+    mentee_rating_count = models.PositiveIntegerField(default=0)
+    mentor_rating_sum = models.PositiveIntegerField(default=0)
+    mentor_rating_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'mentorship_mentor_stats'
+        verbose_name_plural = 'Mentor stats'
+        indexes = [
+            models.Index(fields=['-total_minutes']),
+            models.Index(fields=['-session_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.mentor_id}: {self.session_count} sessions"
+
+    def total_hours(self):
+        return self.total_minutes / 60
+
+    def mean_mentee_rating(self):
+        """How mentees rated this mentor's sessions, or None before any rating"""
+        return self.mentee_rating_sum / self.mentee_rating_count if self.mentee_rating_count else None
+
+    def mean_mentor_rating(self):
+        return self.mentor_rating_sum / self.mentor_rating_count if self.mentor_rating_count else None
+
+
+class MentorshipMonthlyStats(models.Model):
+    """Session totals per mentor per calendar month, for platform reporting"""
+    month = models.DateField(help_text="First day of the month")
+    # Kept when a mentor leaves so platform history doesn't change
+    mentor = models.ForeignKey(MentorProfile, on_delete=models.SET_NULL, null=True, related_name='monthly_stats')
+    session_count = models.IntegerField(default=0)
+    total_minutes = models.IntegerField(default=0)
+    mentee_rating_sum = models.IntegerField(default=0)
+    mentee_rating_count = models.IntegerField(default=0)
+    mentor_rating_sum = models.IntegerField(default=0)
+    mentor_rating_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'mentorship_monthly_stats'
+        verbose_name_plural = 'Mentorship monthly stats'
+        unique_together = ['month', 'mentor']
+        ordering = ['month']
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.mentor_id}: {self.session_count} sessions"
+
+
 class SkillAssessment(models.Model):
     """Skill self-assessment tool"""
     SKILL_CATEGORIES = [
@@ -210,8 +300,10 @@ class InterviewExperience(models.Model):
         return f"{self.company} - {self.position} ({self.author.username})"
 
 
-class StudyGroup(models.Model):
+class StudyGroup(CounterFieldsMixin, models.Model):
     """Peer learning study groups"""
+    counter_fields = ('members_count',)
+
     name = models.CharField(max_length=200)
     description = models.TextField()
     subject = models.CharField(max_length=100)
@@ -233,6 +325,9 @@ class StudyGroup(models.Model):
     creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='study_groups_created')
     members = models.ManyToManyField(User, related_name='study_groups', through='StudyGroupMembership')
     max_members = models.PositiveIntegerField(default=10)
+    # Maintained by mentorship/signals.py; joins go through mentorship/groups.py
+    # so it never exceeds max_members
+    members_count = models.PositiveIntegerField(default=0)
     meeting_frequency = models.CharField(
         max_length=20,
         choices=[
@@ -261,16 +356,28 @@ class StudyGroup(models.Model):
         indexes = [
             models.Index(fields=['discipline', 'is_active']),
             models.Index(fields=['-created_at']),
+            # Directory of groups that can still be joined
+            models.Index(
+                fields=['discipline', 'meeting_format', '-created_at'], name='study_group_open_idx',
+                condition=models.Q(is_active=True, members_count__lt=models.F('max_members')),
+            ),
+            models.Index(
+                fields=['-created_at'], name='study_group_open_recent_idx',
+                condition=models.Q(is_active=True, members_count__lt=models.F('max_members')),
+            ),
         ]
 
     def __str__(self):
         return self.name
 
     def current_members_count(self):
-        return self.members.count()
+        return self.members_count
+
+    def spots_left(self):
+        return max(self.max_members - self.members_count, 0)
 
     def is_full(self):
-        return self.current_members_count() >= self.max_members
+        return self.members_count >= self.max_members
 
 
 class StudyGroupMembership(models.Model):
@@ -0,0 +1,55 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import stats
+from .models import MentorProfile, MentorshipRequest, MentorshipSession, StudyGroup, StudyGroupMembership
+
+
+def adjust_active(mentor_id, delta):
+    MentorProfile.objects.filter(pk=mentor_id).update(active_mentees=F('active_mentees') + delta)
+
+
+@receiver(post_save, sender=MentorshipRequest)
+def count_active_mentees(sender, instance, created, **kwargs):
+    """Keep MentorProfile.active_mentees equal to the mentor's accepted requests"""
+    was_active = not created and getattr(instance, '_loaded_status', None) == 'accepted'
+    previous_mentor = getattr(instance, '_loaded_mentor_id', None) if was_active else None
+    is_active = instance.status == 'accepted'
+    if was_active and (not is_active or previous_mentor != instance.mentor_id):
+        adjust_active(previous_mentor, -1)
+    if is_active and (not was_active or previous_mentor != instance.mentor_id):
+        adjust_active(instance.mentor_id, 1)
+    instance._loaded_status = instance.status
+    instance._loaded_mentor_id = instance.mentor_id
+
+
+@receiver(post_delete, sender=MentorshipRequest)
+def uncount_active_mentee(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_status', instance.status) == 'accepted':
+        adjust_active(getattr(instance, '_loaded_mentor_id', instance.mentor_id), -1)
+
+
+@receiver(post_save, sender=StudyGroupMembership)
+def count_member(sender, instance, created, **kwargs):
+    if created:
+        StudyGroup.objects.filter(pk=instance.study_group_id).update(members_count=F('members_count') + 1)
+
+
+@receiver(post_delete, sender=StudyGroupMembership)
+def uncount_member(sender, instance, **kwargs):
+    StudyGroup.objects.filter(pk=instance.study_group_id).update(members_count=F('members_count') - 1)
+
+
+@receiver(post_save, sender=MentorshipSession)
+def count_session(sender, instance, created, **kwargs):
+    """Move the session's contribution between mentor rollups (see mentorship/stats.py)"""
+    old = None if created else getattr(instance, '_loaded_stats', None)
+    new = stats.contribution(instance)
+    stats.move(old, new)
+    instance._loaded_stats = new
+
+
+@receiver(post_delete, sender=MentorshipSession)
+def uncount_session(sender, instance, **kwargs):
+    stats.move(getattr(instance, '_loaded_stats', None) or stats.contribution(instance), None)
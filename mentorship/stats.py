@@ -0,0 +1,165 @@
+"""
+Mentorship session analytics.
+
+Every session adds to two rollups: its mentor's all-time MentorStats row and
+the MentorshipMonthlyStats row for (month, mentor). mentorship/signals.py
+moves a session's contribution on create, edit and delete with F()
+increments, so mentor rankings, profiles and platform reports read a handful
+of rows instead of aggregating sessions. `manage.py rebuild_mentor_stats`
+recomputes both tables from the sessions if they ever drift.
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import NullIf, TruncMonth
+from django.utils import timezone
+
+from .models import MentorshipMonthlyStats, MentorshipRequest, MentorshipSession, MentorStats
+
+
+COUNTERS = [
+    'session_count', 'total_minutes',
+    'mentee_rating_sum', 'mentee_rating_count',
+    'mentor_rating_sum', 'mentor_rating_count',
+]
+
+CONTRIBUTION_FIELDS = ['mentorship_id', 'session_date', 'duration_minutes', 'mentee_rating', 'mentor_rating']
+
+# Mentors need this many mentee ratings before they're ranked by rating
+MIN_RATINGS = 3
+
+SORTS = {
+    'hours': [F('stats__total_minutes').desc(nulls_last=True)],
+    'sessions': [F('stats__session_count').desc(nulls_last=True)],
+    'rating': [F('mean_rating').desc(nulls_last=True), F('stats__mentee_rating_count').desc(nulls_last=True)],
+}
+
+
+def contribution(session):
+    return {name: getattr(session, name) for name in CONTRIBUTION_FIELDS}
+
+
+def month_of(moment):
+    return timezone.localdate(moment).replace(day=1)
+
+
+def counts(values, sign):
+    return Counter({
+        'session_count': sign,
+        'total_minutes': sign * values['duration_minutes'],
+        'mentee_rating_sum': sign * (values['mentee_rating'] or 0),
+        'mentee_rating_count': sign * (values['mentee_rating'] is not None),
+        'mentor_rating_sum': sign * (values['mentor_rating'] or 0),
+        'mentor_rating_count': sign * (values['mentor_rating'] is not None),
+    })
+
+
+def increments(delta):
+    return {name: F(name) + value for name, value in delta.items() if value}
+
+
+def move(old, new):
+    """Take one session's old contribution out of the rollups and add the new one"""
+    if old == new:
+        return
+    mentorships = {values['mentorship_id'] for values in (old, new) if values}
+    mentors = dict(MentorshipRequest.objects.filter(pk__in=mentorships).values_list('pk', 'mentor_id'))
+
+    deltas = defaultdict(Counter)
+    for values, sign in ((old, -1), (new, 1)):
+        if values and values['mentorship_id'] in mentors:
+            deltas[mentors[values['mentorship_id']], month_of(values['session_date'])].update(counts(values, sign))
+
+    with transaction.atomic():
+        if new and new['mentorship_id'] in mentors:
+            # Rows are only created for an added session; a removal from a row
+            # that's gone means the mentor is being deleted
+            mentor_id = mentors[new['mentorship_id']]
+            MentorStats.objects.bulk_create([MentorStats(mentor_id=mentor_id)], ignore_conflicts=True)
+            MentorshipMonthlyStats.objects.bulk_create(
+                [MentorshipMonthlyStats(mentor_id=mentor_id, month=month_of(new['session_date']))], ignore_conflicts=True,
+            )
+
+        mentor_deltas = defaultdict(Counter)
+        for (mentor_id, month), delta in deltas.items():
+            mentor_deltas[mentor_id].update(delta)
+            changes = increments(delta)
+            if changes:
+                MentorshipMonthlyStats.objects.filter(mentor_id=mentor_id, month=month).update(**changes)
+        for mentor_id, delta in mentor_deltas.items():
+            changes = increments(delta)
+            if changes:
+                MentorStats.objects.filter(pk=mentor_id).update(**changes)
+
+
+def totals():
+    """Aggregates that rebuild the counters from sessions"""
+    return {
+        'session_count': Count('id'),
+        'total_minutes': Sum('duration_minutes'),
+        'mentee_rating_sum': Sum('mentee_rating', default=0),
+        'mentee_rating_count': Count('id', filter=Q(mentee_rating__isnull=False)),
+        'mentor_rating_sum': Sum('mentor_rating', default=0),
+        'mentor_rating_count': Count('id', filter=Q(mentor_rating__isnull=False)),
+    }
+
+
+def rebuild():
+    """Recompute both rollup tables from the sessions; returns (mentors, monthly rows) written"""
+    sessions = MentorshipSession.objects.values('mentorship__mentor')
+    mentor_rows = [
+        MentorStats(mentor_id=row.pop('mentorship__mentor'), **row)
+        for row in sessions.annotate(**totals()).order_by()
+    ]
+    monthly = (
+        MentorshipSession.objects
+        .annotate(month=TruncMonth('session_date', output_field=DateField(), tzinfo=timezone.get_current_timezone()))
+        .values('month', 'mentorship__mentor')
+        .annotate(**totals())
+        .order_by()
+    )
+    monthly_rows = [
+        MentorshipMonthlyStats(month=row.pop('month'), mentor_id=row.pop('mentorship__mentor'), **row)
+        for row in monthly
+    ]
+    with transaction.atomic():
+        MentorStats.objects.all().delete()
+        MentorStats.objects.bulk_create(mentor_rows)
+        # Rows of deleted mentors (mentor=NULL) are history with no sessions left to rebuild them from
+        MentorshipMonthlyStats.objects.filter(mentor__isnull=False).delete()
+        MentorshipMonthlyStats.objects.bulk_create(monthly_rows)
+    return len(mentor_rows), len(monthly_rows)
+
+
+def rank(mentors, sort):
+    """Order a MentorProfile queryset by one of SORTS using the stored rollups"""
+    if sort == 'rating':
+        # NullIf keeps unrated mentors from dividing by zero (an error on Postgres)
+        mentors = mentors.filter(stats__mentee_rating_count__gte=MIN_RATINGS).annotate(
+            mean_rating=1.0 * F('stats__mentee_rating_sum') / NullIf(F('stats__mentee_rating_count'), 0),
+        )
+    return mentors.order_by(*SORTS[sort], '-created_at')
+
+
+def platform_report(start=None, end=None):
+    """[{month, sessions, hours, mentors, mean ratings}] across all mentors, oldest first"""
+    rows = MentorshipMonthlyStats.objects.all()
+    if start:
+        rows = rows.filter(month__gte=start)
+    if end:
+        rows = rows.filter(month__lte=end)
+    report = []
+    for row in rows.values('month').annotate(
+        active_mentors=Count('mentor', filter=Q(session_count__gt=0)),
+        **{name: Sum(name) for name in COUNTERS},
+    ).order_by('month'):
+        report.append({
+            'month': row['month'],
+            'sessions': row['session_count'],
+            'hours': row['total_minutes'] / 60,
+            'active_mentors': row['active_mentors'],
+            'mean_mentee_rating': row['mentee_rating_sum'] / row['mentee_rating_count'] if row['mentee_rating_count'] else None,
+            'mean_mentor_rating': row['mentor_rating_sum'] / row['mentor_rating_count'] if row['mentor_rating_count'] else None,
+        })
+    return report
@@ -1,3 +1,307 @@
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from core.models import UserProfile
+from .models import (
+    MentorProfile, MentorshipMonthlyStats, MentorshipRequest, MentorshipSession, MentorStats, MentorSuggestion,
+    SkillAssessment, StudyGroup, StudyGroupMembership,
+)
+from . import groups, matching, stats
+
+
+class MentorMatchingTest(TestCase):
+    """Test mentor scoring, capacity-aware assignment and the stored mentee counter"""
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(username=name, password='testpass123')
+            for name in ['asad', 'bushra', 'kamran', 'nida', 'omer']
+        }
+        self.plc = self.mentor('asad', 'PLC Programming, SCADA, Power Systems', max_mentees=1)
+        self.software = self.mentor('bushra', 'Python, Django, PostgreSQL', max_mentees=2)
+        for name, skill, current, target in [
+            ('kamran', 'PLC', 1, 5),
+            ('kamran', 'SCADA', 2, 4),
+            ('nida', 'plc programming', 2, 4),
+            ('nida', 'Python', 3, 4),
+            ('omer', 'Django', 4, 4),
+        ]:
+            SkillAssessment.objects.create(
+                user=self.users[name], skill_name=skill, category='technical', current_level=current, target_level=target,
+            )
+
+    def mentor(self, name, expertise, max_mentees=3):
+        return MentorProfile.objects.create(
+            user=self.users[name], bio='Engineer', years_of_experience=10, current_position='Lead Engineer',
+            company='Siemens', expertise_areas=expertise, max_mentees=max_mentees,
+        )
+
+    def suggested(self, name):
+        return list(
+            MentorSuggestion.objects.filter(mentee=self.users[name])
+            .order_by('-assigned', '-score')
+            .values_list('mentor__user__username', 'assigned')
+        )
+
+    def test_capacity_limits_assignment(self):
+        """Test the best pair wins a one-slot mentor and the other mentee is assigned elsewhere"""
+        output = StringIO()
+        call_command('refresh_mentor_matches', stdout=output)
+        self.assertIn('Stored 3 mentor suggestions', output.getvalue())
+
+        self.assertEqual(self.suggested('kamran'), [('asad', True)])
+        # Asad is Nida's closest mentor too, but his only slot went to Kamran's closer match
+        self.assertEqual(self.suggested('nida'), [('bushra', True), ('asad', False)])
+        # No gap, no request: nothing to match
+        self.assertEqual(self.suggested('omer'), [])
+        kamran = MentorSuggestion.objects.get(mentee=self.users['kamran'])
+        self.assertEqual(kamran.matched_skills, ['plc', 'scada'])
+
+    def test_goals_and_existing_requests(self):
+        """Test request goals count as needs and already-asked mentors aren't suggested"""
+        MentorshipRequest.objects.create(
+            mentee=self.users['omer'], mentor=self.software, message='Hi',
+            goals='Get better at PLC programming and SCADA for my final year project.',
+        )
+        matching.refresh_suggestions()
+        self.assertEqual(self.suggested('omer'), [('asad', True)])
+        self.assertEqual(
+            MentorSuggestion.objects.get(mentee=self.users['omer']).matched_skills, ['plc', 'scada'],
+        )
+
+    def test_active_mentees_counter(self):
+        """Test accepting, moving, ending and deleting requests keep active_mentees exact"""
+        request = MentorshipRequest.objects.create(mentee=self.users['kamran'], mentor=self.plc, message='Hi', goals='PLC')
+        self.plc.refresh_from_db()
+        self.assertEqual(self.plc.current_mentees_count(), 0)
+
+        request = MentorshipRequest.objects.get(pk=request.pk)
+        request.status = 'accepted'
+        request.save()
+        self.plc.refresh_from_db()
+        self.assertEqual((self.plc.active_mentees, self.plc.open_slots()), (1, 0))
+
+        request.mentor = self.software
+        request.save()
+        self.plc.refresh_from_db()
+        self.software.refresh_from_db()
+        self.assertEqual((self.plc.active_mentees, self.software.active_mentees), (0, 1))
+
+        request.status = 'completed'
+        request.save()
+        self.software.refresh_from_db()
+        self.assertEqual(self.software.active_mentees, 0)
+
+        MentorshipRequest.objects.create(
+            mentee=self.users['nida'], mentor=self.software, message='Hi', goals='Django', status='accepted',
+        ).delete()
+        self.software.refresh_from_db()
+        self.assertEqual(self.software.active_mentees, 0)
+
+    def test_views(self):
+        """Test the mentor list never counts per mentor and suggestions read the stored table"""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('mentorship:mentors'))
+        self.assertContains(response, '1 of 1 slots open')
+
+        matching.refresh_suggestions()
+        self.client.login(username='nida', password='testpass123')
+        response = self.client.get(reverse('mentorship:mentor_suggestions'))
+        self.assertContains(response, 'Best match')
+        self.assertEqual([suggestion.mentor for suggestion in response.context['suggestions']], [self.software, self.plc])
+
+
+class StudyGroupTest(TestCase):
+    """Test stored member counts, capacity-respecting joins and the directory"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'student{i}', password='testpass123') for i in range(4)]
+        self.group = self.study_group('Signals & Systems', 'electrical', 'online', max_members=2)
+
+    def study_group(self, name, discipline, meeting_format, max_members=10):
+        return StudyGroup.objects.create(
+            name=name, description='Weekly problem sets', subject=name, discipline=discipline,
+            creator=self.users[0], max_members=max_members, meeting_frequency='weekly', meeting_format=meeting_format,
+        )
+
+    def members(self):
+        self.group.refresh_from_db()
+        return self.group.members_count
+
+    def test_join_respects_capacity(self):
+        """Test joins stop at max_members, rejoining is a no-op and leaving frees a place"""
+        groups.join(self.group, self.users[1])
+        groups.join(self.group, self.users[2])
+        groups.join(self.group, self.users[2])
+        self.assertEqual(self.members(), 2)
+        self.assertTrue(self.group.is_full())
+
+        with self.assertRaises(groups.GroupFull):
+            groups.join(self.group, self.users[3])
+        self.assertEqual(self.members(), 2)
+        self.assertFalse(StudyGroupMembership.objects.filter(study_group=self.group, user=self.users[3]).exists())
+
+        self.assertTrue(groups.leave(self.group, self.users[1]))
+        self.assertFalse(groups.leave(self.group, self.users[1]))
+        groups.join(self.group, self.users[3])
+        self.assertEqual(self.members(), 2)
+
+    def test_stale_save_keeps_count(self):
+        """Test saving an instance loaded before a join doesn't reset the count"""
+        stale = StudyGroup.objects.get(pk=self.group.pk)
+        groups.join(self.group, self.users[1])
+        stale.description = 'Past papers'
+        stale.save()
+        self.assertEqual(self.members(), 1)
+
+    def test_open_groups(self):
+        """Test full and inactive groups drop out of the open-group query"""
+        civil = self.study_group('Surveying', 'civil', 'in_person')
+        closed = self.study_group('Closed', 'electrical', 'online')
+        closed.is_active = False
+        closed.save()
+        for user in self.users[1:3]:
+            groups.join(self.group, user)
+        self.assertEqual(list(groups.open_groups()), [civil])
+        self.assertEqual(list(groups.open_groups('electrical', 'online')), [])
+
+    def test_directory_view(self):
+        """Test the directory takes the same number of queries however many groups it shows"""
+        for i in range(15):
+            self.study_group(f'Group {i}', 'electrical', 'online')
+        groups.join(self.group, self.users[1])
+        self.client.login(username='student1', password='testpass123')
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('mentorship:study_groups'), {'discipline': 'electrical'})
+        self.assertEqual(len(response.context['groups']), 16)
+        self.assertContains(response, 'Leave')
+
+        response = self.client.post(reverse('mentorship:study_group_join', args=[self.group.pk]), HTTP_HX_REQUEST='true')
+        self.assertContains(response, '1 / 2 members')
+        self.client.login(username='student2', password='testpass123')
+        response = self.client.post(reverse('mentorship:study_group_join', args=[self.group.pk]), HTTP_HX_REQUEST='true')
+        self.assertContains(response, '2 / 2 members')
+        self.assertContains(response, 'Leave')
+
+
+class MentorStatsTest(TestCase):
+    """Test per-mentor and monthly session rollups follow sessions as they change"""
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(username=name, password='testpass123')
+            for name in ['asad', 'bushra', 'kamran', 'nida']
+        }
+        self.asad = self.mentor('asad')
+        self.bushra = self.mentor('bushra')
+        self.kamran = MentorshipRequest.objects.create(
+            mentee=self.users['kamran'], mentor=self.asad, message='Hi', goals='PLC', status='accepted',
+        )
+        self.nida = MentorshipRequest.objects.create(
+            mentee=self.users['nida'], mentor=self.bushra, message='Hi', goals='Django', status='accepted',
+        )
+
+    def mentor(self, name):
+        return MentorProfile.objects.create(
+            user=self.users[name], bio='Engineer', years_of_experience=10, current_position='Lead Engineer',
+            company='Siemens', expertise_areas='PLC',
+        )
+
+    def session(self, mentorship, day, minutes=60, mentee_rating=None, mentor_rating=None):
+        return MentorshipSession.objects.create(
+            mentorship=mentorship, session_date=datetime(2026, *day, 12, tzinfo=dt_timezone.utc),
+            duration_minutes=minutes, topics_discussed='Ladder logic',
+            mentee_rating=mentee_rating, mentor_rating=mentor_rating,
+        )
+
+    def totals(self, mentor):
+        row = MentorStats.objects.get(mentor=mentor)
+        return row.session_count, row.total_minutes, row.mentee_rating_sum, row.mentee_rating_count
+
+    def monthly(self):
+        return list(
+            MentorshipMonthlyStats.objects.order_by('month', 'mentor__user__username')
+            .values_list('month', 'mentor__user__username', 'session_count', 'total_minutes')
+        )
+
+    def test_sessions_update_rollups(self):
+        """Test logging, editing, moving and deleting sessions keep both rollups exact"""
+        first = self.session(self.kamran, (9, 5), minutes=90, mentee_rating=5)
+        self.session(self.kamran, (10, 2), minutes=30)
+        self.assertEqual(self.totals(self.asad), (2, 120, 5, 1))
+        self.assertEqual(MentorStats.objects.get(mentor=self.asad).mean_mentee_rating(), 5)
+
+        # An edit moves the session into another month and changes its rating
+        first = MentorshipSession.objects.get(pk=first.pk)
+        first.session_date = datetime(2026, 10, 20, 12, tzinfo=dt_timezone.utc)
+        first.mentee_rating = 3
+        first.save()
+        self.assertEqual(self.totals(self.asad), (2, 120, 3, 1))
+        self.assertEqual(self.monthly(), [
+            (date(2026, 9, 1), 'asad', 0, 0),
+            (date(2026, 10, 1), 'asad', 2, 120),
+        ])
+
+        # Moving the session to another mentorship moves it to that mentor
+        first.mentorship = self.nida
+        first.save()
+        self.assertEqual(self.totals(self.asad), (1, 30, 0, 0))
+        self.assertEqual(self.totals(self.bushra), (1, 90, 3, 1))
+
+        first.delete()
+        self.assertEqual(self.totals(self.bushra), (0, 0, 0, 0))
+
+    def test_rebuild_matches_incremental(self):
+        """Test the rebuild command reproduces the incrementally maintained rows"""
+        self.session(self.kamran, (9, 5), minutes=90, mentee_rating=4, mentor_rating=5)
+        self.session(self.kamran, (9, 20), minutes=45, mentee_rating=2)
+        self.session(self.nida, (10, 2), minutes=60)
+        incremental = (self.totals(self.asad), self.totals(self.bushra), self.monthly())
+
+        MentorStats.objects.update(session_count=99)
+        output = StringIO()
+        call_command('rebuild_mentor_stats', stdout=output)
+        self.assertIn('Rebuilt stats for 2 mentors (2 monthly rows)', output.getvalue())
+        self.assertEqual((self.totals(self.asad), self.totals(self.bushra), self.monthly()), incremental)
+
+    def test_monthly_history_outlives_mentor(self):
+        """Test deleting a mentor keeps their months in the platform report"""
+        self.session(self.kamran, (9, 5), minutes=90, mentee_rating=4)
+        self.session(self.nida, (9, 10), minutes=30, mentee_rating=2)
+        self.asad.delete()
+        self.assertEqual(stats.platform_report(), [{
+            'month': date(2026, 9, 1), 'sessions': 2, 'hours': 2.0, 'active_mentors': 1,
+            'mean_mentee_rating': 3.0, 'mean_mentor_rating': None,
+        }])
+
+    def test_ranking_and_report_views(self):
+        """Test the mentor list ranks by stored totals and the report is staff-only"""
+        for day in (5, 12, 19):
+            self.session(self.nida, (9, day), minutes=30, mentee_rating=5)
+        self.session(self.kamran, (9, 5), minutes=120, mentee_rating=3)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('mentorship:mentors'), {'sort': 'hours'})
+        self.assertEqual(list(response.context['mentors']), [self.asad, self.bushra])
+        self.assertContains(response, '1.5 hours')
+        response = self.client.get(reverse('mentorship:mentors'), {'sort': 'sessions'})
+        self.assertEqual(list(response.context['mentors']), [self.bushra, self.asad])
+        # Asad has too few ratings to be ranked by rating
+        response = self.client.get(reverse('mentorship:mentors'), {'sort': 'rating'})
+        self.assertEqual(list(response.context['mentors']), [self.bushra])
+
+        UserProfile.objects.create(user=self.users['bushra'])
+        response = self.client.get(reverse('core:profile', args=['bushra']))
+        self.assertContains(response, '3 sessions')
 
-# Create your tests here.
+        self.client.login(username='kamran', password='testpass123')
+        self.assertEqual(self.client.get(reverse('mentorship:report')).status_code, 302)
+        User.objects.filter(username='kamran').update(is_staff=True)
+        response = self.client.get(reverse('mentorship:report'))
+        self.assertEqual(response.context['total_sessions'], 4)
+        self.assertContains(response, 'Sep 2026')
+        self.assertEqual(self.client.get(reverse('mentorship:report'), {'start': '2026-02-30'}).status_code, 400)
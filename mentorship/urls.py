@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'mentorship'
+
+urlpatterns = [
+    path('mentors/', views.MentorListView.as_view(), name='mentors'),
+    path('mentors/suggested/', views.MentorSuggestionsView.as_view(), name='mentor_suggestions'),
+    path('report/', views.mentorship_report, name='report'),
+    path('study-groups/', views.StudyGroupListView.as_view(), name='study_groups'),
+    path('study-groups/<int:pk>/join/', views.join_study_group, name='study_group_join'),
+    path('study-groups/<int:pk>/leave/', views.leave_study_group, name='study_group_leave'),
+]
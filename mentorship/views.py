@@ -1,3 +1,139 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.dateparse import parse_date
+from django.views.generic import ListView
 
-# Create your views here.
+from . import groups, stats
+from .models import MentorProfile, MentorSuggestion, StudyGroup, StudyGroupMembership
+
+
+class MentorListView(ListView):
+    """Available mentors; open slots and session totals come from stored counters"""
+    template_name = 'mentorship/mentors.html'
+    context_object_name = 'mentors'
+    paginate_by = 20
+
+    def get_queryset(self):
+        queryset = MentorProfile.objects.filter(available_for_mentorship=True).select_related('user', 'stats')
+        expertise = self.request.GET.get('expertise', '').strip()
+        if expertise:
+            queryset = queryset.filter(expertise_areas__icontains=expertise)
+        sort = self.request.GET.get('sort', '')
+        if sort in stats.SORTS:
+            return stats.rank(queryset, sort)
+        return queryset.order_by('-created_at')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Find a Mentor - engg.pk'
+        context['meta_description'] = 'Experienced engineers mentoring students and early-career professionals in Pakistan.'
+        context['expertise_query'] = self.request.GET.get('expertise', '')
+        context['sort'] = self.request.GET.get('sort', '')
+        context['sorts'] = [('', 'Newest'), ('hours', 'Most hours'), ('sessions', 'Most sessions'), ('rating', 'Top rated')]
+        return context
+
+
+class MentorSuggestionsView(LoginRequiredMixin, ListView):
+    """The viewer's precomputed mentor ranking, their assigned match first"""
+    template_name = 'mentorship/suggestions.html'
+    context_object_name = 'suggestions'
+
+    def get_queryset(self):
+        return (
+            MentorSuggestion.objects.filter(mentee=self.request.user)
+            .select_related('mentor', 'mentor__user')
+            .order_by('-assigned', '-score')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Suggested Mentors - engg.pk'
+        return context
+
+
+class StudyGroupListView(ListView):
+    """Study group directory; sizes come from the stored members_count"""
+    template_name = 'mentorship/study_groups.html'
+    context_object_name = 'groups'
+    paginate_by = 20
+
+    def get_queryset(self):
+        discipline = self.request.GET.get('discipline', '')
+        meeting_format = self.request.GET.get('format', '')
+        if self.request.GET.get('include_full'):
+            queryset = StudyGroup.objects.filter(is_active=True).order_by('-created_at')
+            if discipline:
+                queryset = queryset.filter(discipline=discipline)
+            if meeting_format:
+                queryset = queryset.filter(meeting_format=meeting_format)
+        else:
+            queryset = groups.open_groups(discipline, meeting_format)
+        return groups.with_membership(queryset.select_related('creator'), self.request.user)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        filters = self.request.GET.copy()
+        filters.pop('page', None)
+        context['page_title'] = 'Study Groups - engg.pk'
+        context['meta_description'] = 'Join peer study groups for engineering subjects, online or in your city.'
+        context['disciplines'] = StudyGroup._meta.get_field('discipline').choices
+        context['formats'] = StudyGroup._meta.get_field('meeting_format').choices
+        context['filters'] = self.request.GET
+        context['filter_query'] = filters.urlencode()
+        return context
+
+
+def membership_response(request, group, full=False):
+    """The refreshed join box for HTMX, otherwise back to the directory"""
+    if request.htmx:
+        group.refresh_from_db(fields=['members_count'])
+        group.joined = StudyGroupMembership.objects.filter(study_group=group, user=request.user).exists()
+        return render(request, 'mentorship/partials/study_group_membership.html', {'group': group, 'full': full})
+    return redirect('mentorship:study_groups')
+
+
+@login_required
+def join_study_group(request, pk):
+    """Take a place in the group if one is free (HTMX)"""
+    group = get_object_or_404(StudyGroup, pk=pk)
+    if request.method != 'POST':
+        return HttpResponse(status=400)
+
+    try:
+        groups.join(group, request.user)
+    except groups.GroupFull:
+        return membership_response(request, group, full=True)
+    return membership_response(request, group)
+
+
+@login_required
+def leave_study_group(request, pk):
+    """Give up a place in the group (HTMX)"""
+    group = get_object_or_404(StudyGroup, pk=pk)
+    if request.method != 'POST':
+        return HttpResponse(status=400)
+
+    groups.leave(group, request.user)
+    return membership_response(request, group)
+
+
+@staff_member_required
+def mentorship_report(request):
+    """Platform-wide sessions, hours and ratings per month, read from the monthly rollups"""
+    try:
+        start = parse_date(request.GET.get('start', ''))
+        end = parse_date(request.GET.get('end', ''))
+    except ValueError:
+        # Well-formed but impossible dates such as 2024-02-30
+        return HttpResponse(status=400)
+    months = stats.platform_report(start.replace(day=1) if start else None, end)
+    return render(request, 'mentorship/report.html', {
+        'page_title': 'Mentorship Report - engg.pk',
+        'months': months,
+        'filters': request.GET,
+        'total_sessions': sum(month['sessions'] for month in months),
+        'total_hours': sum(month['hours'] for month in months),
+    })
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import AlumniProfile, CompanyProfile, CompanyReview, Event, EventAttendance
+from . import ratings, registration
+from .models import AlumniProfile, CompanyProfile, CompanyReview, Event, EventAttendance, ConnectionSuggestion
 
 
 @admin.register(AlumniProfile)
@@ -15,6 +16,12 @@ class CompanyProfileAdmin(admin.ModelAdmin):
     list_filter = ['size', 'industry', 'verified']
     search_fields = ['name', 'industry']
     readonly_fields = ['created_at']
+    actions = ['recount_ratings']
+
+    @admin.action(description='Recount review ratings')
+    def recount_ratings(self, request, queryset):
+        written = ratings.rebuild(list(queryset))
+        self.message_user(request, f'Recounted ratings for {written} companies with reviews.')
 
 
 @admin.register(CompanyReview)
@@ -26,12 +33,28 @@ class CompanyReviewAdmin(admin.ModelAdmin):
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ['title', 'event_type', 'format', 'start_date', 'location', 'featured']
+    list_display = ['title', 'event_type', 'format', 'start_date', 'location', 'registered_count', 'max_attendees', 'featured']
     list_filter = ['event_type', 'format', 'featured', 'start_date']
     search_fields = ['title', 'organizer', 'location']
+    readonly_fields = ['registered_count', 'waitlist_count']
+    actions = ['recount_registrations']
+
+    @admin.action(description='Recount registrations and promote waitlisted users')
+    def recount_registrations(self, request, queryset):
+        events = list(queryset)
+        registration.recount(events)
+        promoted = sum(registration.promote(event) for event in events)
+        self.message_user(request, f'Recounted {len(events)} events, promoted {promoted} waitlisted users.')
 
 
 @admin.register(EventAttendance)
 class EventAttendanceAdmin(admin.ModelAdmin):
-    list_display = ['event', 'user', 'registered_at', 'attended', 'rating']
-    list_filter = ['attended']
+    list_display = ['event', 'user', 'status', 'registered_at', 'attended', 'rating']
+    list_filter = ['status', 'attended']
+
+
+@admin.register(ConnectionSuggestion)
+class ConnectionSuggestionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'suggested_user', 'score', 'common_score', 'computed_at']
+    search_fields = ['user__username', 'suggested_user__username']
+    raw_id_fields = ['user', 'suggested_user']
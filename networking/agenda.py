@@ -0,0 +1,329 @@
+"""
+Unified calendar.
+
+Events, conference milestones (the conference itself plus its paper
+submission, notification and camera-ready dates), scholarship deadlines and
+funding application deadlines are read as Entry objects. A date-range query
+runs one range scan per source on that source's indexed date columns
+(conferences OR their four columns together, which SQLite and Postgres
+answer with one index scan per column); an entry belongs to the range its
+start date falls in.
+
+ICS feeds (one per user, one per discipline) are rendered once and cached
+with their ETag. Writes to any source row bump a shared version key, and
+writes to a user's own registrations, interests or alumni profile bump that
+user's key (see networking/signals.py), so a feed is only regenerated after
+something it shows has changed. Calendar clients that poll with
+If-None-Match get a 304 from the cache without touching the database.
+"""
+import hashlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from business.models import FundingOpportunity
+from core import versions
+from marketplace.models import Conference
+from scholarships.models import Scholarship
+from .models import AlumniProfile, Event, EventAttendance
+
+
+KINDS = {
+    'event': 'Event',
+    'conference': 'Conference',
+    'paper_deadline': 'Paper Submission Deadline',
+    'notification': 'Paper Notification',
+    'camera_ready': 'Camera-Ready Deadline',
+    'scholarship': 'Scholarship Deadline',
+    'funding': 'Funding Deadline',
+}
+
+# Conference date column -> entry kind
+CONFERENCE_DATES = {
+    'start_date': 'conference',
+    'paper_submission_deadline': 'paper_deadline',
+    'notification_date': 'notification',
+    'camera_ready_deadline': 'camera_ready',
+}
+
+# Feeds cover a month of history and a year ahead of the day they're built
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 365
+
+UID_DOMAIN = getattr(settings, 'CALENDAR_UID_DOMAIN', 'engg.pk')
+
+VERSION_KEY = 'networking:calendar:version'
+USER_VERSION_KEY = 'networking:calendar:user:{}:version'
+FEED_TIMEOUT = 60 * 60 * 24
+
+SIGNER_SALT = 'networking.calendar'
+
+
+class Entry:
+    """One dated item on the calendar"""
+
+    def __init__(self, kind, pk, title, start, end=None, url='', location='', description='', stamp=None):
+        self.kind = kind
+        self.pk = pk
+        self.title = title
+        self.start = start
+        self.end = end
+        self.url = url
+        self.location = location
+        self.description = description
+        self.stamp = stamp
+
+    @property
+    def label(self):
+        return KINDS[self.kind]
+
+    @property
+    def uid(self):
+        return f'{self.kind}-{self.pk}@{UID_DOMAIN}'
+
+    @property
+    def all_day(self):
+        return not isinstance(self.start, datetime)
+
+    @property
+    def day(self):
+        return timezone.localdate(self.start) if not self.all_day else self.start
+
+    def __repr__(self):
+        return f'<Entry {self.uid} {self.start}>'
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def matches_discipline(values, discipline):
+    """Whether any of a scholarship's listed disciplines covers the given one"""
+    discipline = discipline.lower()
+    return any(discipline in value.lower() or value.lower().startswith('all ') for value in values)
+
+
+def event_entries(start, end, discipline=None, events=None, base_url=''):
+    queryset = Event.objects.filter(start_date__gte=day_start(start), start_date__lt=day_start(end))
+    if discipline:
+        queryset = queryset.filter(discipline__iexact=discipline)
+    if events is not None:
+        queryset = queryset.filter(pk__in=events)
+    for event in queryset.order_by('start_date'):
+        yield Entry(
+            'event', event.pk, event.title, event.start_date, event.end_date,
+            url=base_url + reverse('networking:event_detail', args=[event.pk]),
+            location=event.location or event.online_link,
+            description=f'{event.get_event_type_display()} by {event.organizer}',
+            stamp=event.created_at,
+        )
+
+
+def conference_entries(start, end, discipline=None):
+    in_range = Q()
+    for field in CONFERENCE_DATES:
+        in_range |= Q(**{f'{field}__gte': start, f'{field}__lt': end})
+    queryset = Conference.objects.filter(in_range)
+    if discipline:
+        queryset = queryset.filter(discipline__iexact=discipline)
+    for conference in queryset:
+        for field, kind in CONFERENCE_DATES.items():
+            day = getattr(conference, field)
+            if day is None or not start <= day < end:
+                continue
+            title = conference.name if kind == 'conference' else f'{KINDS[kind]}: {conference.name}'
+            yield Entry(
+                kind, conference.pk, title, day,
+                # DTEND of an all-day entry is exclusive
+                conference.end_date + timedelta(days=1) if kind == 'conference' else None,
+                url=conference.submission_portal if kind != 'conference' and conference.submission_portal else conference.website,
+                location=f'{conference.location}, {conference.country}',
+                stamp=conference.created_at,
+            )
+
+
+def scholarship_entries(start, end, discipline=None):
+    # Not filtered on is_active: expire_listings clears it once the deadline passes
+    queryset = Scholarship.objects.filter(deadline__gte=start, deadline__lt=end)
+    for scholarship in queryset:
+        if discipline and not matches_discipline(scholarship.disciplines, discipline):
+            continue
+        yield Entry(
+            'scholarship', scholarship.pk, f'{scholarship.name} deadline', scholarship.deadline,
+            url=scholarship.application_url,
+            description=f'{scholarship.provider} - {scholarship.amount}',
+            stamp=scholarship.created_at,
+        )
+
+
+def funding_entries(start, end, discipline=None, funding=None):
+    queryset = FundingOpportunity.objects.filter(application_deadline__gte=start, application_deadline__lt=end)
+    if discipline:
+        queryset = queryset.filter(target_industries__icontains=discipline)
+    if funding is not None:
+        queryset = queryset.filter(pk__in=funding)
+    for opportunity in queryset:
+        yield Entry(
+            'funding', opportunity.pk, f'{opportunity.title} deadline', opportunity.application_deadline,
+            url=opportunity.application_url,
+            description=f'{opportunity.provider} - {opportunity.amount}',
+            stamp=opportunity.created_at,
+        )
+
+
+def sort_key(entry):
+    """Day order, all-day entries before timed ones"""
+    at = time.min if entry.all_day else timezone.localtime(entry.start).time()
+    return entry.day, not entry.all_day, at, entry.title
+
+
+def entries(start, end, discipline=None, base_url=''):
+    """Every calendar entry starting on a day in [start, end), in date order"""
+    found = [
+        *event_entries(start, end, discipline, base_url=base_url),
+        *conference_entries(start, end, discipline),
+        *scholarship_entries(start, end, discipline),
+        *funding_entries(start, end, discipline),
+    ]
+    return sorted(found, key=sort_key)
+
+
+def user_entries(user_id, start, end, base_url=''):
+    """
+    A user's calendar: events they hold a seat at and funding they marked
+    interest in, plus everything in their alumni discipline.
+    """
+    found = {}
+    events = EventAttendance.objects.filter(user_id=user_id, status='registered').values('event_id')
+    funding = FundingOpportunity.applicants_interested.through.objects.filter(user_id=user_id).values('fundingopportunity_id')
+    for entry in [*event_entries(start, end, events=events, base_url=base_url), *funding_entries(start, end, funding=funding)]:
+        found[entry.uid] = entry
+    discipline = AlumniProfile.objects.filter(user_id=user_id).values_list('discipline', flat=True).first()
+    if discipline:
+        for entry in entries(start, end, discipline, base_url=base_url):
+            found.setdefault(entry.uid, entry)
+    return sorted(found.values(), key=sort_key)
+
+
+def escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces as RFC 5545 requires"""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    pieces = []
+    while data:
+        size = 75 if not pieces else 74
+        # Never cut a multi-byte character in half
+        while size < len(data) and (data[size] & 0xC0) == 0x80:
+            size -= 1
+        pieces.append(data[:size].decode())
+        data = data[size:]
+    return '\r\n '.join(pieces)
+
+
+def utc_stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_ics(name, calendar_entries):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{UID_DOMAIN}//Calendar//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(name)}',
+    ]
+    for entry in calendar_entries:
+        lines += ['BEGIN:VEVENT', f'UID:{entry.uid}']
+        if entry.stamp:
+            lines.append(f'DTSTAMP:{utc_stamp(entry.stamp)}')
+        if entry.all_day:
+            lines.append(f'DTSTART;VALUE=DATE:{entry.start:%Y%m%d}')
+            lines.append(f'DTEND;VALUE=DATE:{(entry.end or entry.start + timedelta(days=1)):%Y%m%d}')
+        else:
+            lines.append(f'DTSTART:{utc_stamp(entry.start)}')
+            lines.append(f'DTEND:{utc_stamp(entry.end or entry.start)}')
+        lines.append(f'SUMMARY:{escape(entry.title)}')
+        if entry.description:
+            lines.append(f'DESCRIPTION:{escape(entry.description)}')
+        if entry.location:
+            lines.append(f'LOCATION:{escape(entry.location)}')
+        if entry.url:
+            lines.append(f'URL:{entry.url}')
+        lines += [f'CATEGORIES:{escape(entry.label)}', 'END:VEVENT']
+    lines.append('END:VCALENDAR')
+    return ''.join(fold(line) + '\r\n' for line in lines)
+
+
+def invalidate(user_id=None):
+    """Mark every feed stale, or just one user's"""
+    versions.bump(USER_VERSION_KEY.format(user_id) if user_id else VERSION_KEY)
+
+
+def version(key=VERSION_KEY):
+    return versions.current(key)
+
+
+def site_url():
+    """Base of the absolute links in feeds; never the request's Host, which feeds are cached across"""
+    return settings.SITE_URL.rstrip('/')
+
+
+def feed_window(today=None):
+    today = today or timezone.localdate()
+    return today - timedelta(days=FEED_PAST_DAYS), today + timedelta(days=FEED_FUTURE_DAYS)
+
+
+def cached_feed(key, build):
+    """(etag, body) for a feed, rendering it only on a cache miss"""
+    feed = cache.get(key)
+    if feed is None:
+        body = build()
+        feed = (hashlib.sha1(body.encode()).hexdigest(), body)
+        cache.set(key, feed, FEED_TIMEOUT)
+    return feed
+
+
+def discipline_feed(discipline, today=None):
+    start, end = feed_window(today)
+    # The discipline is user input, so it's hashed into a safe key; the day is
+    # part of the key so the window moves forward daily
+    digest = hashlib.sha1(discipline.lower().encode()).hexdigest()
+    key = f'networking:calendar:discipline:{digest}:{version()}:{start}'
+    return cached_feed(key, lambda: render_ics(
+        f'{discipline.title()} - {UID_DOMAIN}', entries(start, end, discipline, base_url=site_url()),
+    ))
+
+
+def user_feed(user_id, today=None):
+    start, end = feed_window(today)
+    key = f'networking:calendar:user:{user_id}:{version()}:{version(USER_VERSION_KEY.format(user_id))}:{start}'
+    return cached_feed(key, lambda: render_ics(
+        f'My Calendar - {UID_DOMAIN}', user_entries(user_id, start, end, base_url=site_url()),
+    ))
+
+
+def feed_token(user):
+    """Secret path segment of a user's feed URL; calendar apps can't log in"""
+    return signing.Signer(salt=SIGNER_SALT).sign(str(user.pk))
+
+
+def token_user_id(token):
+    """The user id a feed token was issued for, or None if it was tampered with"""
+    try:
+        return int(signing.Signer(salt=SIGNER_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
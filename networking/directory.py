@@ -0,0 +1,164 @@
+"""
+Alumni directory.
+
+Listing filters combine with AND across facets and OR within one, and pages
+are fetched with keyset pagination on (graduation_year, id) so deep pages
+cost the same as the first one. The count shown next to each filter value
+comes from AlumniFacetCount, which networking/signals.py adjusts by +/-1 as
+profiles are created, edited and deleted, so the sidebar never runs a
+GROUP BY over the profile table. `manage.py rebuild_alumni_facets` recounts
+from scratch if the table ever drifts.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import AlumniProfile, AlumniFacetCount
+
+
+# URL parameter -> AlumniProfile field
+FACETS = {
+    'university': 'university',
+    'degree': 'degree',
+    'discipline': 'discipline',
+    'year': 'graduation_year',
+    'location': 'location',
+    'company': 'current_company',
+    'helping': 'willing_to_help',
+}
+
+FACET_LABELS = {
+    'university': 'University',
+    'degree': 'Degree',
+    'discipline': 'Discipline',
+    'year': 'Graduation Year',
+    'location': 'Location',
+    'company': 'Company',
+    'helping': 'Helping Students',
+}
+
+FIELD_FACETS = {field: facet for facet, field in FACETS.items()}
+
+OPTIONS_PER_FACET = 15
+
+PAGE_SIZE = 24
+
+
+def facet_value(field, value):
+    """The string a profile field is counted and filtered under ('' is not counted)"""
+    if field == 'willing_to_help':
+        return 'yes' if value else 'no'
+    return str(value) if value is not None else ''
+
+
+def field_value(facet, value):
+    """Inverse of facet_value for filtering, or None if the value can't match"""
+    if facet == 'helping':
+        return {'yes': True, 'no': False}.get(value)
+    if facet == 'year':
+        return int(value) if value.isdigit() else None
+    return value
+
+
+def profile_facets(fields):
+    """{(facet, value)} a profile with the given field values is counted under"""
+    pairs = set()
+    for field, value in fields.items():
+        value = facet_value(field, value)
+        if value:
+            pairs.add((FIELD_FACETS[field], value))
+    return pairs
+
+
+def adjust(pairs, delta):
+    """Add delta to the count of every (facet, value) pair, creating missing rows"""
+    if not pairs:
+        return
+    with transaction.atomic():
+        AlumniFacetCount.objects.bulk_create(
+            [AlumniFacetCount(facet=facet, value=value) for facet, value in pairs],
+            ignore_conflicts=True,
+        )
+        matches = Q()
+        for facet, value in pairs:
+            matches |= Q(facet=facet, value=value)
+        AlumniFacetCount.objects.filter(matches).update(count=F('count') + delta)
+
+
+def apply_change(old, new):
+    """Move counts from a profile's previous facet values to its current ones"""
+    adjust(old - new, -1)
+    adjust(new - old, 1)
+
+
+def rebuild_counts():
+    """Recount every facet from the profile table; returns the number of rows written"""
+    rows = []
+    for facet, field in FACETS.items():
+        for value, total in AlumniProfile.objects.values_list(field).annotate(total=Count('id')).order_by():
+            value = facet_value(field, value)
+            if value:
+                rows.append(AlumniFacetCount(facet=facet, value=value, count=total))
+    with transaction.atomic():
+        AlumniFacetCount.objects.all().delete()
+        AlumniFacetCount.objects.bulk_create(rows)
+    return len(rows)
+
+
+def facet_options(per_facet=OPTIONS_PER_FACET):
+    """{facet: [(value, count)]} with each facet's most common values, in one query"""
+    rows = (
+        AlumniFacetCount.objects.filter(count__gt=0)
+        .annotate(position=Window(RowNumber(), partition_by=F('facet'), order_by=[F('count').desc(), F('value').asc()]))
+        .filter(position__lte=per_facet)
+        .order_by('facet', 'position')
+        .values_list('facet', 'value', 'count')
+    )
+    options = {facet: [] for facet in FACETS}
+    for facet, value, count in rows:
+        if facet in options:
+            options[facet].append((value, count))
+    return options
+
+
+def search(queryset, text):
+    """Match words across what alumni say they do and can help with"""
+    for word in text.split():
+        queryset = queryset.filter(Q(help_areas__icontains=word) | Q(current_position__icontains=word))
+    return queryset
+
+
+def filter_profiles(selected, text=''):
+    queryset = AlumniProfile.objects.all()
+    for facet, values in selected.items():
+        values = [field_value(facet, value) for value in values]
+        values = [value for value in values if value is not None]
+        if values:
+            queryset = queryset.filter(**{f'{FACETS[facet]}__in': values})
+    if text:
+        queryset = search(queryset, text)
+    return queryset
+
+
+def encode_cursor(profile):
+    return f'{profile.graduation_year}.{profile.pk}'
+
+
+def decode_cursor(cursor):
+    """(graduation_year, id) from a cursor, or None for the first page"""
+    year, _, pk = (cursor or '').partition('.')
+    if year.isdigit() and pk.isdigit():
+        return int(year), int(pk)
+    return None
+
+
+def page(queryset, cursor=None, size=PAGE_SIZE):
+    """(profiles, next cursor or None), newest graduates first"""
+    after = decode_cursor(cursor)
+    if after:
+        year, pk = after
+        queryset = queryset.filter(Q(graduation_year__lt=year) | Q(graduation_year=year, pk__lt=pk))
+    profiles = list(queryset.select_related('user').order_by('-graduation_year', '-pk')[:size + 1])
+    if len(profiles) > size:
+        return profiles[:size], encode_cursor(profiles[size - 1])
+    return profiles, None
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from networking.directory import rebuild_counts
+
+
+class Command(BaseCommand):
+    help = 'Recount the alumni directory filter counts from the profile table'
+
+    def handle(self, *args, **options):
+        written = rebuild_counts()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} alumni facet counts'))
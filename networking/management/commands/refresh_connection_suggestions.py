@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from networking.suggestions import refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recompute "people you may know" suggestions for users whose connections changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recompute every user, not just queued ones')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        refreshed = refresh_suggestions(full=options['full'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Refreshed suggestions for {refreshed} users'))
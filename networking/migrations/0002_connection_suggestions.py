@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('networking', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSuggestionRefresh',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('queued_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'networking_pending_suggestion_refreshes',
+            },
+        ),
+        migrations.CreateModel(
+            name='ConnectionSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('common_score', models.FloatField()),
+                ('shared', models.JSONField(default=dict, help_text='Shared context counts by kind')),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('suggested_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='connection_suggestions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'networking_connection_suggestions',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['user', '-score'], name='networking__user_id_bda27e_idx'), models.Index(fields=['suggested_user'], name='networking__suggest_95a55d_idx')],
+                'unique_together': {('user', 'suggested_user')},
+            },
+        ),
+    ]
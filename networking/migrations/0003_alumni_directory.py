@@ -0,0 +1,70 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:38
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_facets(apps, schema_editor):
+    AlumniProfile = apps.get_model('networking', 'AlumniProfile')
+    AlumniFacetCount = apps.get_model('networking', 'AlumniFacetCount')
+    facets = {
+        'university': 'university', 'degree': 'degree', 'discipline': 'discipline', 'year': 'graduation_year',
+        'location': 'location', 'company': 'current_company', 'helping': 'willing_to_help',
+    }
+    rows = []
+    for facet, field in facets.items():
+        for value, total in AlumniProfile.objects.values_list(field).annotate(total=Count('id')).order_by():
+            if field == 'willing_to_help':
+                value = 'yes' if value else 'no'
+            if value not in ('', None):
+                rows.append(AlumniFacetCount(facet=facet, value=str(value), count=total))
+    AlumniFacetCount.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0002_connection_suggestions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlumniFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=30)),
+                ('value', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'networking_alumni_facet_counts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['location'], name='networking__locatio_aa1057_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['current_company'], name='networking__current_8c1ac0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['-graduation_year', '-id'], name='networking__graduat_ee80e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumniprofile',
+            index=models.Index(fields=['willing_to_help', '-graduation_year', '-id'], name='networking__willing_dfc0b8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alumnifacetcount',
+            index=models.Index(fields=['facet', '-count'], name='networking__facet_8d66dc_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='alumnifacetcount',
+            unique_together={('facet', 'value')},
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
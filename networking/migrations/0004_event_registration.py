@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_registrations(apps, schema_editor):
+    Event = apps.get_model('networking', 'Event')
+    EventAttendance = apps.get_model('networking', 'EventAttendance')
+    registered = (
+        EventAttendance.objects.filter(event=OuterRef('pk'))
+        .values('event')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Event.objects.update(registered_count=Coalesce(Subquery(registered, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0003_alumni_directory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='registered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='waitlist_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eventattendance',
+            name='status',
+            field=models.CharField(choices=[('registered', 'Registered'), ('waitlisted', 'Waitlisted')], default='registered', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='eventattendance',
+            index=models.Index(fields=['event', 'status', 'registered_at'], name='networking__event_i_f1e568_idx'),
+        ),
+        migrations.RunPython(count_registrations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+RATING_FIELDS = ['overall_rating', 'work_life_balance', 'compensation', 'culture', 'career_growth', 'management']
+
+
+def aggregate_reviews(apps, schema_editor):
+    CompanyReview = apps.get_model('networking', 'CompanyReview')
+    CompanyRatingAggregate = apps.get_model('networking', 'CompanyRatingAggregate')
+    totals = CompanyReview.objects.values('company').annotate(
+        review_count=Count('id'),
+        recommend_count=Count('id', filter=Q(would_recommend=True)),
+        **{f'{field}_sum': Sum(field) for field in RATING_FIELDS},
+    ).order_by()
+    aggregates = {row['company']: CompanyRatingAggregate(company_id=row.pop('company'), histograms={}, **row) for row in totals}
+    for field in RATING_FIELDS:
+        for company_id, stars, count in CompanyReview.objects.values_list('company', field).annotate(total=Count('id')).order_by():
+            aggregates[company_id].histograms.setdefault(field, [0] * 5)[stars - 1] = count
+    CompanyRatingAggregate.objects.bulk_create(aggregates.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('networking', '0004_event_registration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyRatingAggregate',
+            fields=[
+                ('company', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_aggregate', serialize=False, to='networking.companyprofile')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('recommend_count', models.PositiveIntegerField(default=0)),
+                ('overall_rating_sum', models.PositiveIntegerField(default=0)),
+                ('work_life_balance_sum', models.PositiveIntegerField(default=0)),
+                ('compensation_sum', models.PositiveIntegerField(default=0)),
+                ('culture_sum', models.PositiveIntegerField(default=0)),
+                ('career_growth_sum', models.PositiveIntegerField(default=0)),
+                ('management_sum', models.PositiveIntegerField(default=0)),
+                ('histograms', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'networking_company_rating_aggregates',
+            },
+        ),
+        migrations.RunPython(aggregate_reviews, migrations.RunPython.noop),
+    ]
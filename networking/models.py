@@ -1,9 +1,15 @@
 from django.db import models
 from django.contrib.auth.models import User
+from core.models import CounterFieldsMixin, LoadedValuesMixin
 
 
-class AlumniProfile(models.Model):
+class AlumniProfile(LoadedValuesMixin, models.Model):
     """Alumni network profile"""
+    # Fields counted in AlumniFacetCount (see networking/directory.py)
+    FACET_FIELDS = ['university', 'degree', 'discipline', 'graduation_year', 'location', 'current_company', 'willing_to_help']
+    # The stored facet values, so an edit can move its facet counts
+    loaded_values = {'_loaded_facets': FACET_FIELDS}
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='alumni_profile')
     university = models.CharField(max_length=200)
     degree = models.CharField(
@@ -30,12 +36,34 @@ class AlumniProfile(models.Model):
         indexes = [
             models.Index(fields=['university', 'graduation_year']),
             models.Index(fields=['discipline']),
+            models.Index(fields=['location']),
+            models.Index(fields=['current_company']),
+            # Directory keyset order, alone and for the "willing to help" filter
+            models.Index(fields=['-graduation_year', '-id']),
+            models.Index(fields=['willing_to_help', '-graduation_year', '-id']),
         ]
 
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.university} '{self.graduation_year})"
 
 
+class AlumniFacetCount(models.Model):
+    """Number of alumni profiles per directory filter value, kept current by signals"""
+    facet = models.CharField(max_length=30)
+    value = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'networking_alumni_facet_counts'
+        unique_together = ['facet', 'value']
+        indexes = [
+            models.Index(fields=['facet', '-count']),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
 class CompanyProfile(models.Model):
     """Company profiles for reviews"""
     name = models.CharField(max_length=200, unique=True)
@@ -71,14 +99,19 @@ class CompanyProfile(models.Model):
         return self.name
 
     def average_rating(self):
-        reviews = self.reviews.all()
-        if not reviews:
+        try:
+            return self.rating_aggregate.mean('overall_rating')
+        except CompanyRatingAggregate.DoesNotExist:
             return 0
-        return sum(r.overall_rating for r in reviews) / len(reviews)
 
 
-class CompanyReview(models.Model):
+class CompanyReview(LoadedValuesMixin, models.Model):
     """Employee reviews of companies"""
+    # Fields summed and histogrammed in CompanyRatingAggregate (see networking/ratings.py)
+    RATING_FIELDS = ['overall_rating', 'work_life_balance', 'compensation', 'culture', 'career_growth', 'management']
+    # The stored ratings, so an edit can move them between aggregates
+    loaded_values = {'_loaded_ratings': ['company_id', 'would_recommend', *RATING_FIELDS]}
+
     company = models.ForeignKey(CompanyProfile, on_delete=models.CASCADE, related_name='reviews')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='company_reviews')
     position = models.CharField(max_length=200)
@@ -124,8 +157,46 @@ class CompanyReview(models.Model):
         return f"{self.company.name} review by {self.author.username}"
 
 
-class Event(models.Model):
+class CompanyRatingAggregate(models.Model):
+    """Per-company review totals, kept current by signals so pages never scan reviews"""
+    company = models.OneToOneField(CompanyProfile, on_delete=models.CASCADE, primary_key=True, related_name='rating_aggregate')
+    review_count = models.PositiveIntegerField(default=0)
+    recommend_count = models.PositiveIntegerField(default=0)
+    overall_rating_sum = models.PositiveIntegerField(default=0)
+    work_life_balance_sum = models.PositiveIntegerField(default=0)
+    compensation_sum = models.PositiveIntegerField(default=0)
+    culture_sum = models.PositiveIntegerField(default=0)
+    career_growth_sum = models.PositiveIntegerField(default=0)
+    management_sum = models.PositiveIntegerField(default=0)
+    # {rating field: [reviews giving 1 star, ..., reviews giving 5 stars]}
+    histograms = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'networking_company_rating_aggregates'
+
+    def __str__(self):
+        return f"{self.company_id}: {self.review_count} reviews"
+
+    def mean(self, field):
+        if not self.review_count:
+            return 0
+        return getattr(self, f'{field}_sum') / self.review_count
+
+    def recommend_rate(self):
+        """Share of reviewers who would recommend the company, 0-100"""
+        if not self.review_count:
+            return 0
+        return 100 * self.recommend_count / self.review_count
+
+    def histogram(self, field):
+        return self.histograms.get(field) or [0] * 5
+
+
+class Event(CounterFieldsMixin, models.Model):
     """Engineering events calendar"""
+    counter_fields = ('registered_count', 'waitlist_count')
+
     EVENT_TYPES = [
         ('conference', 'Conference'),
         ('webinar', 'Webinar'),
@@ -165,6 +236,10 @@ class Event(models.Model):
     registration_deadline = models.DateTimeField(null=True, blank=True)
     fee = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Fee in PKR (0 for free)")
     max_attendees = models.PositiveIntegerField(null=True, blank=True)
+    # Maintained by networking/registration.py; seats are reserved by a
+    # conditional UPDATE on registered_count so it never exceeds max_attendees
+    registered_count = models.PositiveIntegerField(default=0)
+    waitlist_count = models.PositiveIntegerField(default=0)
 
     # Tracking
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='events_created')
@@ -193,13 +268,30 @@ class Event(models.Model):
         return self.fee == 0
 
     def attendee_count(self):
-        return self.attendees.count()
+        return self.registered_count
+
+    def seats_left(self):
+        """Free seats, or None if the event has no cap"""
+        if self.max_attendees is None:
+            return None
+        return max(self.max_attendees - self.registered_count, 0)
+
+    def is_full(self):
+        return self.seats_left() == 0
 
 
 class EventAttendance(models.Model):
     """Track event attendance"""
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('registered', 'Registered'),
+            ('waitlisted', 'Waitlisted'),
+        ],
+        default='registered'
+    )
     registered_at = models.DateTimeField(auto_now_add=True)
     attended = models.BooleanField(default=False)
     feedback = models.TextField(blank=True)
@@ -212,6 +304,62 @@ class EventAttendance(models.Model):
     class Meta:
         db_table = 'networking_event_attendance'
         unique_together = ['event', 'user']
+        indexes = [
+            # Waitlist promotion order
+            models.Index(fields=['event', 'status', 'registered_at']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event.title}"
+
+
+class ConnectionSuggestion(models.Model):
+    """Precomputed "people you may know" entries (see networking/suggestions.py)"""
+    SHARED_LABELS = {
+        'classmates': ('classmate cohort', 'classmate cohorts'),
+        'cohort': ('graduating class', 'graduating classes'),
+        'study_group': ('study group', 'study groups'),
+        'event': ('event', 'events'),
+        'following': ('followed expert', 'followed experts'),
+    }
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='connection_suggestions')
+    suggested_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    # Adamic-Adar: shared contexts weighted by 1 / log(context size)
+    score = models.FloatField()
+    # Weighted count of shared contexts
+    common_score = models.FloatField()
+    shared = models.JSONField(default=dict, help_text="Shared context counts by kind")
+    computed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'networking_connection_suggestions'
+        unique_together = ['user', 'suggested_user']
+        ordering = ['-score']
+        indexes = [
+            models.Index(fields=['user', '-score']),
+            models.Index(fields=['suggested_user']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.suggested_user_id} ({self.score:.2f})"
+
+    def reasons(self):
+        """e.g. ['2 study groups', '1 event'] for display"""
+        return [
+            f"{count} {self.SHARED_LABELS[kind][count != 1]}"
+            for kind, count in sorted(self.shared.items(), key=lambda item: -item[1])
+            if kind in self.SHARED_LABELS
+        ]
+
+
+class PendingSuggestionRefresh(models.Model):
+    """Users whose graph neighbourhood changed since their suggestions were computed"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    queued_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'networking_pending_suggestion_refreshes'
+
+    def __str__(self):
+        return f"{self.user_id} queued {self.queued_at}"
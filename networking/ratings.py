@@ -0,0 +1,120 @@
+"""
+Company rating aggregates.
+
+Each company's review count, recommend count, per-dimension rating sums and
+1-5 star histograms live in one CompanyRatingAggregate row. networking/signals.py
+moves a review's contribution in and out of it as reviews are written,
+edited (including moving to another company) and deleted, locking the row
+with SELECT ... FOR UPDATE so concurrent reviews can't lose an update. Means,
+distributions and recommend rates are then read without touching reviews.
+"""
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import CompanyProfile, CompanyReview, CompanyRatingAggregate
+
+
+DIMENSION_LABELS = {
+    'overall_rating': 'Overall',
+    'work_life_balance': 'Work-Life Balance',
+    'compensation': 'Compensation',
+    'culture': 'Culture',
+    'career_growth': 'Career Growth',
+    'management': 'Management',
+}
+
+CONTRIBUTION_FIELDS = ['company_id', 'would_recommend', *CompanyReview.RATING_FIELDS]
+
+MAX_COMPARED = 4
+
+
+def contribution(review):
+    """The stored values of a review that its company's aggregate depends on"""
+    return {name: getattr(review, name) for name in CONTRIBUTION_FIELDS}
+
+
+def add(aggregate, ratings, sign):
+    aggregate.review_count += sign
+    if ratings['would_recommend']:
+        aggregate.recommend_count += sign
+    for field in CompanyReview.RATING_FIELDS:
+        stars = ratings[field]
+        setattr(aggregate, f'{field}_sum', getattr(aggregate, f'{field}_sum') + sign * stars)
+        histogram = aggregate.histograms.setdefault(field, [0] * 5)
+        histogram[stars - 1] += sign
+
+
+def move(old, new):
+    """Take one review's old contribution out of its aggregate and add the new one"""
+    if old == new:
+        return
+    with transaction.atomic():
+        if new:
+            CompanyRatingAggregate.objects.bulk_create(
+                [CompanyRatingAggregate(company_id=new['company_id'])], ignore_conflicts=True,
+            )
+        # Aggregates are locked in key order so two reviews swapping companies can't deadlock.
+        # A missing aggregate on removal means its company is being deleted along with the review.
+        ids = {ratings['company_id'] for ratings in (old, new) if ratings}
+        aggregates = CompanyRatingAggregate.objects.select_for_update().filter(pk__in=ids).order_by('pk').in_bulk()
+        if old and old['company_id'] in aggregates:
+            add(aggregates[old['company_id']], old, -1)
+        if new:
+            add(aggregates[new['company_id']], new, 1)
+        for aggregate in aggregates.values():
+            aggregate.save()
+
+
+def rebuild(companies=None):
+    """Recount aggregates from the reviews table; returns the number written"""
+    reviews = CompanyReview.objects.all()
+    if companies is not None:
+        reviews = reviews.filter(company__in=companies)
+
+    totals = reviews.values('company').annotate(
+        review_count=Count('id'),
+        recommend_count=Count('id', filter=Q(would_recommend=True)),
+        **{f'{field}_sum': Sum(field) for field in CompanyReview.RATING_FIELDS},
+    ).order_by()
+    aggregates = {
+        row['company']: CompanyRatingAggregate(company_id=row.pop('company'), histograms={}, **row)
+        for row in totals
+    }
+    for field in CompanyReview.RATING_FIELDS:
+        for company_id, stars, count in reviews.values_list('company', field).annotate(total=Count('id')).order_by():
+            aggregates[company_id].histograms.setdefault(field, [0] * 5)[stars - 1] = count
+
+    with transaction.atomic():
+        stale = CompanyRatingAggregate.objects.all()
+        if companies is not None:
+            stale = stale.filter(company__in=companies)
+        stale.delete()
+        CompanyRatingAggregate.objects.bulk_create(aggregates.values())
+    return len(aggregates)
+
+
+def compare(company_ids):
+    """
+    (companies, rows) for a side-by-side table: one row per rating dimension
+    with each company's mean and star distribution, read from aggregates only.
+    """
+    companies = list(
+        CompanyProfile.objects.filter(pk__in=company_ids[:MAX_COMPARED])
+        .select_related('rating_aggregate')
+        .order_by('name')
+    )
+    aggregates = [getattr(company, 'rating_aggregate', None) or CompanyRatingAggregate(company=company) for company in companies]
+    rows = []
+    for field, label in DIMENSION_LABELS.items():
+        cells = []
+        for aggregate in aggregates:
+            histogram = aggregate.histogram(field)
+            cells.append({
+                'mean': aggregate.mean(field),
+                'distribution': [
+                    {'stars': stars, 'count': count, 'percent': 100 * count / aggregate.review_count if aggregate.review_count else 0}
+                    for stars, count in reversed(list(enumerate(histogram, start=1)))
+                ],
+            })
+        rows.append({'label': label, 'cells': cells})
+    return list(zip(companies, aggregates)), rows
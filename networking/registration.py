@@ -0,0 +1,125 @@
+"""
+Event registration.
+
+A seat is reserved with one conditional UPDATE:
+
+    UPDATE networking_events SET registered_count = registered_count + 1
+    WHERE id = %s AND (max_attendees IS NULL OR registered_count < max_attendees)
+
+The database serialises concurrent updates of the row and re-checks the
+condition for each, so however many requests race for the last seat exactly
+one of them gets a row count of 1; the rest go on the waitlist. Cancelling a
+registered seat (or deleting its row any other way) hands it to the
+longest-waiting waitlisted user the same way. Event.registered_count and
+waitlist_count are read directly, so showing availability never runs a COUNT.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Event, EventAttendance
+
+
+class RegistrationClosed(Exception):
+    """The event has started or its registration deadline has passed"""
+
+
+def is_open(event, now=None):
+    now = now or timezone.now()
+    deadline = event.registration_deadline or event.start_date
+    return now < deadline
+
+
+def reserve_seat(event_id):
+    """Take one seat if any is free; returns whether it was taken"""
+    return bool(
+        Event.objects.filter(pk=event_id)
+        .filter(Q(max_attendees__isnull=True) | Q(registered_count__lt=F('max_attendees')))
+        .update(registered_count=F('registered_count') + 1)
+    )
+
+
+def register(event, user):
+    """
+    Register the user, or waitlist them when the event is full. Registering
+    twice returns the existing row.
+    """
+    if not is_open(event):
+        raise RegistrationClosed(event.title)
+
+    try:
+        with transaction.atomic():
+            # The unique (event, user) row is claimed first so a double
+            # submit can never take two seats
+            attendance = EventAttendance.objects.create(event=event, user=user, status='waitlisted')
+            if reserve_seat(event.pk):
+                attendance.status = 'registered'
+                attendance.save(update_fields=['status'])
+            else:
+                Event.objects.filter(pk=event.pk).update(waitlist_count=F('waitlist_count') + 1)
+    except IntegrityError:
+        return EventAttendance.objects.get(event=event, user=user)
+    return attendance
+
+
+def cancel(event, user):
+    """Drop the user's registration or waitlist place; returns whether they had one"""
+    with transaction.atomic():
+        attendance = EventAttendance.objects.select_for_update().filter(event=event, user=user).first()
+        if attendance is None:
+            return False
+        # release() runs from post_delete and frees the seat or waitlist place
+        attendance.delete()
+    return True
+
+
+def release(attendance):
+    """
+    Give back a deleted row's seat, handing it to the waitlist, or its
+    waitlist place. Connected to post_delete so rows removed in the admin or
+    by a cascade keep the counts right too.
+    """
+    events = Event.objects.filter(pk=attendance.event_id)
+    if attendance.status == 'registered':
+        events.update(registered_count=F('registered_count') - 1)
+        promote(attendance.event)
+    else:
+        events.update(waitlist_count=F('waitlist_count') - 1)
+
+
+def promote(event):
+    """Move waitlisted users into free seats, first come first served; returns how many moved"""
+    promoted = 0
+    with transaction.atomic():
+        while True:
+            waiting = (
+                EventAttendance.objects.select_for_update()
+                .filter(event=event, status='waitlisted')
+                .order_by('registered_at', 'pk')
+                .first()
+            )
+            if waiting is None or not reserve_seat(event.pk):
+                break
+            waiting.status = 'registered'
+            waiting.save(update_fields=['status'])
+            Event.objects.filter(pk=event.pk).update(waitlist_count=F('waitlist_count') - 1)
+            promoted += 1
+    return promoted
+
+
+def recount(events):
+    """Reset the stored counts of the given events from their attendance rows"""
+    def counted(status):
+        rows = (
+            EventAttendance.objects.filter(event=OuterRef('pk'), status=status)
+            .values('event')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+    return Event.objects.filter(pk__in=[event.pk for event in events]).update(
+        registered_count=counted('registered'),
+        waitlist_count=counted('waitlisted'),
+    )
@@ -0,0 +1,114 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from business.models import FundingOpportunity
+from feed.models import UserSubscription
+from marketplace.models import Conference
+from mentorship.models import StudyGroupMembership
+from scholarships.models import Scholarship
+from . import agenda, directory, ratings, registration, suggestions
+from .models import AlumniProfile, CompanyReview, Event, EventAttendance
+
+
+@receiver(post_save, sender=AlumniProfile)
+@receiver(post_delete, sender=AlumniProfile)
+@receiver(post_save, sender=StudyGroupMembership)
+@receiver(post_delete, sender=StudyGroupMembership)
+@receiver(post_save, sender=EventAttendance)
+@receiver(post_delete, sender=EventAttendance)
+def queue_member(sender, instance, **kwargs):
+    """The user's contexts changed; refresh their suggestions and their neighbours'"""
+    suggestions.mark_stale([instance.user_id])
+
+
+@receiver(post_save, sender=UserSubscription)
+@receiver(post_delete, sender=UserSubscription)
+def queue_follow(sender, instance, **kwargs):
+    suggestions.mark_stale([instance.subscriber_id, instance.thought_leader.user_id])
+
+
+def facet_fields(profile):
+    return {name: getattr(profile, name) for name in AlumniProfile.FACET_FIELDS}
+
+
+@receiver(post_save, sender=AlumniProfile)
+def count_profile_facets(sender, instance, created, **kwargs):
+    """Move the directory filter counts to the profile's current values"""
+    current = facet_fields(instance)
+    loaded = None if created else getattr(instance, '_loaded_facets', None)
+    if created:
+        directory.adjust(directory.profile_facets(current), 1)
+    elif loaded is not None and loaded != current:
+        directory.apply_change(directory.profile_facets(loaded), directory.profile_facets(current))
+    instance._loaded_facets = current
+
+
+@receiver(post_delete, sender=AlumniProfile)
+def uncount_profile_facets(sender, instance, **kwargs):
+    fields = getattr(instance, '_loaded_facets', None) or facet_fields(instance)
+    directory.adjust(directory.profile_facets(fields), -1)
+
+
+@receiver(post_save, sender=CompanyReview)
+def count_review_ratings(sender, instance, created, **kwargs):
+    """Move the review's ratings into its company's current aggregate"""
+    current = ratings.contribution(instance)
+    loaded = None if created else getattr(instance, '_loaded_ratings', None)
+    if created:
+        ratings.move(None, current)
+    elif loaded is not None:
+        ratings.move(loaded, current)
+    instance._loaded_ratings = current
+
+
+@receiver(post_delete, sender=CompanyReview)
+def uncount_review_ratings(sender, instance, **kwargs):
+    ratings.move(getattr(instance, '_loaded_ratings', None) or ratings.contribution(instance), None)
+
+
+@receiver(post_delete, sender=EventAttendance)
+def release_place(sender, instance, **kwargs):
+    registration.release(instance)
+
+
+@receiver(post_save, sender=Event)
+def fill_freed_seats(sender, instance, created, **kwargs):
+    """Raising max_attendees (or removing it) lets waitlisted users in"""
+    if not created:
+        registration.promote(instance)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Conference)
+@receiver(post_delete, sender=Conference)
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+@receiver(post_save, sender=FundingOpportunity)
+@receiver(post_delete, sender=FundingOpportunity)
+def refresh_calendars(sender, **kwargs):
+    """A dated row changed; every cached ICS feed may show it"""
+    agenda.invalidate()
+
+
+@receiver(post_save, sender=EventAttendance)
+@receiver(post_delete, sender=EventAttendance)
+@receiver(post_save, sender=AlumniProfile)
+@receiver(post_delete, sender=AlumniProfile)
+def refresh_user_calendar(sender, instance, **kwargs):
+    """The user's registrations or discipline changed; only their feed is stale"""
+    agenda.invalidate(instance.user_id)
+
+
+@receiver(m2m_changed, sender=FundingOpportunity.applicants_interested.through)
+def refresh_interested_calendars(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        agenda.invalidate(instance.pk)
+    elif pk_set:
+        for user_id in pk_set:
+            agenda.invalidate(user_id)
+    elif action == 'post_clear':
+        # The cleared users aren't known any more
+        agenda.invalidate()
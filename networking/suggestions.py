@@ -0,0 +1,229 @@
+"""
+"People you may know".
+
+Alumni cohorts, study groups, event attendance and thought-leader follows
+are loaded as a sparse user x context incidence matrix B in CSR form (a
+context is one cohort, group, event or followed expert). Two users are
+neighbours of the same context when they share it, so for a block of users
+R the products
+
+    B[R] @ diag(weight) @ B.T                  weighted common neighbours
+    B[R] @ diag(weight / log(size)) @ B.T      Adamic-Adar
+
+score every candidate pair at once without a Python loop over pairs. Only
+each user's top-k candidates by Adamic-Adar are kept in ConnectionSuggestion.
+
+Membership changes queue the user in PendingSuggestionRefresh (see
+networking/signals.py). An incremental refresh recomputes just the queued
+users, everyone sharing a context with them and everyone currently being
+shown them; `--full` recomputes every user.
+"""
+from collections import defaultdict
+
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.signals import being_deleted
+from feed.models import UserSubscription
+from mentorship.models import StudyGroupMembership
+from .models import AlumniProfile, EventAttendance, ConnectionSuggestion, PendingSuggestionRefresh
+
+
+KINDS = ['classmates', 'cohort', 'study_group', 'event', 'following']
+
+# How much sharing one context of each kind says about two people
+KIND_WEIGHTS = {
+    'classmates': 2.0,
+    'cohort': 1.0,
+    'study_group': 3.0,
+    'event': 1.0,
+    'following': 0.5,
+}
+
+TOP_K = getattr(settings, 'CONNECTION_SUGGESTIONS', 20)
+
+# Contexts bigger than this (a huge conference, a celebrity expert) connect
+# everyone to everyone and are skipped
+MAX_CONTEXT_SIZE = getattr(settings, 'CONNECTION_MAX_CONTEXT_SIZE', 2000)
+
+
+def load_memberships():
+    """[(user_id, kind, context key)] for every edge of the graph"""
+    edges = []
+    alumni = AlumniProfile.objects.values_list('user_id', 'university', 'discipline', 'graduation_year')
+    for user_id, university, discipline, year in alumni.iterator(chunk_size=5000):
+        university = university.strip().lower()
+        edges.append((user_id, 'classmates', (university, discipline.strip().lower(), year)))
+        edges.append((user_id, 'cohort', (university, year)))
+
+    groups = StudyGroupMembership.objects.filter(study_group__is_active=True).values_list('user_id', 'study_group_id')
+    edges.extend((user_id, 'study_group', group_id) for user_id, group_id in groups.iterator(chunk_size=5000))
+
+    events = EventAttendance.objects.filter(status='registered').values_list('user_id', 'event_id')
+    edges.extend((user_id, 'event', event_id) for user_id, event_id in events.iterator(chunk_size=5000))
+
+    # An expert belongs to their own followers' context
+    follows = UserSubscription.objects.values_list('subscriber_id', 'thought_leader_id', 'thought_leader__user_id')
+    for subscriber_id, leader_id, leader_user_id in follows.iterator(chunk_size=5000):
+        edges.append((subscriber_id, 'following', leader_id))
+        edges.append((leader_user_id, 'following', leader_id))
+    return edges
+
+
+def load_follows():
+    """{user_id: user ids they already follow}"""
+    follows = defaultdict(set)
+    for subscriber_id, leader_user_id in UserSubscription.objects.values_list('subscriber_id', 'thought_leader__user_id'):
+        follows[subscriber_id].add(leader_user_id)
+    return follows
+
+
+class PeopleGraph:
+    """User x context incidence matrix with per-context weights"""
+
+    def __init__(self, edges):
+        contexts = {}
+        users = {}
+        rows, columns = [], []
+        for user_id, kind, key in edges:
+            rows.append(users.setdefault(user_id, len(users)))
+            columns.append(contexts.setdefault((kind, key), len(contexts)))
+
+        self.user_ids = np.fromiter(users, dtype=np.int64, count=len(users))
+        self.rows = users
+        self.kinds = np.fromiter((KINDS.index(kind) for kind, _ in contexts), dtype=np.int64, count=len(contexts))
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64))),
+            shape=(len(users), len(contexts)),
+        )
+        # Duplicate edges (e.g. two classmates rows) collapse to one
+        matrix.data[:] = 1
+        sizes = np.asarray(matrix.sum(axis=0)).ravel()
+
+        # Contexts of one person can't connect anybody; oversized ones connect everybody
+        useful = (sizes >= 2) & (sizes <= MAX_CONTEXT_SIZE)
+        weights = np.array([KIND_WEIGHTS[kind] for kind in KINDS], dtype=np.float64)[self.kinds]
+        self.common_weights = np.where(useful, weights, 0)
+        self.adamic_adar_weights = np.where(useful, weights / np.log(np.maximum(sizes, 2)), 0)
+
+        self.matrix = matrix
+        self.matrix_t = matrix.T.tocsr()
+
+    @classmethod
+    def build(cls):
+        return cls(load_memberships())
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def scores(self, rows):
+        """(Adamic-Adar, weighted common neighbours) CSR blocks for the given user rows"""
+        block = self.matrix[rows]
+        adamic_adar = (block @ sparse.diags(self.adamic_adar_weights) @ self.matrix_t).tocsr()
+        common = (block @ sparse.diags(self.common_weights) @ self.matrix_t).tocsr()
+        return adamic_adar, common
+
+    def neighbourhood(self, rows):
+        """Rows of every user sharing a context with any of the given rows"""
+        if not len(rows):
+            return np.empty(0, dtype=np.int64)
+        reach = (self.matrix[rows] @ sparse.diags(self.common_weights) @ self.matrix_t).tocsr()
+        return np.unique(reach.indices[reach.data > 0])
+
+    def shared(self, row, other):
+        """{kind: count} of the contexts two users have in common"""
+        mine = self.matrix.indices[self.matrix.indptr[row]:self.matrix.indptr[row + 1]]
+        theirs = self.matrix.indices[self.matrix.indptr[other]:self.matrix.indptr[other + 1]]
+        common = np.intersect1d(mine, theirs, assume_unique=True)
+        common = common[self.common_weights[common] > 0]
+        counts = np.bincount(self.kinds[common], minlength=len(KINDS))
+        return {KINDS[kind]: int(count) for kind, count in enumerate(counts) if count}
+
+
+def top_k(scores, row, k, exclude):
+    """(columns, scores) of a CSR row's k best positive scores, best first"""
+    start, end = scores.indptr[row], scores.indptr[row + 1]
+    columns = scores.indices[start:end]
+    values = scores.data[start:end]
+    keep = (values > 0) & ~np.isin(columns, exclude)
+    columns, values = columns[keep], values[keep]
+    if len(columns) > k:
+        best = np.argpartition(-values, k - 1)[:k]
+        columns, values = columns[best], values[best]
+    order = np.argsort(-values, kind='stable')
+    return columns[order], values[order]
+
+
+def compute_suggestions(graph, rows, follows, k=TOP_K, chunk_size=1000):
+    """ConnectionSuggestion rows (unsaved) for the given graph rows"""
+    suggestions = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        adamic_adar, common = graph.scores(chunk)
+        for offset, row in enumerate(chunk.tolist()):
+            user_id = int(graph.user_ids[row])
+            exclude = [row] + [graph.rows[other] for other in follows.get(user_id, ()) if other in graph.rows]
+            columns, values = top_k(adamic_adar, offset, k, exclude)
+            for column, score in zip(columns.tolist(), values.tolist()):
+                suggestions.append(ConnectionSuggestion(
+                    user_id=user_id,
+                    suggested_user_id=int(graph.user_ids[column]),
+                    score=round(score, 4),
+                    common_score=round(float(common[offset, column]), 4),
+                    shared=graph.shared(row, column),
+                ))
+    return suggestions
+
+
+def mark_stale(user_ids):
+    """Queue users for the next incremental refresh, skipping any being deleted"""
+    now = timezone.now()
+    PendingSuggestionRefresh.objects.bulk_create(
+        [
+            PendingSuggestionRefresh(user_id=user_id, queued_at=now)
+            for user_id in set(user_ids) if user_id and not being_deleted(user_id)
+        ],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['queued_at'],
+    )
+
+
+def refresh_suggestions(full=False, k=TOP_K, chunk_size=1000, batch_size=2000):
+    """
+    Recompute suggestions for queued users and their neighbourhoods (or, with
+    full=True, everyone); returns the number of users refreshed.
+    """
+    started = timezone.now()
+    queued = list(PendingSuggestionRefresh.objects.filter(queued_at__lte=started).values_list('user_id', flat=True))
+    if not full and not queued:
+        return 0
+
+    graph = PeopleGraph.build()
+    if full:
+        rows = np.arange(len(graph))
+        affected = set(graph.user_ids.tolist())
+    else:
+        queued_rows = np.array([graph.rows[user_id] for user_id in queued if user_id in graph.rows], dtype=np.int64)
+        affected = set(queued)
+        affected.update(graph.user_ids[graph.neighbourhood(queued_rows)].tolist())
+        # People who were being shown a queued user may need a replacement
+        affected.update(ConnectionSuggestion.objects.filter(suggested_user_id__in=queued).values_list('user_id', flat=True))
+        rows = np.array(sorted(graph.rows[user_id] for user_id in affected if user_id in graph.rows), dtype=np.int64)
+
+    suggestions = compute_suggestions(graph, rows, load_follows(), k=k, chunk_size=chunk_size)
+    with transaction.atomic():
+        if full:
+            ConnectionSuggestion.objects.all().delete()
+        else:
+            affected = list(affected)
+            for start in range(0, len(affected), batch_size):
+                ConnectionSuggestion.objects.filter(user_id__in=affected[start:start + batch_size]).delete()
+        ConnectionSuggestion.objects.bulk_create(suggestions, batch_size=batch_size)
+        # Users queued while this ran stay queued
+        PendingSuggestionRefresh.objects.filter(user_id__in=queued, queued_at__lte=started).delete()
+    return len(affected)
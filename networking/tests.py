@@ -1,3 +1,443 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from business.models import FundingOpportunity
+from feed.models import ThoughtLeader, UserSubscription
+from marketplace.models import Conference
+from mentorship.models import StudyGroup, StudyGroupMembership
+from scholarships.models import Scholarship
+from .models import (
+    AlumniProfile, AlumniFacetCount, CompanyProfile, CompanyRatingAggregate, CompanyReview, ConnectionSuggestion,
+    PendingSuggestionRefresh, Event, EventAttendance,
+)
+from .suggestions import refresh_suggestions
+from . import agenda, directory, ratings, registration
+
+
+class ConnectionSuggestionTest(TestCase):
+    """Test "people you may know" scoring over the alumni/group/follow graph"""
+
+    def setUp(self):
+        self.users = {
+            name: User.objects.create_user(username=name, password='testpass123')
+            for name in ['ayesha', 'bilal', 'danish', 'erum', 'fahad', 'hamza']
+        }
+        for name, discipline in [('ayesha', 'CS'), ('bilal', 'CS'), ('hamza', 'CS'), ('danish', 'EE')]:
+            AlumniProfile.objects.create(
+                user=self.users[name], university='NUST', degree='bs', discipline=discipline,
+                graduation_year=2020, location='Islamabad',
+            )
+        self.group = StudyGroup.objects.create(
+            name='Control Systems', description='Weekly problem sets', subject='Control', discipline='electrical',
+            creator=self.users['ayesha'], meeting_frequency='weekly', meeting_format='online',
+        )
+        self.membership = StudyGroupMembership.objects.create(study_group=self.group, user=self.users['erum'])
+        StudyGroupMembership.objects.create(study_group=self.group, user=self.users['ayesha'])
+        leader = ThoughtLeader.objects.create(user=self.users['fahad'], title='Principal Engineer', bio='Power systems')
+        for name in ['ayesha', 'bilal']:
+            UserSubscription.objects.create(subscriber=self.users[name], thought_leader=leader)
+
+    def suggested(self, name):
+        return list(
+            ConnectionSuggestion.objects.filter(user=self.users[name])
+            .order_by('-score')
+            .values_list('suggested_user__username', flat=True)
+        )
+
+    def test_adamic_adar_ranking(self):
+        """Test small shared contexts outrank large ones and followed experts are excluded"""
+        output = StringIO()
+        call_command('refresh_connection_suggestions', '--full', stdout=output)
+        self.assertIn('Refreshed suggestions for 6 users', output.getvalue())
+
+        # A two-person study group beats a three-person classmate cohort
+        self.assertEqual(self.suggested('ayesha'), ['erum', 'bilal', 'hamza', 'danish'])
+        self.assertNotIn('fahad', self.suggested('bilal'))
+        self.assertEqual(set(self.suggested('fahad')), {'ayesha', 'bilal'})
+
+        bilal = ConnectionSuggestion.objects.get(user=self.users['ayesha'], suggested_user=self.users['bilal'])
+        self.assertEqual(bilal.shared, {'classmates': 1, 'cohort': 1, 'following': 1})
+        self.assertGreater(bilal.common_score, bilal.score)
+        self.assertIn('1 study group', ConnectionSuggestion.objects.get(
+            user=self.users['ayesha'], suggested_user=self.users['erum'],
+        ).reasons())
+        self.assertFalse(PendingSuggestionRefresh.objects.exists())
+
+    def test_incremental_refresh(self):
+        """Test leaving a group only recomputes the users it affects"""
+        refresh_suggestions(full=True)
+        self.assertEqual(refresh_suggestions(), 0)
+
+        self.membership.delete()
+        self.assertTrue(PendingSuggestionRefresh.objects.filter(user=self.users['erum']).exists())
+        # Erum herself plus Ayesha, who was being shown her
+        self.assertEqual(refresh_suggestions(), 2)
+        self.assertEqual(self.suggested('ayesha'), ['bilal', 'hamza', 'danish'])
+        self.assertEqual(self.suggested('erum'), [])
+        self.assertEqual(set(self.suggested('danish')), {'ayesha', 'bilal', 'hamza'})
+
+    def test_deleting_users(self):
+        """Test deleting a user queues only the users who remain"""
+        refresh_suggestions(full=True)
+        self.users['fahad'].delete()
+        self.users['ayesha'].delete()
+
+        # No queued row may point at a deleted user
+        queued = set(PendingSuggestionRefresh.objects.values_list('user_id', flat=True))
+        self.assertEqual(queued, {self.users['bilal'].pk, self.users['erum'].pk})
+        refresh_suggestions()
+        self.assertEqual(self.suggested('erum'), [])
+        self.assertEqual(self.suggested('bilal'), ['hamza', 'danish'])
+
+    def test_suggestions_page(self):
+        """Test the page lists the viewer's stored suggestions"""
+        refresh_suggestions(full=True)
+        self.client.login(username='ayesha', password='testpass123')
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('networking:people_you_may_know'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'erum')
+        self.assertContains(response, 'NUST')
+
+
+class AlumniDirectoryTest(TestCase):
+    """Test the alumni directory filters, keyset pages and maintained facet counts"""
+
+    def setUp(self):
+        self.profiles = []
+        for i, (university, discipline, year, company, helping) in enumerate([
+            ('NUST', 'Electrical', 2018, 'K-Electric', True),
+            ('NUST', 'Software', 2020, 'Systems Ltd', True),
+            ('UET Lahore', 'Electrical', 2020, 'K-Electric', False),
+            ('UET Lahore', 'Civil', 2021, '', True),
+        ]):
+            user = User.objects.create_user(username=f'alum{i}', password='testpass123')
+            self.profiles.append(AlumniProfile.objects.create(
+                user=user, university=university, degree='bs', discipline=discipline, graduation_year=year,
+                current_company=company, current_position='Protection Engineer' if i == 2 else 'Engineer',
+                location='Lahore', willing_to_help=helping, help_areas='CV reviews' if helping else '',
+            ))
+
+    def counts(self, facet):
+        return dict(AlumniFacetCount.objects.filter(facet=facet, count__gt=0).values_list('value', 'count'))
+
+    def test_counts_follow_creates_edits_and_deletes(self):
+        """Test facet counts move with profile writes and match a full recount"""
+        self.assertEqual(self.counts('company'), {'K-Electric': 2, 'Systems Ltd': 1})
+        self.assertEqual(self.counts('helping'), {'yes': 3, 'no': 1})
+
+        profile = AlumniProfile.objects.get(pk=self.profiles[0].pk)
+        profile.current_company = 'Systems Ltd'
+        profile.willing_to_help = False
+        profile.save()
+        self.profiles[3].delete()
+        self.assertEqual(self.counts('company'), {'K-Electric': 1, 'Systems Ltd': 2})
+        self.assertEqual(self.counts('helping'), {'yes': 1, 'no': 2})
+        self.assertEqual(self.counts('year'), {'2018': 1, '2020': 2})
+
+        live = {(row.facet, row.value): row.count for row in AlumniFacetCount.objects.filter(count__gt=0)}
+        call_command('rebuild_alumni_facets', stdout=StringIO())
+        self.assertEqual({(row.facet, row.value): row.count for row in AlumniFacetCount.objects.all()}, live)
+
+    def test_filters_search_and_keyset_pages(self):
+        """Test filters combine, search matches roles and pages never repeat"""
+        selected = {'university': ['NUST', 'UET Lahore'], 'discipline': ['Electrical'], 'helping': ['yes']}
+        self.assertEqual(list(directory.filter_profiles(selected)), [self.profiles[0]])
+        self.assertEqual(list(directory.filter_profiles({}, 'protection')), [self.profiles[2]])
+
+        seen = []
+        cursor = None
+        while True:
+            profiles, cursor = directory.page(AlumniProfile.objects.all(), cursor, size=3)
+            seen.extend(profile.pk for profile in profiles)
+            if not cursor:
+                break
+        self.assertEqual(seen, [self.profiles[i].pk for i in (3, 2, 1, 0)])
+
+    def test_directory_view(self):
+        """Test the directory page reads counts from the facet table"""
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('networking:alumni_directory'), {'company': 'K-Electric', 'after': 'junk'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['profiles']), 2)
+        company = next(group for group in response.context['facets'] if group['param'] == 'company')
+        self.assertEqual(
+            [(option['value'], option['count'], option['selected']) for option in company['options']],
+            [('K-Electric', 2, True), ('Systems Ltd', 1, False)],
+        )
+
+
+class EventRegistrationTest(TestCase):
+    """Test seat reservation, the waitlist and stored counts"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'user{i}', password='testpass123') for i in range(4)]
+        start = timezone.now() + timedelta(days=3)
+        self.event = Event.objects.create(
+            title='PLC Programming Workshop', description='Hands-on', event_type='workshop', organizer='IEEE',
+            start_date=start, end_date=start + timedelta(hours=3), format='in_person', location='Lahore',
+            max_attendees=2, created_by=self.users[0],
+        )
+
+    def counts(self):
+        self.event.refresh_from_db()
+        return self.event.registered_count, self.event.waitlist_count
+
+    def test_capacity_and_waitlist(self):
+        """Test seats run out, the waitlist fills and cancellations promote in order"""
+        statuses = [registration.register(self.event, user).status for user in self.users[:4]]
+        self.assertEqual(statuses, ['registered', 'registered', 'waitlisted', 'waitlisted'])
+        self.assertEqual(self.counts(), (2, 2))
+        self.assertEqual(registration.register(self.event, self.users[0]).status, 'registered')
+        self.assertEqual(self.counts(), (2, 2))
+        self.assertTrue(self.event.is_full())
+
+        self.assertTrue(registration.cancel(self.event, self.users[1]))
+        self.assertEqual(EventAttendance.objects.get(event=self.event, user=self.users[2]).status, 'registered')
+        self.assertEqual(self.counts(), (2, 1))
+        self.assertTrue(registration.cancel(self.event, self.users[3]))
+        self.assertFalse(registration.cancel(self.event, self.users[3]))
+        self.assertEqual(self.counts(), (2, 0))
+        self.assertEqual(self.event.attendee_count(), 2)
+
+    def test_deleted_rows_release_places(self):
+        """Test rows deleted outside cancel(), directly or by a cascade, keep the counts right"""
+        for user in self.users:
+            registration.register(self.event, user)
+        self.users[1].delete()
+        self.assertEqual(EventAttendance.objects.get(event=self.event, user=self.users[2]).status, 'registered')
+        self.assertEqual(self.counts(), (2, 1))
+
+        EventAttendance.objects.filter(event=self.event, user=self.users[3]).delete()
+        self.assertEqual(self.counts(), (2, 0))
+        EventAttendance.objects.filter(event=self.event).delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_raising_capacity_promotes(self):
+        """Test a stale full save keeps counters and a bigger cap lets the waitlist in"""
+        stale = Event.objects.get(pk=self.event.pk)
+        for user in self.users[:3]:
+            registration.register(self.event, user)
+        stale.max_attendees = 5
+        stale.save()
+        self.assertEqual(self.counts(), (3, 0))
+
+    def test_registration_closes(self):
+        """Test registering after the deadline is refused"""
+        self.event.registration_deadline = timezone.now() - timedelta(minutes=1)
+        self.event.save()
+        with self.assertRaises(registration.RegistrationClosed):
+            registration.register(self.event, self.users[1])
+
+    def test_views(self):
+        """Test registering through the page and listing events without COUNT queries"""
+        self.client.login(username='user1', password='testpass123')
+        response = self.client.post(reverse('networking:event_register', args=[self.event.pk]), HTTP_HX_REQUEST='true')
+        self.assertContains(response, "You're registered.")
+        self.assertContains(response, '1 seats left')
+
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('networking:events'))
+        self.assertContains(response, 'PLC Programming Workshop')
+
+        response = self.client.post(reverse('networking:event_cancel', args=[self.event.pk]))
+        self.assertRedirects(response, reverse('networking:event_detail', args=[self.event.pk]))
+        self.assertEqual(self.counts(), (0, 0))
+
+
+class CalendarTest(TestCase):
+    """Test calendar range queries and the cached ICS feeds"""
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.localdate()
+        self.user = User.objects.create_user(username='sana', password='testpass123')
+        start = timezone.now() + timedelta(days=10)
+        self.event = Event.objects.create(
+            title='Smart Grid Meetup', description='Talks', event_type='meetup', organizer='IEEE PES',
+            discipline='Electrical Engineering', start_date=start, end_date=start + timedelta(hours=2),
+            format='in_person', location='Lahore', created_by=self.user,
+        )
+        self.conference = Conference.objects.create(
+            name='ICEPE', description='Power engineering', conference_type='conference',
+            discipline='Electrical Engineering', topics='Power, Protection',
+            start_date=self.today + timedelta(days=60), end_date=self.today + timedelta(days=62),
+            location='Karachi', country='Pakistan', paper_submission_deadline=self.today + timedelta(days=5),
+            notification_date=self.today + timedelta(days=40), registration_fee=100, website='https://icepe.example.com',
+        )
+        Scholarship.objects.create(
+            name='HEC Overseas', provider='HEC', country='Pakistan', level='graduate',
+            disciplines=['Electrical Engineering', 'Civil Engineering'], amount='Full tuition',
+            deadline=self.today + timedelta(days=20), description='MS abroad', application_url='https://hec.example.com',
+            funded='fully',
+        )
+        self.funding = FundingOpportunity.objects.create(
+            title='Ignite Grant', funding_type='grant', description='Seed grant', provider='Ignite', amount='PKR 5M',
+            eligibility_criteria='Registered startups', target_industries='Energy, Agritech', startup_stage_required='Idea',
+            application_open_date=self.today, application_deadline=self.today + timedelta(days=15),
+            application_url='https://ignite.example.com', application_process='Online', required_materials='Deck',
+            website='https://ignite.example.com',
+        )
+
+    def test_range_query(self):
+        """Test each source is one range query and conference milestones expand into entries"""
+        with self.assertNumQueries(4):
+            entries = agenda.entries(self.today, self.today + timedelta(days=30))
+        self.assertEqual([entry.kind for entry in entries], ['paper_deadline', 'event', 'funding', 'scholarship'])
+
+        entries = agenda.entries(self.today, self.today + timedelta(days=90), 'electrical engineering')
+        self.assertEqual(
+            [entry.kind for entry in entries],
+            ['paper_deadline', 'event', 'scholarship', 'notification', 'conference'],
+        )
+        self.assertEqual(entries[-1].end, self.today + timedelta(days=63))
+
+    def test_discipline_feed_cached_until_a_row_changes(self):
+        """Test polling is answered from the cache and a write regenerates the feed"""
+        url = reverse('networking:discipline_calendar_feed', args=['electrical-engineering'])
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertContains(response, f'UID:paper_deadline-{self.conference.pk}@engg.pk')
+        self.assertContains(response, 'SUMMARY:Smart Grid Meetup')
+        self.assertNotContains(response, 'Ignite Grant')
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.conference.camera_ready_deadline = self.today + timedelta(days=50)
+        self.conference.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'SUMMARY:Camera-Ready Deadline: ICEPE')
+
+    @override_settings(SITE_URL='https://engg.pk/')
+    def test_feed_links_use_the_site_url(self):
+        """Test feed links come from SITE_URL whatever Host the request names, and share one cache entry"""
+        url = reverse('networking:discipline_calendar_feed', args=['electrical-engineering'])
+        response = self.client.get(url)
+        self.assertContains(response, 'URL:https://engg.pk' + reverse('networking:event_detail', args=[self.event.pk]))
+        self.assertNotContains(response, 'testserver')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_HOST='localhost')['ETag'], response['ETag'])
+
+    def test_user_feed(self):
+        """Test the signed feed follows the user's own registrations and interests"""
+        registration.register(self.event, self.user)
+        self.funding.applicants_interested.add(self.user)
+        url = reverse('networking:user_calendar_feed', args=[agenda.feed_token(self.user)])
+        response = self.client.get(url)
+        self.assertContains(response, f'UID:event-{self.event.pk}@engg.pk')
+        self.assertContains(response, f'UID:funding-{self.funding.pk}@engg.pk')
+        self.assertNotContains(response, 'ICEPE')
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        registration.cancel(self.event, self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Smart Grid Meetup')
+
+        forged = reverse('networking:user_calendar_feed', args=[f'{self.user.pk + 1}:forged'])
+        self.assertEqual(self.client.get(forged).status_code, 404)
+
+    def test_ics_lines(self):
+        """Test text is escaped and long lines are folded at 75 octets"""
+        self.assertEqual(agenda.escape('Power, Protection; Grids\nLine'), r'Power\, Protection\; Grids\nLine')
+        line = 'DESCRIPTION:' + 'ق' * 60
+        folded = agenda.fold(line)
+        self.assertTrue(all(len(piece.encode()) <= 75 for piece in folded.split('\r\n')))
+        self.assertEqual(folded.replace('\r\n ', ''), line)
+
+    def test_calendar_view(self):
+        """Test the month page lists every source"""
+        deadline = self.today + timedelta(days=20)
+        response = self.client.get(reverse('networking:calendar'), {'month': f'{deadline:%Y-%m}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'HEC Overseas deadline')
+        self.assertNotContains(response, 'My Calendar')
+
+
+class CompanyRatingTest(TestCase):
+    """Test per-company rating aggregates and the comparison page"""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='reviewer', password='testpass123')
+        self.companies = [
+            CompanyProfile.objects.create(
+                name=name, industry='Energy', headquarters='Lahore', pakistan_locations='Lahore', size='large',
+                website='https://example.com', description='Utility',
+            )
+            for name in ['K-Electric', 'LESCO']
+        ]
+
+    def review(self, company, overall, recommend=True, **ratings):
+        fields = {name: overall for name in CompanyReview.RATING_FIELDS}
+        fields.update(ratings)
+        return CompanyReview.objects.create(
+            company=company, author=self.author, position='Engineer', department='Grid', employment_status='current',
+            duration_months=12, location='Karachi', pros='Training', cons='Hours', would_recommend=recommend, **fields,
+        )
+
+    def aggregate(self, company):
+        return CompanyRatingAggregate.objects.get(company=company)
+
+    def test_aggregates_follow_writes(self):
+        """Test creates, edits, moves and deletes keep sums, histograms and recommend counts exact"""
+        company = self.companies[0]
+        first = self.review(company, 5, compensation=2)
+        self.review(company, 3, recommend=False)
+        aggregate = self.aggregate(company)
+        self.assertEqual(aggregate.review_count, 2)
+        self.assertEqual(aggregate.recommend_rate(), 50)
+        self.assertEqual(aggregate.mean('overall_rating'), 4)
+        self.assertEqual(aggregate.histogram('compensation'), [0, 1, 1, 0, 0])
+
+        edited = CompanyReview.objects.get(pk=first.pk)
+        edited.compensation = 4
+        edited.save()
+        self.assertEqual(self.aggregate(company).histogram('compensation'), [0, 0, 1, 1, 0])
+
+        edited.company = self.companies[1]
+        edited.save()
+        self.assertEqual(self.aggregate(company).review_count, 1)
+        self.assertEqual(self.aggregate(self.companies[1]).mean('overall_rating'), 5)
+
+        edited.delete()
+        self.assertEqual(self.aggregate(self.companies[1]).review_count, 0)
+        self.assertEqual(self.aggregate(self.companies[1]).histogram('overall_rating'), [0] * 5)
+        self.assertEqual(CompanyProfile.objects.get(pk=company.pk).average_rating(), 3)
+
+        live = {row.pk: (row.review_count, row.overall_rating_sum, row.histograms) for row in CompanyRatingAggregate.objects.all()}
+        ratings.rebuild()
+        rebuilt = {row.pk: (row.review_count, row.overall_rating_sum, row.histograms) for row in CompanyRatingAggregate.objects.all()}
+        self.assertEqual(rebuilt, {pk: values for pk, values in live.items() if values[0]})
+
+    def test_deleting_company(self):
+        """Test a company can be deleted with its reviews and aggregate"""
+        self.review(self.companies[0], 4)
+        self.companies[0].delete()
+        self.assertFalse(CompanyRatingAggregate.objects.exists())
+
+    def test_compare_view(self):
+        """Test the comparison page never reads reviews"""
+        for overall, recommend in [(5, True), (4, True), (4, False)]:
+            self.review(self.companies[0], overall, recommend)
+        self.review(self.companies[1], 2, recommend=False)
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('networking:company_compare'),
+                {'company': [self.companies[0].pk, self.companies[1].pk, 'junk']},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '67% recommend')
+        self.assertContains(response, '4.3')
+        self.assertEqual([row['label'] for row in response.context['rows']][0], 'Overall')
@@ -0,0 +1,17 @@
+from django.urls import path
+from . import views
+
+app_name = 'networking'
+
+urlpatterns = [
+    path('alumni/', views.AlumniDirectoryView.as_view(), name='alumni_directory'),
+    path('calendar/', views.CalendarView.as_view(), name='calendar'),
+    path('companies/compare/', views.CompanyCompareView.as_view(), name='company_compare'),
+    path('calendar/feed/<str:token>.ics', views.user_calendar_feed, name='user_calendar_feed'),
+    path('calendar/<slug:discipline>.ics', views.discipline_calendar_feed, name='discipline_calendar_feed'),
+    path('events/', views.EventListView.as_view(), name='events'),
+    path('events/<int:pk>/', views.EventDetailView.as_view(), name='event_detail'),
+    path('events/<int:pk>/register/', views.register_for_event, name='event_register'),
+    path('events/<int:pk>/cancel/', views.cancel_event_registration, name='event_cancel'),
+    path('people/', views.PeopleYouMayKnowView.as_view(), name='people_you_may_know'),
+]
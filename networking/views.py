@@ -1,3 +1,249 @@
-from django.shortcuts import render
+from datetime import datetime, timedelta
+from itertools import groupby
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.text import slugify
+from django.views.generic import ListView, DetailView, TemplateView
+
+from . import agenda, directory, ratings, registration
+from .models import AlumniProfile, CompanyProfile, ConnectionSuggestion, Event, EventAttendance
+
+
+class PeopleYouMayKnowView(LoginRequiredMixin, ListView):
+    """The viewer's precomputed connection suggestions"""
+    template_name = 'networking/people_you_may_know.html'
+    context_object_name = 'suggestions'
+
+    def get_queryset(self):
+        return (
+            ConnectionSuggestion.objects.filter(user=self.request.user)
+            .select_related('suggested_user', 'suggested_user__alumni_profile')
+            .order_by('-score')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'People You May Know - engg.pk'
+        return context
+
+
+class AlumniDirectoryView(TemplateView):
+    """Filterable alumni directory; counts come from the maintained facet table"""
+    template_name = 'networking/alumni_directory.html'
+
+    def get_selected_facets(self):
+        return {
+            facet: [value for value in self.request.GET.getlist(facet) if value]
+            for facet in directory.FACETS
+        }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        selected = self.get_selected_facets()
+        search = self.request.GET.get('search', '').strip()
+
+        profiles, next_cursor = directory.page(
+            directory.filter_profiles(selected, search), self.request.GET.get('after'),
+        )
+
+        labels = {
+            'degree': dict(AlumniProfile._meta.get_field('degree').choices),
+            'helping': {'yes': 'Willing to help', 'no': 'Not right now'},
+        }
+        facet_groups = []
+        for facet, counts in directory.facet_options().items():
+            shown = {value for value, _ in counts}
+            # Keep selected values visible even when they aren't among the most common
+            counts = counts + [(value, None) for value in selected[facet] if value not in shown]
+            facet_groups.append({
+                'param': facet,
+                'label': directory.FACET_LABELS[facet],
+                'options': [
+                    {
+                        'value': value,
+                        'label': labels.get(facet, {}).get(value, value),
+                        'count': count,
+                        'selected': value in selected[facet],
+                    }
+                    for value, count in counts
+                ],
+            })
+
+        filters = self.request.GET.copy()
+        filters.pop('after', None)
+        next_page = filters.copy()
+        next_page['after'] = next_cursor or ''
+
+        context['page_title'] = 'Alumni Directory - engg.pk'
+        context['meta_description'] = 'Find engineering alumni by university, discipline, company and city.'
+        context['profiles'] = profiles
+        context['facets'] = facet_groups
+        context['search_query'] = search
+        context['next_page_query'] = next_page.urlencode() if next_cursor else None
+        # Keyset pages can only step forward; deeper pages link back to the start
+        context['first_page_query'] = filters.urlencode() if 'after' in self.request.GET else None
+        return context
+
+
+class CompanyCompareView(TemplateView):
+    """Side-by-side ratings of up to four companies, read from their aggregates"""
+    template_name = 'networking/company_compare.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        selected = [int(pk) for pk in self.request.GET.getlist('company') if pk.isdigit()]
+        companies, rows = ratings.compare(selected) if selected else ([], [])
+        context['page_title'] = 'Compare Companies - engg.pk'
+        context['meta_description'] = 'Compare engineering employers on pay, culture, growth and work-life balance.'
+        context['companies'] = companies
+        context['rows'] = rows
+        context['selected'] = selected
+        context['max_compared'] = ratings.MAX_COMPARED
+        context['options'] = (
+            CompanyProfile.objects.filter(rating_aggregate__review_count__gt=0)
+            .order_by('name')
+            .values_list('pk', 'name')
+        )
+        return context
+
+
+class EventListView(ListView):
+    """Upcoming events; seat availability comes from the stored counters"""
+    template_name = 'networking/events.html'
+    context_object_name = 'events'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return Event.objects.filter(end_date__gte=timezone.now()).order_by('start_date')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Engineering Events - engg.pk'
+        context['meta_description'] = 'Conferences, workshops, meetups and career fairs for engineers in Pakistan.'
+        return context
+
+
+def registration_context(event, user):
+    attendance = None
+    if user.is_authenticated:
+        attendance = EventAttendance.objects.filter(event=event, user=user).first()
+    return {
+        'event': event,
+        'attendance': attendance,
+        'registration_open': registration.is_open(event),
+    }
+
+
+class EventDetailView(DetailView):
+    model = Event
+    template_name = 'networking/event_detail.html'
+    context_object_name = 'event'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = f'{self.object.title} - engg.pk'
+        context.update(registration_context(self.object, self.request.user))
+        return context
+
+
+def registration_response(request, event):
+    """The refreshed registration box (it shows the outcome) for HTMX, otherwise back to the event page"""
+    if request.htmx:
+        event.refresh_from_db(fields=['registered_count', 'waitlist_count'])
+        return render(request, 'networking/partials/event_registration.html', registration_context(event, request.user))
+    return redirect('networking:event_detail', pk=event.pk)
+
+
+@login_required
+def register_for_event(request, pk):
+    """Take a seat, or a waitlist place if the event is full (HTMX)"""
+    event = get_object_or_404(Event, pk=pk)
+    if request.method != 'POST':
+        return HttpResponse(status=400)
+
+    try:
+        registration.register(event, request.user)
+    except registration.RegistrationClosed:
+        # The refreshed box says registration has closed
+        pass
+    return registration_response(request, event)
+
+
+@login_required
+def cancel_event_registration(request, pk):
+    """Give up a seat or waitlist place (HTMX)"""
+    event = get_object_or_404(Event, pk=pk)
+    if request.method != 'POST':
+        return HttpResponse(status=400)
+
+    registration.cancel(event, request.user)
+    return registration_response(request, event)
+
+
+class CalendarView(TemplateView):
+    """One month of events, conference dates and application deadlines"""
+    template_name = 'networking/calendar.html'
+
+    def get_month(self):
+        try:
+            return datetime.strptime(self.request.GET.get('month', ''), '%Y-%m').date()
+        except ValueError:
+            return timezone.localdate().replace(day=1)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        month = self.get_month()
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        discipline = self.request.GET.get('discipline', '').strip()
+        base_url = self.request.build_absolute_uri('/')[:-1]
+
+        entries = agenda.entries(month, next_month, discipline or None, base_url=base_url)
+        context['page_title'] = 'Engineering Calendar - engg.pk'
+        context['meta_description'] = 'Events, conference deadlines, scholarships and funding deadlines by month.'
+        context['month'] = month
+        context['previous_month'] = (month - timedelta(days=1)).replace(day=1)
+        context['next_month'] = next_month
+        context['discipline'] = discipline
+        context['days'] = [{'day': day, 'entries': list(items)} for day, items in groupby(entries, key=lambda entry: entry.day)]
+        if discipline and slugify(discipline):
+            context['discipline_feed_url'] = self.request.build_absolute_uri(
+                reverse('networking:discipline_calendar_feed', args=[slugify(discipline)])
+            )
+        if self.request.user.is_authenticated:
+            context['user_feed_url'] = self.request.build_absolute_uri(
+                reverse('networking:user_calendar_feed', args=[agenda.feed_token(self.request.user)])
+            )
+        return context
+
+
+def ics_response(request, feed, private=False):
+    """Serve a cached feed, or 304 when the client already has this version"""
+    etag, body = feed
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    patch_cache_control(response, private=private, public=not private, max_age=300)
+    return response
+
+
+def discipline_calendar_feed(request, discipline):
+    """Public ICS feed of one discipline's calendar"""
+    discipline = discipline.replace('-', ' ')
+    return ics_response(request, agenda.discipline_feed(discipline))
+
+
+def user_calendar_feed(request, token):
+    """A user's ICS feed; the signed token stands in for a login calendar apps can't do"""
+    user_id = agenda.token_user_id(token)
+    if user_id is None:
+        raise Http404
+    return ics_response(request, agenda.user_feed(user_id), private=True)
@@ -20,7 +20,7 @@ class OpenSourceProjectAdmin(admin.ModelAdmin):
 @admin.register(Competition)
 class CompetitionAdmin(admin.ModelAdmin):
     list_display = ['title', 'competition_type', 'organizer', 'registration_deadline', 'featured']
-    list_filter = ['competition_type', 'format', 'featured']
+    list_filter = ['competition_type', 'format', 'featured', 'is_active']
     search_fields = ['title', 'organizer']
 
 
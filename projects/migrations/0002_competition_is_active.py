@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competition',
+            name='is_active',
+            field=models.BooleanField(default=True, help_text='Cleared by expire_listings once registration closes'),
+        ),
+        migrations.AddIndex(
+            model_name='competition',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['registration_deadline'], name='competition_active_reg_idx'),
+        ),
+    ]
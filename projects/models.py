@@ -156,6 +156,7 @@ class Competition(models.Model):
     # Engagement
     participants = models.ManyToManyField(User, related_name='competitions_joined', through='CompetitionParticipation')
     featured = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True, help_text="Cleared by expire_listings once registration closes")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -164,6 +165,7 @@ class Competition(models.Model):
         indexes = [
             models.Index(fields=['competition_type']),
             models.Index(fields=['registration_deadline']),
+            models.Index(fields=['registration_deadline'], name='competition_active_reg_idx', condition=models.Q(is_active=True)),
         ]
 
     def __str__(self):
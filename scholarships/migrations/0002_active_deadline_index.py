@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarships', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['deadline'], name='scholarships_active_dl_idx'),
+        ),
+    ]
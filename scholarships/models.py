@@ -35,6 +35,7 @@ class Scholarship(models.Model):
         indexes = [
             models.Index(fields=['deadline']),
             models.Index(fields=['level']),
+            models.Index(fields=['deadline'], name='scholarships_active_dl_idx', condition=models.Q(is_active=True)),
         ]
 
     def __str__(self):
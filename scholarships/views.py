@@ -1,7 +1,6 @@
 from django.shortcuts import render
 from django.views.generic import ListView, DetailView
 from django.db.models import Q
-from django.utils import timezone
 from .models import Scholarship
 
 
@@ -12,10 +11,8 @@ class ScholarshipListView(ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = Scholarship.objects.filter(
-            is_active=True,
-            deadline__gte=timezone.now().date()
-        )
+        # Past-deadline rows are deactivated by the expire_listings sweeper
+        queryset = Scholarship.objects.filter(is_active=True)
 
         # Search
         search = self.request.GET.get('search', '')